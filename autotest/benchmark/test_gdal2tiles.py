@@ -0,0 +1,62 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  Benchmarking of gdal2tiles
+#
+###############################################################################
+# Copyright (c) 2024, GDAL contributors
+#
+# SPDX-License-Identifier: MIT
+###############################################################################
+
+import shutil
+
+import pytest
+
+from osgeo import gdal
+
+gdal2tiles = pytest.importorskip("osgeo_utils.gdal2tiles")
+
+# Must be set to run the test_XXX functions under the benchmark fixture
+pytestmark = [
+    pytest.mark.usefixtures("decorate_with_benchmark"),
+    pytest.mark.require_driver("PNG"),
+]
+
+
+@pytest.fixture(scope="module")
+def source_ds_filename(tmp_path_factory):
+    # A real file, so that it can be opened by worker processes
+    filename = str(tmp_path_factory.mktemp("gdal2tiles") / "source.tif")
+    if "debug" in gdal.VersionInfo(""):
+        size = 1024
+    else:
+        size = 4096
+    gdal.Translate(
+        filename,
+        "../gdrivers/data/small_world.tif",
+        options=f"-outsize {size} {size} -r cubic -co TILED=YES",
+    )
+    return filename
+
+
+@pytest.mark.parametrize(
+    "options",
+    [[], ["--processes=4"], ["--threads=4"]],
+    ids=["single", "processes", "threads"],
+)
+@pytest.mark.parametrize(
+    "in_memory_overviews", [False, True], ids=["default", "in_memory_overviews"]
+)
+def test_gdal2tiles(tmp_path, source_ds_filename, options, in_memory_overviews):
+    out_dirname = str(tmp_path / "tiles")
+    shutil.rmtree(out_dirname, ignore_errors=True)
+    if in_memory_overviews:
+        options = options + ["--in-memory-overviews"]
+    gdal2tiles.main(
+        argv=["gdal2tiles", "-q", "-z", "0-5"]
+        + options
+        + [source_ds_filename, out_dirname]
+    )
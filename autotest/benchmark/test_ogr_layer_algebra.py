@@ -0,0 +1,89 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  Benchmarking of ogr_layer_algebra
+#
+###############################################################################
+# Copyright (c) 2024, GDAL contributors
+#
+# SPDX-License-Identifier: MIT
+###############################################################################
+
+import pytest
+
+from osgeo import gdal, ogr
+
+ogr_layer_algebra = pytest.importorskip("osgeo_utils.ogr_layer_algebra")
+
+# Must be set to run the test_XXX functions under the benchmark fixture
+pytestmark = [
+    pytest.mark.require_driver("GPKG"),
+    pytest.mark.require_geos,
+    pytest.mark.usefixtures("decorate_with_benchmark"),
+]
+
+
+def create_polygon_grid(filename, count, origin, step, size):
+    ds = ogr.GetDriverByName("GPKG").CreateDataSource(filename)
+    lyr = ds.CreateLayer("grid", geom_type=ogr.wkbPolygon)
+    lyr.CreateField(ogr.FieldDefn("id", ogr.OFTInteger))
+    f = ogr.Feature(lyr.GetLayerDefn())
+    lyr.StartTransaction()
+    for j in range(count):
+        for i in range(count):
+            x = origin + i * step
+            y = origin + j * step
+            f.SetFID(-1)
+            f["id"] = j * count + i
+            f.SetGeometry(
+                ogr.CreateGeometryFromWkt(
+                    f"POLYGON(({x} {y},{x} {y + size},{x + size} {y + size},{x + size} {y},{x} {y}))"
+                )
+            )
+            lyr.CreateFeature(f)
+    lyr.CommitTransaction()
+
+
+@pytest.fixture(scope="module")
+def source_filenames(tmp_path_factory):
+    # Real files, so that they can be opened by the worker threads
+    dirname = tmp_path_factory.mktemp("ogr_layer_algebra")
+    if "debug" in gdal.VersionInfo(""):
+        count = 50
+    else:
+        count = 200
+    input_filename = str(dirname / "input.gpkg")
+    method_filename = str(dirname / "method.gpkg")
+    create_polygon_grid(input_filename, count, 0, 1, 1)
+    create_polygon_grid(method_filename, count, 0.5, 1, 0.8)
+    return input_filename, method_filename
+
+
+@pytest.mark.parametrize("jobs", [1, 2, 4, 8])
+@pytest.mark.parametrize("op_str", ["Intersection", "Union"])
+def test_ogr_layer_algebra(tmp_path, source_filenames, op_str, jobs):
+    input_filename, method_filename = source_filenames
+    assert (
+        ogr_layer_algebra.main(
+            [
+                "ogr_layer_algebra",
+                op_str,
+                "-q",
+                "-input_ds",
+                input_filename,
+                "-method_ds",
+                method_filename,
+                "-f",
+                "GPKG",
+                "-output_ds",
+                str(tmp_path / "out.gpkg"),
+                "-output_lyr",
+                "out",
+                "-j",
+                str(jobs),
+            ]
+        )
+        == 0
+    )
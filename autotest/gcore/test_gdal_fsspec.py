@@ -223,3 +223,73 @@ def test_gdal_fsspec_usable_by_pyarrow_dataset(tmp_vsimem):
     assert ds.dataset(tmp_vsimem_file, filesystem=fs_vsimem) is not None
 
     assert ds.dataset(str(tmp_vsimem), filesystem=fs_vsimem) is not None
+
+
+def test_gdal_fsspec_cat_file():
+
+    fs = fsspec.filesystem("gdalvsi")
+    data = open("data/byte.tif", "rb").read()
+    assert fs.cat_file("data/byte.tif") == data
+    assert fs.cat_file("data/byte.tif", 10, 20) == data[10:20]
+    assert fs.cat_file("data/byte.tif", -10) == data[-10:]
+    assert fs.cat_file("data/byte.tif", 0, -700) == data[0:-700]
+    assert fs.cat_file("data/byte.tif", 700, 10000) == data[700:]
+    assert fs.cat_file("data/byte.tif", 20, 10) == b""
+
+    with pytest.raises(FileNotFoundError):
+        fs.cat_file("/i/do/not/exist")
+
+
+def test_gdal_fsspec_VSIFReadMultiRangeL():
+
+    data = open("data/byte.tif", "rb").read()
+    f = gdal.VSIFOpenL("data/byte.tif", "rb")
+    try:
+        assert gdal.VSIFReadMultiRangeL([0, 8, 100], [4, 2, 10], f) == [
+            data[0:4],
+            data[8:10],
+            data[100:110],
+        ]
+    finally:
+        gdal.VSIFCloseL(f)
+
+
+@pytest.mark.parametrize("max_gap", [None, 0])
+def test_gdal_fsspec_cat_ranges(tmp_vsimem, max_gap):
+
+    data = open("data/byte.tif", "rb").read()
+    other_filename = str(tmp_vsimem / "other.bin")
+    other_data = bytes(range(256)) * 10
+    gdal.FileFromMemBuffer(other_filename, other_data)
+
+    fs = fsspec.filesystem("gdalvsi")
+    ret = fs.cat_ranges(
+        ["data/byte.tif", other_filename, "data/byte.tif", "data/byte.tif"]
+        + [other_filename, "/i/do/not/exist"],
+        [100, 0, 0, 102, -10, 0],
+        [110, 1000, 4, 200, None, 10],
+        max_gap=max_gap,
+    )
+    assert ret[:5] == [
+        data[100:110],
+        other_data[0:1000],
+        data[0:4],
+        data[102:200],
+        other_data[-10:],
+    ]
+    assert isinstance(ret[5], FileNotFoundError)
+
+    with pytest.raises(FileNotFoundError):
+        fs.cat_ranges(["/i/do/not/exist"], [0], [10], on_error="raise")
+
+
+def test_gdal_fsspec_pipe_file(tmp_vsimem):
+
+    filename = str(tmp_vsimem / "test.bin")
+    fs = fsspec.filesystem("gdalvsi")
+    fs.pipe_file(filename, b"hello")
+    assert fs.cat_file(filename) == b"hello"
+
+    with pytest.raises(FileExistsError):
+        fs.pipe_file(filename, b"world", mode="create")
+    assert fs.cat_file(filename) == b"hello"
@@ -1766,3 +1766,102 @@ def test_vsifile_MultipartUpload():
             match=r"MultipartUploadAbort\(\) not supported by this file system",
         ):
             gdal.MultipartUploadAbort("", "")
+
+
+@pytest.mark.parametrize("buffering", (0, 1, 7, -1))
+@pytest.mark.parametrize("eol", ("\n", "\r\n", "\r"))
+def test_vsifile_class_line_iteration_buffering(tmp_vsimem, buffering, eol):
+
+    fname = str(tmp_vsimem / "test.txt")
+
+    lines_out = random_lines()
+
+    with gdaltest.vsi_open(fname, "wb") as f:
+        f.write((eol.join(lines_out) + eol).encode())
+
+    with gdal.VSIFile(fname, "r", buffering=buffering) as f:
+        lines_in = [line for line in f]
+
+    assert lines_in == lines_out
+
+
+def test_vsifile_class_readinto(tmp_vsimem):
+
+    fname = str(tmp_vsimem / "test.bin")
+    data = bytes(range(256)) * 1000
+    gdal.FileFromMemBuffer(fname, data)
+
+    with gdal.VSIFile(fname, "rb", buffering=1024) as f:
+        # small read, through the read-ahead buffer
+        buf = bytearray(10)
+        assert f.readinto(buf) == 10
+        assert buf == data[:10]
+        assert f.tell() == 10
+
+        # large read, into the caller buffer
+        buf = bytearray(100000)
+        assert f.readinto(memoryview(buf)) == 100000
+        assert buf == data[10:100010]
+        assert f.tell() == 100010
+
+        assert f.peek(5)[:5] == data[100010:100015]
+        assert f.tell() == 100010
+
+        buf = bytearray(10000)
+        n = f.readinto1(buf)
+        assert 0 < n <= 10000
+        assert buf[:n] == data[100010 : 100010 + n]
+
+        f.seek(-5, os.SEEK_END)
+        buf = bytearray(10)
+        assert f.readinto(buf) == 5
+        assert buf[:5] == data[-5:]
+        assert f.readinto(buf) == 0
+        assert f.peek() == b""
+
+
+def test_vsifile_class_readinto_numpy(tmp_vsimem):
+
+    np = pytest.importorskip("numpy")
+
+    fname = str(tmp_vsimem / "test.bin")
+    ar = np.arange(1000, dtype=np.float64)
+    gdal.FileFromMemBuffer(fname, ar.tobytes())
+
+    out = np.empty(1000, dtype=np.float64)
+    with gdal.VSIFile(fname, "rb") as f:
+        assert f.readinto(out) == 8000
+    np.testing.assert_array_equal(out, ar)
+
+
+def test_vsifile_class_read_write_buffered(tmp_vsimem):
+
+    fname = str(tmp_vsimem / "test.bin")
+    gdal.FileFromMemBuffer(fname, b"0123456789")
+
+    with gdal.VSIFile(fname, "r+b") as f:
+        assert f.read(2) == b"01"
+        f.write(b"xx")
+        assert f.tell() == 4
+        assert f.read() == b"456789"
+
+    with gdal.VSIFile(fname, "rb") as f:
+        assert f.read() == b"01xx456789"
+
+
+def test_vsifile_VSIFReadIntoL(tmp_vsimem):
+
+    fname = str(tmp_vsimem / "test.bin")
+    gdal.FileFromMemBuffer(fname, b"0123456789")
+
+    f = gdal.VSIFOpenL(fname, "rb")
+    buf = bytearray(4)
+    assert gdal.VSIFReadIntoL(buf, f) == 4
+    assert buf == b"0123"
+    view = memoryview(bytearray(10))
+    assert gdal.VSIFReadIntoL(view[2:], f) == 6
+    assert view[2:8] == b"456789"
+    gdal.VSIFCloseL(f)
+
+    with pytest.raises(ValueError, match="closed file"):
+        gdal.VSIFReadIntoL(buf, f)
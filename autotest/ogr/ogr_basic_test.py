@@ -763,6 +763,143 @@ def test_ogr_basic_feature_iterator():
     assert count == 10
 
 
+###############################################################################
+# Test access to feature fields by name, and keys() / items()
+
+
+def test_ogr_basic_feature_field_access_by_name():
+
+    ds = ogr.GetDriverByName("Memory").CreateDataSource("")
+    lyr = ds.CreateLayer("test")
+    lyr.CreateField(ogr.FieldDefn("int", ogr.OFTInteger))
+    fld_defn = ogr.FieldDefn("bool", ogr.OFTInteger)
+    fld_defn.SetSubType(ogr.OFSTBoolean)
+    lyr.CreateField(fld_defn)
+    lyr.CreateField(ogr.FieldDefn("int64", ogr.OFTInteger64))
+    lyr.CreateField(ogr.FieldDefn("real", ogr.OFTReal))
+    lyr.CreateField(ogr.FieldDefn("str", ogr.OFTString))
+    lyr.CreateField(ogr.FieldDefn("Str", ogr.OFTString))
+    lyr.CreateField(ogr.FieldDefn("strlist", ogr.OFTStringList))
+    fld_defn = ogr.FieldDefn("boollist", ogr.OFTIntegerList)
+    fld_defn.SetSubType(ogr.OFSTBoolean)
+    lyr.CreateField(fld_defn)
+    lyr.CreateField(ogr.FieldDefn("int64list", ogr.OFTInteger64List))
+    lyr.CreateField(ogr.FieldDefn("reallist", ogr.OFTRealList))
+    lyr.CreateField(ogr.FieldDefn("date", ogr.OFTDate))
+    lyr.CreateField(ogr.FieldDefn("null", ogr.OFTString))
+    lyr.CreateField(ogr.FieldDefn("unset", ogr.OFTString))
+
+    f = ogr.Feature(lyr.GetLayerDefn())
+    f["int"] = 1
+    f["bool"] = True
+    f["int64"] = 1234567890123
+    f["real"] = 1.5
+    f["str"] = "foo"
+    f["Str"] = "bar"
+    f["strlist"] = ["a", "\u00e9"]
+    f["boollist"] = [True, False]
+    f["int64list"] = [1234567890123, 1]
+    f["reallist"] = [1.5, 2.5]
+    f["date"] = "2024/01/31"
+    f.SetFieldNull("null")
+
+    expected = {
+        "int": 1,
+        "bool": True,
+        "int64": 1234567890123,
+        "real": 1.5,
+        "str": "foo",
+        "Str": "bar",
+        "strlist": ["a", "\u00e9"],
+        "boollist": [True, False],
+        "int64list": [1234567890123, 1],
+        "reallist": [1.5, 2.5],
+        "date": "2024/01/31",
+        "null": None,
+        "unset": None,
+    }
+    assert f.keys() == list(expected.keys())
+    assert f.items() == expected
+    assert f.items() == {key: f.GetField(key) for key in f.keys()}
+    for key, value in expected.items():
+        assert f[key] == value
+        assert f.GetField(key) == value
+    assert f.str == "foo"
+    assert f.Str == "bar"
+    assert f.INT == 1
+    assert f["REAL"] == 1.5
+    with pytest.raises(KeyError):
+        f["not_existing"]
+    with pytest.raises(AttributeError):
+        f.not_existing
+
+    assert ogr.Feature(ogr.FeatureDefn()).keys() == []
+    assert ogr.Feature(ogr.FeatureDefn()).items() == {}
+
+
+###############################################################################
+# Test that access to feature fields by name takes into account schema changes
+
+
+def test_ogr_basic_feature_field_access_by_name_schema_change():
+
+    ds = ogr.GetDriverByName("Memory").CreateDataSource("")
+    lyr = ds.CreateLayer("test")
+    lyr.CreateField(ogr.FieldDefn("a", ogr.OFTString))
+    lyr.CreateField(ogr.FieldDefn("b", ogr.OFTString))
+
+    f = ogr.Feature(lyr.GetLayerDefn())
+    f["a"] = "a"
+    f["b"] = "b"
+    lyr.CreateFeature(f)
+    assert f["a"] == "a"
+    assert f["b"] == "b"
+
+    lyr.ReorderFields([1, 0])
+    f = lyr.GetFeature(f.GetFID())
+    assert f.keys() == ["b", "a"]
+    assert f["a"] == "a"
+    assert f["b"] == "b"
+
+    fld_defn = ogr.FieldDefn("c", ogr.OFTString)
+    lyr.AlterFieldDefn(1, fld_defn, ogr.ALTER_NAME_FLAG)
+    f = lyr.GetFeature(f.GetFID())
+    assert f.items() == {"b": "b", "c": "a"}
+    assert f["c"] == "a"
+    assert f["C"] == "a"
+    with pytest.raises(KeyError):
+        f["a"]
+    with pytest.raises(KeyError):
+        f["A"]
+
+    lyr.CreateField(ogr.FieldDefn("a", ogr.OFTString))
+    f = lyr.GetFeature(f.GetFID())
+    f["a"] = "new"
+    assert f.items() == {"b": "b", "c": "a", "a": "new"}
+
+    assert f["A"] == "new"
+
+    lyr.DeleteField(0)
+    f = lyr.GetFeature(f.GetFID())
+    assert f["c"] == "a"
+    assert f["C"] == "a"
+    assert f["A"] == "new"
+    with pytest.raises(KeyError):
+        f["b"]
+    with pytest.raises(KeyError):
+        f["B"]
+
+    # Feature definitions with the same field names at different indices
+    for names in (["x", "y"], ["y", "x"], ["y", "X"]):
+        defn = ogr.FeatureDefn()
+        for name in names:
+            defn.AddFieldDefn(ogr.FieldDefn(name, ogr.OFTString))
+        f = ogr.Feature(defn)
+        f[names[0]] = "first"
+        assert f["x"] == ("first" if names[0] == "x" else None)
+        assert f["y"] == ("first" if names[0] == "y" else None)
+
+
 def test_ogr_basic_dataset_copy_layer_dst_srswkt():
 
     ds = ogr.GetDriverByName("Memory").CreateDataSource("")
@@ -936,3 +936,47 @@ def test_osr_ct_fix_9732():
     x, y, _ = ct.TransformPoint(2300000, 2000000, 0)
     assert x == pytest.approx(2301000)
     assert y == pytest.approx(2000000)
+
+
+###############################################################################
+# Test TransformPointsInPlace()
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_osr_ct_transform_points_in_place(num_threads):
+
+    np = pytest.importorskip("numpy")
+
+    utm_srs = osr.SpatialReference()
+    utm_srs.SetUTM(11)
+    utm_srs.SetWellKnownGeogCS("WGS84")
+
+    ll_srs = osr.SpatialReference()
+    ll_srs.SetWellKnownGeogCS("WGS84")
+    ll_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+    ct = osr.CoordinateTransformation(ll_srs, utm_srs)
+
+    count = 100000
+    x = np.linspace(-120, -114, count)
+    y = np.linspace(30, 40, count)
+    z = np.linspace(0, 100, count)
+    expected = ct.TransformPoints(np.stack([x, y, z], axis=1))
+
+    assert ct.TransformPointsInPlace(x, y, z, num_threads=num_threads)
+    assert np.allclose(np.stack([x, y, z], axis=1), expected)
+
+    x = np.array([-117.5, -117.5])
+    y = np.array([32.0, 33.0])
+    assert ct.TransformPointsInPlace(x, y)
+    for i, lat in enumerate((32.0, 33.0)):
+        assert (x[i], y[i]) == pytest.approx(
+            ct.TransformPoint(-117.5, lat)[0:2], abs=1e-3
+        )
+
+    with pytest.raises(Exception, match="float64"):
+        ct.TransformPointsInPlace(x.astype(np.float32), y)
+    with pytest.raises(Exception, match="contiguous"):
+        ct.TransformPointsInPlace(np.zeros((2, 2))[:, 0], y)
+    with pytest.raises(Exception, match="same size"):
+        ct.TransformPointsInPlace(x, np.zeros(3))
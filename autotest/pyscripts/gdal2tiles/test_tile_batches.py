@@ -0,0 +1,91 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdal2tiles.py testing of the generation of tile job batches
+#
+###############################################################################
+# Copyright (c) 2024, GDAL contributors
+#
+# SPDX-License-Identifier: MIT
+###############################################################################
+
+import concurrent.futures
+
+import pytest
+
+from osgeo_utils import gdal2tiles
+
+
+def _morton_key(tx, ty):
+    key = 0
+    for i in range(16):
+        key |= ((tx >> i) & 1) << (2 * i)
+        key |= ((ty >> i) & 1) << (2 * i + 1)
+    return key
+
+
+@pytest.mark.parametrize(
+    "tile_range", [(0, 0, 3, 1), (5, 7, 5, 7), (37, 21, 101, 90), (3, 0, 3, 1000)]
+)
+def test_gdal2tiles_iter_tiles_in_morton_order(tile_range):
+
+    tminx, tminy, tmaxx, tmaxy = tile_range
+    tiles = list(gdal2tiles.iter_tiles_in_morton_order(*tile_range))
+
+    assert sorted(tiles) == sorted(
+        (tx, ty) for tx in range(tminx, tmaxx + 1) for ty in range(tminy, tmaxy + 1)
+    )
+    keys = [_morton_key(tx, ty) for tx, ty in tiles]
+    assert keys == sorted(keys)
+
+
+def test_gdal2tiles_iter_batches():
+
+    assert list(gdal2tiles.iter_batches(range(10), 4)) == [
+        [0, 1, 2, 3],
+        [4, 5, 6, 7],
+        [8, 9],
+    ]
+    assert list(gdal2tiles.iter_batches([], 4)) == []
+
+
+def test_gdal2tiles_iter_overview_base_tile_groups():
+
+    tile_job_info = gdal2tiles.TileJobInfo(tminmax={5: (3, 4, 10, 9)})
+
+    groups = list(gdal2tiles.iter_overview_base_tile_groups(5, tile_job_info))
+    assert len(groups) == 5 * 3
+    assert groups[0] == [(3, 5), (3, 4)]
+    assert sorted(tile for group in groups for tile in group) == sorted(
+        (tx, ty) for tx in range(3, 11) for ty in range(4, 10)
+    )
+    for group in groups:
+        assert len(set((tx >> 1, ty >> 1) for tx, ty in group)) == 1
+
+
+def _square(x):
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+def test_gdal2tiles_pool_imap_unordered():
+
+    consumed = []
+
+    def jobs():
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+        results = gdal2tiles.pool_imap_unordered(pool, _square, jobs(), 4)
+        first = next(results)
+        # Jobs are pulled lazily
+        assert len(consumed) <= 5
+        assert sorted([first] + list(results)) == [i * i for i in range(100)]
+
+        with pytest.raises(ValueError):
+            list(gdal2tiles.pool_imap_unordered(pool, _square, [1, -1, 2], 2))
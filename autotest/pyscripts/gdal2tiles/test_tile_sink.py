@@ -0,0 +1,194 @@
+#!/usr/bin/env pytest
+# -*- coding: utf-8 -*-
+###############################################################################
+#
+# Project:  GDAL/OGR Test Suite
+# Purpose:  gdal2tiles.py testing of MBTiles and PMTiles outputs
+#
+###############################################################################
+# Copyright (c) 2024, GDAL contributors
+#
+# SPDX-License-Identifier: MIT
+###############################################################################
+
+import glob
+import os
+
+import gdaltest
+import pytest
+
+from osgeo_utils import gdal2tiles
+
+pytestmark = [
+    pytest.mark.skipif(
+        not gdaltest.vrt_has_open_support(),
+        reason="VRT driver open missing",
+    ),
+    pytest.mark.require_driver("PNG"),
+]
+
+sqlite3 = pytest.importorskip("sqlite3")
+
+
+def test_gdal2tiles_pmtiles_tile_id():
+
+    assert gdal2tiles.pmtiles_tile_id(0, 0, 0) == 0
+    assert [
+        gdal2tiles.pmtiles_tile_id(1, x, y) for x, y in ((0, 0), (0, 1), (1, 1), (1, 0))
+    ] == [1, 2, 3, 4]
+    assert gdal2tiles.pmtiles_tile_id(3, 0, 0) == 21
+    assert gdal2tiles.pmtiles_tile_id(20, 0, 0) == 366503875925
+
+
+def test_gdal2tiles_pmtiles_directory():
+
+    entries = [[5, 0, 10, 1], [6, 10, 20, 3], [20, 0, 10, 1], [1000, 30, 1, 0]]
+    assert (
+        gdal2tiles.pmtiles_deserialize_directory(
+            gdal2tiles.pmtiles_serialize_directory(entries)
+        )
+        == entries
+    )
+
+
+def _get_directory_tiles(tiles_dir):
+
+    tiles = {}
+    for filename in glob.glob(os.path.join(tiles_dir, "*", "*", "*.png")):
+        tz, tx, ty = os.path.relpath(filename, tiles_dir)[: -len(".png")].split(os.sep)
+        with open(filename, "rb") as f:
+            tiles[(int(tz), int(tx), int(ty))] = f.read()
+    return tiles
+
+
+@pytest.mark.parametrize("extension", [".mbtiles", ".pmtiles"])
+def test_gdal2tiles_tile_sink(tmp_path, extension):
+
+    input_file = "../../gcore/data/byte.tif"
+    tiles_dir = str(tmp_path / "tiles")
+    out_filename = str(tmp_path / ("out" + extension))
+
+    gdal2tiles.main(argv=["gdal2tiles", "-q", "-z", "11-14", input_file, tiles_dir])
+    gdal2tiles.main(argv=["gdal2tiles", "-q", "-z", "11-14", input_file, out_filename])
+
+    assert set(os.listdir(tmp_path)) == {"tiles", "out" + extension}
+
+    expected_tiles = _get_directory_tiles(tiles_dir)
+    assert len(expected_tiles) > 4
+
+    tile_sink = gdal2tiles.get_tile_sink_class(out_filename)(out_filename, resume=True)
+    tile_sink.open()
+    try:
+        for (tz, tx, ty), data in expected_tiles.items():
+            assert tile_sink.read_tile(tz, tx, ty) == data, (tz, tx, ty)
+        assert not tile_sink.has_tile(14, 0, 0)
+    finally:
+        tile_sink.close()
+
+    # Resume from a complete output
+    gdal2tiles.main(
+        argv=["gdal2tiles", "-q", "-z", "11-14", "--resume", input_file, out_filename]
+    )
+    if extension == ".mbtiles":
+        with sqlite3.connect(out_filename) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0] == len(
+                expected_tiles
+            )
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+            assert metadata["format"] == "png"
+            assert metadata["minzoom"] == "11"
+            assert metadata["maxzoom"] == "14"
+    else:
+        with open(out_filename, "rb") as f:
+            header = gdal2tiles.PMTilesTileSink.header_struct.unpack(
+                f.read(gdal2tiles.PMTilesTileSink.header_size)
+            )
+        assert header[0] == b"PMTiles"
+        assert header[10] == len(expected_tiles)  # addressed tiles
+        assert header[13] == 1  # clustered
+        assert header[16] == 2  # PNG
+        assert header[17:19] == (11, 14)
+
+
+def test_gdal2tiles_tile_sink_unsupported_profile(tmp_path):
+
+    with pytest.raises(SystemExit):
+        gdal2tiles.main(
+            argv=[
+                "gdal2tiles",
+                "-q",
+                "-p",
+                "raster",
+                "../../gcore/data/byte.tif",
+                str(tmp_path / "out.mbtiles"),
+            ]
+        )
+
+
+@pytest.mark.parametrize("extension", [".mbtiles", ".pmtiles"])
+def test_gdal2tiles_tile_sink_dedup(tmp_path, extension):
+
+    from osgeo import gdal, osr
+
+    # Uniform raster, producing many identical tiles
+    input_file = str(tmp_path / "uniform.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(input_file, 2000, 2000)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(3857)
+    ds.SetSpatialRef(srs)
+    ds.SetGeoTransform([0, 10, 0, 20000, 0, -10])
+    ds.GetRasterBand(1).Fill(127)
+    ds = None
+
+    tiles_dir = str(tmp_path / "tiles")
+    out_filename = str(tmp_path / ("out" + extension))
+
+    gdal2tiles.main(argv=["gdal2tiles", "-q", "-z", "13-15", input_file, tiles_dir])
+    gdal2tiles.main(
+        argv=["gdal2tiles", "-q", "-z", "13-15", "--dedup", input_file, out_filename]
+    )
+
+    expected_tiles = _get_directory_tiles(tiles_dir)
+    nb_distinct_tiles = len(set(expected_tiles.values()))
+    assert nb_distinct_tiles < len(expected_tiles)
+
+    tile_sink = gdal2tiles.get_tile_sink_class(out_filename)(
+        out_filename, resume=True, dedup=True
+    )
+    tile_sink.open()
+    try:
+        for (tz, tx, ty), data in expected_tiles.items():
+            assert tile_sink.read_tile(tz, tx, ty) == data, (tz, tx, ty)
+    finally:
+        tile_sink.close()
+
+    if extension == ".mbtiles":
+        with sqlite3.connect(out_filename) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0] == len(
+                expected_tiles
+            )
+            assert conn.execute("SELECT COUNT(*) FROM images").fetchone()[0] < len(
+                expected_tiles
+            )
+    else:
+        with open(out_filename, "rb") as f:
+            header = gdal2tiles.PMTilesTileSink.header_struct.unpack(
+                f.read(gdal2tiles.PMTilesTileSink.header_size)
+            )
+        assert header[10] == len(expected_tiles)  # addressed tiles
+        assert header[12] < len(expected_tiles)  # tile contents
+
+    if extension == ".mbtiles":
+        # A deduplicated file can only be resumed with --dedup
+        with pytest.raises(Exception):
+            gdal2tiles.main(
+                argv=[
+                    "gdal2tiles",
+                    "-q",
+                    "-z",
+                    "13-15",
+                    "--resume",
+                    input_file,
+                    out_filename,
+                ]
+            )
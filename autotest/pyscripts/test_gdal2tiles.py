@@ -830,3 +830,165 @@ def test_gdal2tiles_py_jpeg_1band_input(
             got_stats_14,
             got_stats_13,
         )
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("extra_options", ["", "--processes=2", "--threads=2", "--xyz"])
+def test_gdal2tiles_py_in_memory_overviews(script_path, tmp_path, extra_options):
+
+    input_tif = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    ref_dir = str(tmp_path / "ref")
+    out_dir = str(tmp_path / "out")
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 0-3 {extra_options} {input_tif} {ref_dir}",
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 0-3 {extra_options} --in-memory-overviews {input_tif} {out_dir}",
+    )
+
+    ref_tiles = sorted(
+        os.path.relpath(f, ref_dir) for f in glob.glob(f"{ref_dir}/*/*/*.png")
+    )
+    out_tiles = sorted(
+        os.path.relpath(f, out_dir) for f in glob.glob(f"{out_dir}/*/*/*.png")
+    )
+    assert set(tile.split(os.sep)[0] for tile in ref_tiles) == {"0", "1", "2", "3"}
+    assert out_tiles == ref_tiles
+
+    # PNG is lossless, so building overviews from the in-memory tiles must
+    # give the same result as reading them back
+    for tile in ref_tiles:
+        ref_ds = gdal.Open(os.path.join(ref_dir, tile))
+        out_ds = gdal.Open(os.path.join(out_dir, tile))
+        assert [
+            out_ds.GetRasterBand(i + 1).Checksum() for i in range(out_ds.RasterCount)
+        ] == [
+            ref_ds.GetRasterBand(i + 1).Checksum() for i in range(ref_ds.RasterCount)
+        ], tile
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("link_type", ["hardlink", "symlink"])
+def test_gdal2tiles_py_dedup(script_path, tmp_path, link_type):
+
+    # Uniform raster, producing many identical tiles
+    input_tif = str(tmp_path / "uniform.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(input_tif, 2000, 2000)
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(3857)
+    ds.SetSpatialRef(srs)
+    ds.SetGeoTransform([0, 10, 0, 20000, 0, -10])
+    ds.GetRasterBand(1).Fill(127)
+    ds = None
+
+    ref_dir = str(tmp_path / "ref")
+    out_dir = str(tmp_path / "out")
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 13-15 {input_tif} {ref_dir}",
+    )
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 13-15 --dedup --dedup-link={link_type} {input_tif} {out_dir}",
+    )
+
+    ref_tiles = sorted(
+        os.path.relpath(f, ref_dir) for f in glob.glob(f"{ref_dir}/*/*/*.png")
+    )
+    out_tiles = sorted(
+        os.path.relpath(f, out_dir) for f in glob.glob(f"{out_dir}/*/*/*.png")
+    )
+    assert out_tiles == ref_tiles
+
+    for tile in ref_tiles:
+        with open(os.path.join(ref_dir, tile), "rb") as f:
+            ref_data = f.read()
+        with open(os.path.join(out_dir, tile), "rb") as f:
+            assert f.read() == ref_data, tile
+
+    if sys.platform != "win32":
+        out_files = [os.path.join(out_dir, tile) for tile in out_tiles]
+        if link_type == "hardlink":
+            assert any(os.stat(f).st_nlink > 1 for f in out_files)
+        else:
+            assert any(os.path.islink(f) for f in out_files)
+
+    # Regenerating without --dedup must not write through the links
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 13-15 {input_tif} {out_dir}",
+    )
+    for tile in ref_tiles:
+        assert not os.path.islink(os.path.join(out_dir, tile))
+        with open(os.path.join(ref_dir, tile), "rb") as f:
+            ref_data = f.read()
+        with open(os.path.join(out_dir, tile), "rb") as f:
+            assert f.read() == ref_data, tile
+
+
+@pytest.mark.require_driver("PNG")
+@pytest.mark.parametrize("extra_options", ["", "--resume"])
+def test_gdal2tiles_py_threads(script_path, tmp_path, extra_options):
+
+    input_tif = test_py_scripts.get_data_path("gdrivers") + "small_world.tif"
+    ref_dir = str(tmp_path / "ref")
+    out_dir = str(tmp_path / "out")
+
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 0-3 {input_tif} {ref_dir}",
+    )
+    if extra_options == "--resume":
+        # Only some of the tiles remain to be generated
+        shutil.copytree(ref_dir, out_dir)
+        for tile in glob.glob(f"{out_dir}/3/*/*.png")[::2]:
+            os.unlink(tile)
+    test_py_scripts.run_py_script_as_external_script(
+        script_path,
+        "gdal2tiles",
+        f"-q -z 0-3 --threads=3 {extra_options} {input_tif} {out_dir}",
+    )
+
+    ref_tiles = sorted(
+        os.path.relpath(f, ref_dir) for f in glob.glob(f"{ref_dir}/*/*/*.png")
+    )
+    out_tiles = sorted(
+        os.path.relpath(f, out_dir) for f in glob.glob(f"{out_dir}/*/*/*.png")
+    )
+    assert out_tiles == ref_tiles
+
+    for tile in ref_tiles:
+        ref_ds = gdal.Open(os.path.join(ref_dir, tile))
+        out_ds = gdal.Open(os.path.join(out_dir, tile))
+        assert [
+            out_ds.GetRasterBand(i + 1).Checksum() for i in range(out_ds.RasterCount)
+        ] == [
+            ref_ds.GetRasterBand(i + 1).Checksum() for i in range(ref_ds.RasterCount)
+        ], tile
+
+
+def test_gdal2tiles_py_threads_and_processes(tmp_path):
+
+    from osgeo_utils import gdal2tiles
+
+    with pytest.raises(SystemExit):
+        gdal2tiles.main(
+            argv=[
+                "gdal2tiles",
+                "-q",
+                "--threads=2",
+                "--processes=2",
+                test_py_scripts.get_data_path("gcore") + "byte.tif",
+                str(tmp_path / "out"),
+            ]
+        )
@@ -13,6 +13,7 @@
 ###############################################################################
 
 import os
+import tempfile
 
 import gdaltest
 import pytest
@@ -198,3 +199,173 @@ def test_gdal2xyz_py_vsistdout(script_path, tmp_path):
     with gdal.Open(out_filename) as ds:
         assert ds.GetGeoTransform() == (440720.0, 60.0, 0.0, 3751320.0, 0.0, -60.0)
         assert ds.GetRasterBand(1).Checksum() == 4672
+
+
+###############################################################################
+# Test -srcwin and -skip with numpy arrays output
+
+
+def test_gdal2xyz_py_srcwin_skip():
+
+    ds = gdal.Open(test_py_scripts.get_data_path("gcore") + "byte.tif")
+    gt = ds.GetGeoTransform()
+    ref_data = ds.GetRasterBand(1).ReadAsArray()
+
+    geo_x, geo_y, data, nodata = gdal2xyz.gdal2xyz(
+        ds,
+        None,
+        srcwin=(2, 3, 10, 9),
+        skip=(3, 2),
+        return_np_arrays=True,
+        progress_callback=None,
+    )
+    assert nodata is None
+
+    pixels = np.arange(2, 12, 3)
+    lines = np.arange(3, 12, 2)
+    assert len(geo_x) == len(pixels) * len(lines)
+    np.testing.assert_array_equal(
+        geo_x, np.tile(gt[0] + (pixels + 0.5) * gt[1], len(lines))
+    )
+    np.testing.assert_array_equal(
+        geo_y, np.repeat(gt[3] + (lines + 0.5) * gt[5], len(pixels))
+    )
+    np.testing.assert_array_equal(data[0], ref_data[lines][:, pixels].ravel())
+
+
+###############################################################################
+# Test that the points do not depend on the batch size
+
+
+def test_gdal2xyz_py_batches():
+
+    src_filename = test_py_scripts.get_data_path("gcore") + "rgbsmall.tif"
+    out = []
+    for batch_size in (gdal2xyz.DefaultBatchSize, 1, 100):
+        with gdal.Open(src_filename) as ds:
+            bands = [ds.GetRasterBand(i + 1) for i in range(ds.RasterCount)]
+            batches = list(
+                gdal2xyz.iter_xyz_batches(
+                    bands,
+                    ds.GetGeoTransform(),
+                    (0, 0, ds.RasterXSize, ds.RasterYSize),
+                    np_dt=np.uint8,
+                    src_nodata=np.array([0, 0, 0], dtype=np.uint8),
+                    skip_nodata=True,
+                    batch_size=batch_size,
+                )
+            )
+        out.append(
+            (
+                np.concatenate([b[0] for b in batches]),
+                np.concatenate([b[1] for b in batches]),
+                np.concatenate([b[2] for b in batches], axis=1),
+            )
+        )
+
+    for i in range(3):
+        np.testing.assert_array_equal(out[0][i], out[1][i])
+        np.testing.assert_array_equal(out[0][i], out[2][i])
+    assert not np.any(np.all(out[0][2] == 0, axis=0))
+
+
+###############################################################################
+# Test binary output formats
+
+
+@pytest.mark.parametrize("output_format", ["NPY", "NPZ", "Arrow", "Parquet"])
+def test_gdal2xyz_py_output_format(tmp_path, output_format):
+
+    if output_format in ("Arrow", "Parquet"):
+        pytest.importorskip("pyarrow")
+
+    src_filename = test_py_scripts.get_data_path("gcore") + "rgbsmall.tif"
+    ref_x, ref_y, ref_data, _ = gdal2xyz.gdal2xyz(
+        src_filename,
+        None,
+        band_nums=[1, 3],
+        skip_nodata=True,
+        src_nodata=0,
+        return_np_arrays=True,
+        progress_callback=None,
+    )
+
+    out_filename = str(tmp_path / f"out.{output_format.lower()}")
+    gdal2xyz.gdal2xyz(
+        src_filename,
+        out_filename,
+        band_nums=[1, 3],
+        skip_nodata=True,
+        src_nodata=0,
+        batch_size=100,
+        progress_callback=None,
+    )
+
+    if output_format in ("NPY", "NPZ"):
+        columns = np.load(out_filename)
+    elif output_format == "Arrow":
+        import pyarrow
+
+        columns = pyarrow.ipc.open_file(out_filename).read_all()
+        assert columns.to_batches()[0].num_rows <= 100
+    else:
+        import pyarrow.parquet
+
+        assert pyarrow.parquet.ParquetFile(out_filename).num_row_groups > 1
+        columns = pyarrow.parquet.read_table(out_filename)
+
+    np.testing.assert_array_equal(np.asarray(columns["x"]), ref_x)
+    np.testing.assert_array_equal(np.asarray(columns["y"]), ref_y)
+    np.testing.assert_array_equal(np.asarray(columns["band_1"]), ref_data[0])
+    np.testing.assert_array_equal(np.asarray(columns["band_3"]), ref_data[1])
+    assert np.asarray(columns["band_1"]).dtype == np.uint8
+
+
+###############################################################################
+# Test that the temporary files of the NPZ output are removed on error
+
+
+def test_gdal2xyz_py_npz_error(tmp_path, monkeypatch):
+
+    tmp_dir = tmp_path / "tmp"
+    tmp_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_dir))
+
+    def progress_callback(progress_frac):
+        raise Exception("interrupted")
+
+    src_filename = test_py_scripts.get_data_path("gcore") + "rgbsmall.tif"
+    with pytest.raises(Exception, match="interrupted"):
+        gdal2xyz.gdal2xyz(
+            src_filename,
+            str(tmp_path / "out.npz"),
+            batch_size=100,
+            progress_callback=progress_callback,
+        )
+
+    assert not os.listdir(tmp_dir)
+    assert not os.path.exists(tmp_path / "out.npz")
+
+
+def test_gdal2xyz_py_output_format_cli(script_path, tmp_path):
+
+    out_filename = str(tmp_path / "out.bin")
+
+    arguments = "-of npy -b 1 "
+    arguments += test_py_scripts.get_data_path("gcore") + "byte.tif "
+    arguments += out_filename
+
+    test_py_scripts.run_py_script(script_path, "gdal2xyz", arguments)
+
+    columns = np.load(out_filename)
+    assert columns.shape == (400,)
+    assert columns.dtype.names == ("x", "y", "band_1")
+
+    _, err = test_py_scripts.run_py_script(
+        script_path,
+        "gdal2xyz",
+        "-of foo " + test_py_scripts.get_data_path("gcore") + "byte.tif out.foo",
+        return_stderr=True,
+    )
+    assert "argument -of: Unsupported output format foo" in err
+    assert "Traceback" not in err
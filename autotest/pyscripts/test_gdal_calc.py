@@ -844,3 +844,260 @@ def test_gdal_calc_py_hidenodata(tmp_vsimem):
     out_arr = out_ds.GetRasterBand(1).ReadAsMaskedArray()
     assert not np.any(out_arr.mask)
     np.testing.assert_array_equal(out_arr, data + 1)
+
+
+@pytest.mark.parametrize("num_threads", [2, "ALL_CPUS"])
+def test_gdal_calc_py_threads(tmp_vsimem, stefan_full_rgba, num_threads):
+    """test multi-threaded calculation"""
+
+    out_serial = tmp_vsimem / "out_serial.tif"
+    out_threads = tmp_vsimem / "out_threads.tif"
+
+    with gdal.Open(stefan_full_rgba) as src_ds:
+        src_nodata = tmp_vsimem / "in_nodata.tif"
+        gdal.Translate(
+            src_nodata,
+            src_ds,
+            options="-b 2 -a_nodata 0 -co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16",
+        )
+
+    kwargs = dict(
+        calc=["A+B", "A*(B>100)"],
+        A=stefan_full_rgba,
+        B=src_nodata,
+        type="UInt16",
+        overwrite=True,
+        quiet=True,
+    )
+    gdal_calc.Calc(outfile=out_serial, **kwargs)
+    gdal_calc.Calc(outfile=out_threads, num_threads=num_threads, **kwargs)
+
+    with gdal.Open(out_serial) as ds_serial, gdal.Open(out_threads) as ds_threads:
+        np.testing.assert_array_equal(ds_serial.ReadAsArray(), ds_threads.ReadAsArray())
+
+
+@pytest.mark.parametrize("extent", ["union", "intersect"])
+@pytest.mark.parametrize("dataset_input", [False, True])
+def test_gdal_calc_py_threads_extent(tmp_vsimem, extent, dataset_input):
+    """test multi-threaded calculation on inputs with different extents"""
+
+    input1 = tmp_vsimem / "in1.tif"
+    input2 = tmp_vsimem / "in2.tif"
+
+    with gdal.GetDriverByName("GTiff").Create(
+        input1, 100, 100, 1, options=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"]
+    ) as ds:
+        ds.GetRasterBand(1).WriteArray(
+            np.arange(100 * 100, dtype=np.uint16).reshape(100, 100) % 251
+        )
+        ds.SetGeoTransform((0, 1, 0, 100, 0, -1))
+
+    if dataset_input:
+        # an in-memory dataset, which cannot be reopened by name
+        input2 = gdal.GetDriverByName("MEM").Create("", 100, 100, 1)
+        input2.GetRasterBand(1).Fill(3)
+        input2.SetGeoTransform((30, 1, 0, 120, 0, -1))
+    else:
+        with gdal.GetDriverByName("GTiff").Create(input2, 100, 100, 1) as ds:
+            ds.GetRasterBand(1).Fill(3)
+            ds.SetGeoTransform((30, 1, 0, 120, 0, -1))
+
+    out_arrays = []
+    for num_threads in (1, 4):
+        out = tmp_vsimem / f"out_{num_threads}.tif"
+        with gdal_calc.Calc(
+            a=input1,
+            b=input2,
+            calc="a+b",
+            outfile=out,
+            type="UInt16",
+            extent=extent,
+            num_threads=num_threads,
+            quiet=True,
+        ) as out_ds:
+            out_arrays.append(out_ds.ReadAsArray())
+
+    if extent == "union":
+        assert out_arrays[0].shape == (120, 130)
+    else:
+        assert out_arrays[0].shape == (80, 70)
+    assert np.any(out_arrays[0] != 0)
+    np.testing.assert_array_equal(out_arrays[0], out_arrays[1])
+
+
+@pytest.mark.parametrize(
+    "calc",
+    [
+        "A",
+        "A+1",
+        "(A+B)*2-log10(A+1)",
+        "numpy.maximum(A, B) > 100",
+        "-A + (B // 3) ** 2 % 7",
+        "where(A > B, A - B, 0) * 0.5",
+    ],
+)
+def test_gdal_calc_py_optimize(tmp_vsimem, stefan_full_rgba, calc):
+    """test evaluation of the calculation with reused intermediate buffers"""
+
+    src = tmp_vsimem / "in_tiled.tif"
+    gdal.Translate(
+        src,
+        gdal.Open(stefan_full_rgba),
+        options="-co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16",
+    )
+
+    kwargs = dict(calc=calc, A=src, B=src, B_band=2, format="MEM", quiet=True)
+    ds_ref = gdal_calc.Calc(**kwargs)
+    ds = gdal_calc.Calc(optimize=True, **kwargs)
+    np.testing.assert_array_equal(ds_ref.ReadAsArray(), ds.ReadAsArray())
+
+
+def test_gdal_calc_py_unknown_name(tmp_vsimem, stefan_full_rgba):
+    """test that names used by the calculation are checked before processing"""
+
+    with pytest.raises(Exception, match="Unknown name 'C'"):
+        gdal_calc.Calc(calc="A+C", A=stefan_full_rgba, format="MEM", quiet=True)
+
+
+def test_gdal_calc_py_calc_expression():
+    """test the lowering of a calculation to numpy ufuncs"""
+
+    expr = gdal_calc.CalcExpression(
+        "log10(A+1)*2",
+        global_namespace={"log10": np.log10},
+        local_names=["A"],
+        optimize=True,
+    )
+    assert [step[0] for step in expr.steps] == [
+        "eval",
+        "const",
+        "ufunc",
+        "ufunc",
+        "const",
+        "ufunc",
+    ]
+
+    for i in range(3):
+        a = np.arange(12, dtype=np.float64).reshape(3, 4) + i
+        res = expr.evaluate({"log10": np.log10}, {"A": a})
+        np.testing.assert_array_equal(res, np.log10(a + 1) * 2)
+
+
+@pytest.mark.parametrize("out_type", ["Byte", "Int16", "Float32"])
+def test_gdal_calc_py_nodata_propagation(tmp_vsimem, out_type):
+    """test that nodata of any input is written as output nodata"""
+
+    input1 = tmp_vsimem / "in1.tif"
+    input2 = tmp_vsimem / "in2.tif"
+
+    with gdal.GetDriverByName("GTiff").Create(input1, 2, 2) as ds:
+        ds.GetRasterBand(1).WriteArray(np.array([[0, 1], [2, 3]]))
+        ds.GetRasterBand(1).SetNoDataValue(0)
+
+    with gdal.GetDriverByName("GTiff").Create(input2, 2, 2) as ds:
+        ds.GetRasterBand(1).WriteArray(np.array([[5, 0], [6, 7]]))
+        ds.GetRasterBand(1).SetNoDataValue(0)
+
+    out_ds = gdal_calc.Calc(
+        A=input1,
+        B=input2,
+        calc="A+B",
+        NoDataValue=200,
+        type=out_type,
+        format="MEM",
+        quiet=True,
+    )
+    np.testing.assert_array_equal(out_ds.ReadAsArray(), [[200, 200], [8, 10]])
+
+
+def test_gdal_calc_py_masked(tmp_vsimem):
+    """test --masked option"""
+
+    input1 = tmp_vsimem / "in1.tif"
+    input2 = tmp_vsimem / "in2.tif"
+
+    with gdal.GetDriverByName("GTiff").Create(input1, 2, 2) as ds:
+        ds.GetRasterBand(1).WriteArray(np.array([[0, 1], [0, 3]]))
+        ds.GetRasterBand(1).SetNoDataValue(0)
+
+    with gdal.GetDriverByName("GTiff").Create(input2, 2, 2) as ds:
+        ds.GetRasterBand(1).WriteArray(np.array([[5, 0], [0, 7]]))
+        ds.GetRasterBand(1).SetNoDataValue(0)
+
+    kwargs = dict(
+        A=[input1, input2], calc="A.sum(axis=0)", NoDataValue=255, format="MEM"
+    )
+
+    out_ds = gdal_calc.Calc(quiet=True, **kwargs)
+    np.testing.assert_array_equal(out_ds.ReadAsArray(), [[255, 255], [255, 10]])
+
+    out_ds = gdal_calc.Calc(masked=True, quiet=True, **kwargs)
+    np.testing.assert_array_equal(out_ds.ReadAsArray(), [[5, 1], [255, 10]])
+
+
+@pytest.mark.parametrize(
+    "block_sizes,dimensions,max_window_pixels,expected",
+    [
+        ([(256, 256)], (1000, 1000), 1 << 22, (256, 256)),
+        ([(1000, 1)], (1000, 1000), 1 << 22, (1000, 1)),
+        ([(256, 256), (512, 512), (1000, 8)], (1000, 1000), 1 << 22, (1000, 512)),
+        ([(40000, 1), (512, 512)], (40000, 40000), 1 << 22, (8192, 512)),
+        ([(40000, 40000)], (40000, 40000), 1 << 22, (40000, 104)),
+    ],
+)
+def test_gdal_calc_py_get_window_size(
+    block_sizes, dimensions, max_window_pixels, expected
+):
+
+    assert (
+        gdal_calc.get_window_size(block_sizes, dimensions, max_window_pixels)
+        == expected
+    )
+
+
+def test_gdal_calc_py_get_read_amplification():
+
+    dimensions = (40000, 40000)
+    window_size = (8192, 512)
+    assert gdal_calc.get_read_amplification((512, 512), window_size, dimensions) == 1
+    assert gdal_calc.get_read_amplification((40000, 1), window_size, dimensions) == 5
+    # the strips of a row of windows fit in the block cache
+    assert (
+        gdal_calc.get_read_amplification(
+            (40000, 1), window_size, dimensions, 40000, 1 << 30
+        )
+        == 1
+    )
+    assert gdal_calc.get_read_amplification((256, 256), (300, 300), (1000, 1000)) == (
+        49 / 16
+    )
+
+
+def test_gdal_calc_py_mixed_block_layouts(tmp_vsimem, stefan_full_rgba):
+    """test inputs with different block layouts"""
+
+    striped = tmp_vsimem / "striped.tif"
+    tiled = tmp_vsimem / "tiled.tif"
+    out = tmp_vsimem / "out.tif"
+
+    with gdal.Open(stefan_full_rgba) as src_ds:
+        gdal.Translate(striped, src_ds, options="-b 1 -co BLOCKYSIZE=3")
+        gdal.Translate(
+            tiled,
+            src_ds,
+            options="-b 2 -co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=32",
+        )
+        expected = src_ds.GetRasterBand(1).ReadAsArray().astype(
+            np.uint16
+        ) + src_ds.GetRasterBand(2).ReadAsArray().astype(np.uint16)
+
+    ds = gdal_calc.Calc(
+        calc="A.astype(numpy.uint16)+B",
+        A=striped,
+        B=tiled,
+        outfile=out,
+        type="UInt16",
+        hideNoData=True,
+        quiet=True,
+    )
+    np.testing.assert_array_equal(ds.ReadAsArray(), expected)
@@ -12,6 +12,7 @@
 ###############################################################################
 
 
+import json
 import os
 
 import gdaltest
@@ -260,3 +261,150 @@ def test_gdal_merge_5(script_path, tmp_path):
         assert ds.GetRasterBand(2).Checksum() == cs, "Wrong checksum"
         assert ds.GetRasterBand(3).Checksum() == 0, "Wrong checksum"
         assert ds.GetRasterBand(4).Checksum() == cs, "Wrong checksum"
+
+
+###############################################################################
+# Test -windowed option
+
+
+@pytest.mark.parametrize(
+    "options", ["", "-separate", "-n 0", "-n 63 -init 10", "-ps 0.05 0.05"]
+)
+def test_gdal_merge_windowed(script_path, tmp_path, sample_tifs, options):
+    pytest.importorskip("numpy")
+
+    output_tif = str(tmp_path / "test_gdal_merge_windowed_ref.tif")
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_merge",
+        f"-q {options} -o {output_tif} {' '.join(sample_tifs)}",
+    )
+    with gdal.Open(output_tif) as ds:
+        expected_cs = [
+            ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)
+        ]
+
+    output_tif = str(tmp_path / "test_gdal_merge_windowed.tif")
+    # Small blocks, to get several windows
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_merge",
+        f"-q -windowed -co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16 {options} -o {output_tif} {' '.join(sample_tifs)}",
+    )
+    with gdal.Open(output_tif) as ds:
+        assert [
+            ds.GetRasterBand(i + 1).Checksum() for i in range(ds.RasterCount)
+        ] == expected_cs
+
+
+@pytest.mark.parametrize("nodata", [None, 63])
+@pytest.mark.parametrize(
+    "num_workers,use_processes", [(1, False), (2, False), (2, True)]
+)
+def test_gdal_merge_copy_by_windows(
+    script_path, tmp_path, sample_tifs, nodata, num_workers, use_processes
+):
+    gdal_merge = pytest.importorskip("osgeo_utils.gdal_merge")
+    pytest.importorskip("numpy")
+
+    ref_tif = str(tmp_path / "test_gdal_merge_copy_by_windows_ref.tif")
+    test_py_scripts.run_py_script(
+        script_path,
+        "gdal_merge",
+        f"-q {'' if nodata is None else f'-n {nodata}'} -ps 0.05 0.05 -o {ref_tif} {' '.join(sample_tifs)}",
+    )
+
+    with gdal.Open(ref_tif) as ref_ds:
+        ds = gdal.GetDriverByName("MEM").Create(
+            "", ref_ds.RasterXSize, ref_ds.RasterYSize
+        )
+        ds.SetGeoTransform(ref_ds.GetGeoTransform())
+        expected_cs = ref_ds.GetRasterBand(1).Checksum()
+
+    windows = gdal_merge.get_output_windows(ds, window_pixels=100)
+    assert len(windows) > 4
+    covered = set()
+    for xoff, yoff, xsize, ysize in windows:
+        for y in range(yoff, yoff + ysize):
+            for x in range(xoff, xoff + xsize):
+                assert (x, y) not in covered
+                covered.add((x, y))
+    assert len(covered) == ds.RasterXSize * ds.RasterYSize
+
+    file_infos = gdal_merge.names_to_fileinfos(sample_tifs)
+    gdal_merge.copy_by_windows(
+        ds,
+        file_infos,
+        1,
+        nodata=nodata,
+        num_workers=num_workers,
+        use_processes=use_processes,
+        window_pixels=100,
+        quiet=1,
+    )
+
+    assert ds.GetRasterBand(1).Checksum() == expected_cs
+
+
+###############################################################################
+# Test -threads, -processes and -metadata_cache options
+
+
+@pytest.mark.parametrize("options", ["-threads 2", "-processes 2"])
+def test_gdal_merge_parallel(script_path, tmp_path, sample_tifs, options):
+    pytest.importorskip("numpy")
+
+    output_tif = str(tmp_path / "test_gdal_merge_parallel.tif")
+    metadata_cache = str(tmp_path / "metadata_cache.json")
+
+    for _ in range(2):
+        if os.path.exists(output_tif):
+            os.unlink(output_tif)
+        test_py_scripts.run_py_script(
+            script_path,
+            "gdal_merge",
+            f"-q {options} -metadata_cache {metadata_cache} -o {output_tif} {' '.join(sample_tifs)}",
+        )
+
+        with gdal.Open(output_tif) as ds:
+            assert ds.GetGeoTransform() == pytest.approx([2, 0.1, 0, 49, 0, -0.1])
+            assert ds.GetRasterBand(1).Checksum() == 3508
+
+    with open(metadata_cache) as f:
+        assert len(json.load(f)) == len(sample_tifs)
+
+
+def test_gdal_merge_metadata_cache(tmp_path):
+    gdal_merge = pytest.importorskip("osgeo_utils.gdal_merge")
+
+    input_tif = str(tmp_path / "in.tif")
+    with gdal.GetDriverByName("GTiff").Create(input_tif, 2, 3) as ds:
+        ds.SetGeoTransform([2, 0.5, 0, 49, 0, -0.5])
+        ct = gdal.ColorTable()
+        ct.SetColorEntry(0, (1, 2, 3, 255))
+        ct.SetColorEntry(1, (4, 5, 6, 255))
+        ds.GetRasterBand(1).SetRasterColorTable(ct)
+
+    metadata_cache = {}
+    (fi,) = gdal_merge.names_to_fileinfos([input_tif], 2, metadata_cache)
+    assert list(metadata_cache) == [os.path.abspath(input_tif)]
+
+    (cached_fi,) = gdal_merge.names_to_fileinfos([input_tif], 1, metadata_cache)
+    assert cached_fi.to_dict() == fi.to_dict()
+    assert (cached_fi.ulx, cached_fi.uly, cached_fi.lrx, cached_fi.lry) == (
+        2,
+        49,
+        3,
+        47.5,
+    )
+    assert cached_fi.ct.GetColorEntry(1) == (4, 5, 6, 255)
+
+    # Modified file
+    with gdal.Open(input_tif, gdal.GA_Update) as ds:
+        ds.SetGeoTransform([3, 0.5, 0, 49, 0, -0.5])
+    os.utime(input_tif, (0, 0))
+    (fi,) = gdal_merge.names_to_fileinfos([input_tif], 1, metadata_cache)
+    assert fi.ulx == 3
+    assert metadata_cache[os.path.abspath(input_tif)]["metadata"]["geotransform"][
+        0
+    ] == pytest.approx(3)
@@ -502,3 +502,129 @@ def test_gdal_retile_different_srs(script_path, tmp_path, srs1, srs2, expected_e
     )
     assert expected_err in err
     assert len(glob.glob(os.path.join(str(out_dir), "*.tif"))) == 0
+
+
+###############################################################################
+# Test gdal_retile with many input tiles and a small dataset cache
+
+
+def _create_input_tiles(tmp_path, count_x, count_y):
+
+    drv = gdal.GetDriverByName("GTiff")
+    srs = osr.SpatialReference()
+    srs.SetWellKnownGeogCS("WGS84")
+    wkt = srs.ExportToWkt()
+
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    filenames = []
+    for y in range(count_y):
+        for x in range(count_x):
+            filename = str(in_dir / f"in_{y}_{x}.tif")
+            with drv.Create(filename, 30, 20, 1) as ds:
+                ds.SetProjection(wkt)
+                ds.SetGeoTransform([x * 3, 0.1, 0, 40 - y * 2, 0, -0.1])
+                ds.GetRasterBand(1).Fill(x * 10 + y)
+            filenames.append(filename)
+    return filenames
+
+
+def _get_tiles_checksums(out_dir):
+
+    checksums = {}
+    for filename in glob.glob(
+        os.path.join(str(out_dir), "**", "*.tif"), recursive=True
+    ):
+        with gdal.Open(filename) as ds:
+            checksums[os.path.relpath(filename, str(out_dir))] = ds.GetRasterBand(
+                1
+            ).Checksum()
+    return checksums
+
+
+def test_gdal_retile_cache_size(script_path, tmp_path):
+
+    filenames = _create_input_tiles(tmp_path, 7, 5)
+
+    checksums = []
+    for options in ("", "-cacheSize 1"):
+        out_dir = tmp_path / f"out{len(checksums)}"
+        out_dir.mkdir()
+        test_py_scripts.run_py_script(
+            script_path,
+            "gdal_retile",
+            f"-q -levels 2 -ps 45 25 {options} -targetDir {out_dir} {' '.join(filenames)}",
+        )
+        checksums.append(_get_tiles_checksums(out_dir))
+
+    assert len(checksums[0]) == 5 * 4 + 3 * 2 + 2 * 1
+    assert checksums[1] == checksums[0]
+
+
+###############################################################################
+# Test gdal_retile -j
+
+
+@pytest.mark.parametrize(
+    "options,jobs_options",
+    [("", "-j 4"), ("-useDirForEachRow", "-useDirForEachRow -j 3 -cacheSize 1")],
+)
+def test_gdal_retile_jobs(script_path, tmp_path, options, jobs_options):
+
+    filenames = _create_input_tiles(tmp_path, 7, 5)
+
+    results = []
+    for run_options in (options, jobs_options):
+        out_dir = tmp_path / f"out{len(results)}"
+        out_dir.mkdir()
+        test_py_scripts.run_py_script(
+            script_path,
+            "gdal_retile",
+            f"-q -levels 2 -ps 45 25 -csv tiles.csv {run_options} -targetDir {out_dir} {' '.join(filenames)}",
+        )
+        csv_contents = {}
+        for csv_file in glob.glob(
+            os.path.join(str(out_dir), "**", "tiles.csv"), recursive=True
+        ):
+            with open(csv_file) as f:
+                csv_contents[os.path.relpath(csv_file, str(out_dir))] = f.read()
+        results.append((_get_tiles_checksums(out_dir), csv_contents))
+
+    assert len(results[0][0]) == 5 * 4 + 3 * 2 + 2 * 1
+    assert len(results[0][1]) == 3
+    # Same tiles, and same tile indexes
+    assert results[1] == results[0]
+
+
+def test_gdal_retile_dataset_cache(tmp_path):
+
+    gdal_retile = pytest.importorskip("osgeo_utils.gdal_retile")
+
+    filenames = _create_input_tiles(tmp_path, 3, 1)
+    cache = gdal_retile.DataSetCache(2)
+    ds0 = cache.get(filenames[0])
+    cache.get(filenames[1])
+    # Most recently used
+    assert cache.get(filenames[0]) is ds0
+    cache.get(filenames[2])
+    assert list(cache.dict) == [filenames[0], filenames[2]]
+
+    # The size of the cache is shared between the threads
+    assert gdal_retile.ThreadDataSetCache(64, 4).cacheSize == 16
+    assert gdal_retile.ThreadDataSetCache(2, 3).cacheSize == 1
+
+
+@pytest.mark.parametrize(
+    "options,error",
+    [("-j 0", "Invalid number of jobs"), ("-cacheSize 0", "Invalid cache size")],
+)
+def test_gdal_retile_invalid_options(script_path, tmp_path, options, error):
+
+    _, err = test_py_scripts.run_py_script(
+        script_path,
+        "gdal_retile",
+        f"{options} -targetDir {tmp_path} in.tif",
+        return_stderr=True,
+    )
+    assert error in err
+    assert "Usage: gdal_retile" in err
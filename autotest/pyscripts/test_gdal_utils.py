@@ -32,6 +32,7 @@ from osgeo_utils.auxiliary import array_util, base, color_table, raster_creation
 from osgeo_utils.auxiliary.color_palette import ColorPalette
 from osgeo_utils.auxiliary.color_table import get_color_table
 from osgeo_utils.auxiliary.extent_util import Extent
+from osgeo_utils.auxiliary.rectangle_index import RectangleIndex
 
 
 def test_utils_py_0():
@@ -300,3 +301,33 @@ def test_utils_util_GetOutputDriverFor():
     assert util.GetOutputDriverFor("foo.img") == "HFA"
     assert util.GetOutputDriverFor("foo.nc") == "netCDF"
     assert util.GetOutputDriverFor("foo.geojson", is_raster=False) == "GeoJSON"
+
+
+@pytest.mark.parametrize("node_capacity", [2, 16])
+def test_utils_rectangle_index(node_capacity):
+    """test rectangle_index.RectangleIndex"""
+
+    rectangles = []
+    for i in range(50):
+        for j in range(50):
+            rectangles.append(None if (i + j) % 7 == 0 else (i, j, i + 1.5, j + 0.5))
+    index = RectangleIndex(rectangles, node_capacity)
+    assert len(index) == len([rect for rect in rectangles if rect is not None])
+
+    for query in (
+        (0, 0, 0, 0),
+        (10.2, 20.2, 13.7, 25),
+        (-5, -5, 100, 100),
+        (60, 0, 70, 1),
+    ):
+        assert index.query(*query) == [
+            i
+            for i, rect in enumerate(rectangles)
+            if rect is not None
+            and rect[0] <= query[2]
+            and rect[2] >= query[0]
+            and rect[1] <= query[3]
+            and rect[3] >= query[1]
+        ]
+
+    assert RectangleIndex([]).query(0, 0, 1, 1) == []
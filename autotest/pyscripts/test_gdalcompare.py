@@ -12,6 +12,7 @@
 # SPDX-License-Identifier: MIT
 ###############################################################################
 
+import os
 import shutil
 
 import gdaltest
@@ -320,3 +321,167 @@ def test_gdalcompare_different_overview(tmp_vsimem, captured_print, source_filen
         )
         == 1
     )
+
+
+###############################################################################
+
+
+def test_gdalcompare_band_pixels(tmp_vsimem, source_filename):
+
+    np = pytest.importorskip("numpy")
+    gdaltest.importorskip_gdal_array()
+
+    golden_ds = gdal.Open(source_filename)
+    golden = golden_ds.GetRasterBand(1).ReadAsArray().astype(np.float64)
+    new = golden.copy()
+    new[2:5, 3:7] += 3
+    new[10, 10] -= 200
+    new_ds = gdal.GetDriverByName("MEM").Create("", 20, 20, 1, gdal.GDT_Float64)
+    new_ds.GetRasterBand(1).WriteArray(new)
+    diff_ds = gdal.GetDriverByName("MEM").Create("", 20, 20, 1, gdal.GDT_Float64)
+
+    stats = gdalcompare.compare_band_pixels(
+        golden_ds.GetRasterBand(1),
+        new_ds.GetRasterBand(1),
+        diff_ds.GetRasterBand(1),
+        max_window_pixels=40,
+    )
+    assert stats.pixel_count == 400
+    assert stats.diff_count == 13
+    assert stats.max_diff == 200
+    assert stats.mean_diff == pytest.approx((12 * 3 + 200) / 400)
+    assert stats.rmse == pytest.approx(((12 * 9 + 200 * 200) / 400) ** 0.5)
+    assert stats.histogram == [0, 0, 0, 12, 0, 1, 0, 0]
+    assert sum(sum(h) for h in stats.block_histograms.values()) == 13
+    np.testing.assert_array_equal(diff_ds.GetRasterBand(1).ReadAsArray(), golden - new)
+
+
+###############################################################################
+
+
+@pytest.mark.parametrize("offset,max_diff", [(0, "0"), (3, "3.0")])
+def test_gdalcompare_image_pixels_report(
+    tmp_vsimem, source_filename, monkeypatch, offset, max_diff
+):
+
+    pytest.importorskip("numpy")
+    gdaltest.importorskip_gdal_array()
+
+    lines = []
+    monkeypatch.setattr(gdalcompare, "my_print", lines.append)
+
+    golden_ds = gdal.Open(source_filename)
+    new_ds = gdal.Translate("", golden_ds, format="MEM", outputType=gdal.GDT_Int16)
+    new_band = new_ds.GetRasterBand(1)
+    new_band.WriteArray(new_band.ReadAsArray() + offset)
+
+    gdalcompare.compare_image_pixels(golden_ds.GetRasterBand(1), new_band, "1")
+    assert "  Maximum Pixel Difference: " + max_diff in lines
+
+
+###############################################################################
+
+
+def test_gdalcompare_threads(tmp_vsimem, captured_print, source_filename):
+
+    golden_filename = str(tmp_vsimem / "golden.tif")
+    filename = str(tmp_vsimem / "new.tif")
+    gdal.Translate(golden_filename, source_filename, options="-b 1 -b 1 -b 1")
+    gdal.Translate(filename, golden_filename, options="-scale_2 0 1 0 0")
+
+    for num_threads in ("1", "2", "ALL_CPUS"):
+        options = ["SKIP_BINARY", "NUM_THREADS=" + num_threads]
+        assert (
+            gdalcompare.find_diff(golden_filename, golden_filename, options=options)
+            == 0
+        )
+        assert gdalcompare.find_diff(golden_filename, filename, options=options) == 1
+
+
+###############################################################################
+
+
+def test_gdalcompare_quick(tmp_vsimem, captured_print, source_filename):
+
+    golden_filename = str(tmp_vsimem / "golden.tif")
+    gdal.Translate(
+        golden_filename,
+        source_filename,
+        options="-co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16",
+    )
+    same_filename = str(tmp_vsimem / "same.tif")
+    gdal.FileFromMemBuffer(same_filename, gdal.VSIFile(golden_filename, "rb").read())
+    assert gdalcompare.compare_files(golden_filename, same_filename)
+    assert gdalcompare.find_diff(golden_filename, same_filename, options=["QUICK"]) == 0
+
+    filename = str(tmp_vsimem / "new.tif")
+    ds = gdal.Translate(filename, golden_filename)
+    ds.GetRasterBand(1).WriteRaster(0, 9, 1, 1, b"\x00")
+    ds = None
+    assert gdalcompare.compare_files(golden_filename, filename) is False
+    assert gdalcompare.find_diff(golden_filename, filename, options=["QUICK"]) == 2
+
+    ds = gdal.Open(filename)
+    windows = gdalcompare.find_diff_windows(
+        gdal.Open(golden_filename).GetRasterBand(1), ds.GetRasterBand(1)
+    )
+    assert windows == [(0, 0, 16, 16)]
+
+
+###############################################################################
+# Test that files of same size and modification time are compared by content
+
+
+def test_gdalcompare_quick_same_mtime(tmp_path, captured_print, source_filename):
+
+    golden_filename = str(tmp_path / "golden.tif")
+    gdal.Translate(golden_filename, source_filename)
+    filename = str(tmp_path / "new.tif")
+    ds = gdal.Translate(filename, golden_filename)
+    ds.GetRasterBand(1).WriteRaster(0, 9, 1, 1, b"\x00")
+    ds = None
+    assert os.path.getsize(golden_filename) == os.path.getsize(filename)
+    os.utime(filename, ns=(0, 0))
+    os.utime(golden_filename, ns=(0, 0))
+
+    assert gdalcompare.compare_files(golden_filename, filename) is False
+    assert gdalcompare.find_diff(golden_filename, filename, options=["QUICK"]) == 2
+
+
+###############################################################################
+
+
+def test_gdalcompare_fail_fast(tmp_vsimem, captured_print, source_filename):
+
+    golden_filename = source_filename
+    filename = str(tmp_vsimem / "new.tif")
+    gdal.Translate(
+        filename, golden_filename, options="-a_srs EPSG:4326 -mo FOO=BAR -scale 0 1 0 0"
+    )
+    assert (
+        gdalcompare.find_diff(golden_filename, filename, options=["SKIP_BINARY"]) == 3
+    )
+    assert gdalcompare.find_diff(golden_filename, filename, options=["FAIL_FAST"]) == 1
+    assert (
+        gdalcompare.find_diff(
+            golden_filename,
+            filename,
+            options=["SKIP_BINARY", "SKIP_SRS", "SKIP_METADATA", "QUICK", "FAIL_FAST"],
+        )
+        == 1
+    )
+
+
+###############################################################################
+
+
+def test_gdalcompare_quick_fail_fast_cli(script_path, tmp_path):
+
+    source_filename = str(tmp_path / "src.tif")
+    shutil.copy("../gcore/data/byte.tif", source_filename)
+    ret = test_py_scripts.run_py_script(
+        script_path,
+        "gdalcompare",
+        f"-quick -fail_fast {source_filename} {source_filename}",
+    )
+    assert "Differences Found: 0" in ret
@@ -201,3 +201,89 @@ def test_gdallocationinfo_py_7(tmp_path):
                 outputs = list(zip(x, y, pixels, lines, *results))
                 print(f"ovr: {ovr_idx}, srs: {srs}, x/y/pixel/line/result: {outputs}")
             assert_allclose(expected, actual, rtol=1e-4, atol=1e-3)
+
+
+@pytest.mark.parametrize(
+    "resample_alg",
+    [
+        gdal.GRIORA_NearestNeighbour,
+        gdal.GRIORA_Bilinear,
+        gdal.GRIORA_Cubic,
+        gdal.GRIORA_CubicSpline,
+    ],
+)
+def test_gdallocationinfo_py_sample_bands(tmp_path, resample_alg):
+
+    test_tif = str(tmp_path / "test_gdallocationinfo_py_sample_bands.tif")
+    gdal.Translate(
+        test_tif,
+        "../gcore/data/byte.tif",
+        options="-b 1 -b 1 -outsize 40 40 -co TILED=YES -co BLOCKXSIZE=16 -co BLOCKYSIZE=16",
+    )
+    ds = gdal.Open(test_tif)
+    bands = [ds.GetRasterBand(1), ds.GetRasterBand(2)]
+
+    rng = np.random.default_rng(0)
+    pixels = rng.uniform(2, 38, 500)
+    lines = rng.uniform(2, 38, 500)
+    results = gdallocationinfo.sample_bands(bands, pixels, lines, resample_alg)
+    assert results.shape == (2, 500)
+    assert results.dtype == np.uint8
+
+    # Compare with RasterIO() of a 1x1 window centered on each point
+    for idx in range(0, 500, 10):
+        expected = bands[0].ReadAsArray(
+            pixels[idx] - 0.5,
+            lines[idx] - 0.5,
+            1,
+            1,
+            resample_alg=resample_alg,
+        )[0][0]
+        assert results[0][idx] == pytest.approx(expected, abs=1)
+        assert results[1][idx] == results[0][idx]
+
+    if resample_alg == gdal.GRIORA_NearestNeighbour:
+        data = bands[0].ReadAsArray()
+        assert np.array_equal(results[0], data[lines.astype(int), pixels.astype(int)])
+
+    # Points outside of the raster get the nodata value, or 0
+    bands[1].SetNoDataValue(255)
+    results = gdallocationinfo.sample_bands(
+        bands, [-1, 5.5, 40, 5.5], [5.5, 40, 5.5, 5.5], resample_alg
+    )
+    assert list(results[0][:3]) == [0, 0, 0]
+    assert list(results[1][:3]) == [255, 255, 255]
+    assert results[0][3] == bands[0].ReadAsArray(5, 5, 1, 1)[0][0]
+
+
+@pytest.mark.parametrize("dtype", [None, np.float64, np.int16])
+def test_gdallocationinfo_py_sample_bands_mixed_types(dtype):
+
+    src_ds = gdal.Open("../gcore/data/byte.tif")
+    ds = gdal.GetDriverByName("MEM").Create("", 20, 20, 1, gdal.GDT_Byte)
+    ds.AddBand(gdal.GDT_Float64)
+    data = src_ds.GetRasterBand(1).ReadAsArray()
+    ds.GetRasterBand(1).WriteArray(data)
+    ds.GetRasterBand(2).WriteArray(data * 1000.25)
+    bands = [ds.GetRasterBand(2), ds.GetRasterBand(1)]
+
+    # GRIORA_Average is sampled by one RasterIO() call per point
+    pixels = [2.5, 7.25, 13.75]
+    lines = [3.5, 11.5, 8.0]
+    results = gdallocationinfo.sample_bands(
+        bands, pixels, lines, gdal.GRIORA_Average, dtype=dtype
+    )
+    assert results.dtype == (np.float64 if dtype is None else dtype)
+
+    for idx in range(len(pixels)):
+        for bnd_idx, band in enumerate(bands):
+            expected = band.ReadAsArray(
+                pixels[idx] - 0.5,
+                lines[idx] - 0.5,
+                1,
+                1,
+                resample_alg=gdal.GRIORA_Average,
+            )[0][0]
+            if dtype == np.int16:
+                expected = np.clip(np.floor(expected + 0.5), -32768, 32767)
+            assert results[bnd_idx][idx] == pytest.approx(expected)
@@ -453,3 +453,210 @@ def test_ogr_layer_algebra_erase(script_path, tmp_path):
     featureCount = layer.GetFeatureCount()
 
     assert featureCount == 2
+
+
+###############################################################################
+# Test -j against a serial run, on overlapping grids of polygons
+
+
+def _create_polygon_grid(filename, field_name, origin, step, size, count):
+
+    ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(filename)
+    lyr = ds.CreateLayer("poly", geom_type=ogr.wkbPolygon)
+    lyr.CreateField(ogr.FieldDefn(field_name, ogr.OFTInteger))
+    for j in range(count):
+        for i in range(count):
+            x = origin + i * step
+            y = origin + j * step
+            feat = ogr.Feature(lyr.GetLayerDefn())
+            feat[field_name] = j * count + i
+            feat.SetGeometryDirectly(
+                ogr.CreateGeometryFromWkt(
+                    f"POLYGON(({x} {y},{x} {y + size},{x + size} {y + size},{x + size} {y},{x} {y}))"
+                )
+            )
+            lyr.CreateFeature(feat)
+    # A feature straddling many partitions
+    feat = ogr.Feature(lyr.GetLayerDefn())
+    feat[field_name] = count * count
+    feat.SetGeometryDirectly(
+        ogr.CreateGeometryFromWkt(
+            f"POLYGON(({origin} {origin + 0.5},{origin + step * count} {origin + 0.25},{origin + step * count} {origin + 0.75},{origin} {origin + 0.5}))"
+        )
+    )
+    lyr.CreateFeature(feat)
+
+
+def _get_result_features(filename):
+
+    ds = ogr.Open(filename)
+    lyr = ds.GetLayer(0)
+    layer_defn = lyr.GetLayerDefn()
+    field_names = [
+        layer_defn.GetFieldDefn(i).GetName() for i in range(layer_defn.GetFieldCount())
+    ]
+    features = sorted(
+        tuple(feat.GetField(i) for i in range(len(field_names)))
+        + (
+            (
+                None
+                if feat.GetGeometryRef() is None
+                else round(feat.GetGeometryRef().GetArea(), 6)
+            ),
+        )
+        for feat in lyr
+    )
+    return field_names, features
+
+
+@pytest.mark.parametrize(
+    "op_str",
+    ["Intersection", "Union", "SymDifference", "Identity", "Update", "Clip", "Erase"],
+)
+@pytest.mark.parametrize("input_fields", ["ALL", "a_id"])
+def test_ogr_layer_algebra_jobs(script_path, tmp_path, op_str, input_fields):
+
+    input_path = str(tmp_path / "input_layer.shp")
+    method_path = str(tmp_path / "method_layer.shp")
+    _create_polygon_grid(input_path, "a_id", 0, 1, 1, 12)
+    _create_polygon_grid(method_path, "b_id", -0.7, 1.3, 0.9, 10)
+
+    results = []
+    for jobs in (1, 4):
+        output_path = str(tmp_path / f"output_layer_{jobs}.shp")
+        _, err = test_py_scripts.run_py_script(
+            script_path,
+            "ogr_layer_algebra",
+            f"{op_str} -input_ds {input_path} -method_ds {method_path} -output_ds {output_path} -input_fields {input_fields} -j {jobs} -q",
+            return_stderr=True,
+        )
+        assert "ERROR" not in err
+        results.append(_get_result_features(output_path))
+
+    assert results[1] == results[0]
+    assert len(results[0][1]) > 0
+
+
+###############################################################################
+# Test -j with result features whose envelope center is outside of them
+
+
+@pytest.mark.parametrize(
+    "op_str",
+    ["Intersection", "Union", "SymDifference", "Identity", "Update", "Clip", "Erase"],
+)
+def test_ogr_layer_algebra_jobs_concave(script_path, tmp_path, op_str):
+
+    input_path = str(tmp_path / "input_layer.shp")
+    method_path = str(tmp_path / "method_layer.shp")
+
+    ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(input_path)
+    lyr = ds.CreateLayer("input", geom_type=ogr.wkbPolygon)
+    lyr.CreateField(ogr.FieldDefn("a_id", ogr.OFTInteger))
+    for i, wkt in enumerate(
+        [
+            # Donut
+            "POLYGON((0 0,0 10,10 10,10 0,0 0),(1 1,9 1,9 9,1 9,1 1))",
+            # U shape
+            "POLYGON((11 0,11 10,12 10,12 2,19 2,19 10,20 10,20 0,11 0))",
+        ]
+    ):
+        feat = ogr.Feature(lyr.GetLayerDefn())
+        feat["a_id"] = i
+        feat.SetGeometryDirectly(ogr.CreateGeometryFromWkt(wkt))
+        lyr.CreateFeature(feat)
+    ds = None
+
+    ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(method_path)
+    lyr = ds.CreateLayer("method", geom_type=ogr.wkbPolygon)
+    lyr.CreateField(ogr.FieldDefn("b_id", ogr.OFTInteger))
+    feat = ogr.Feature(lyr.GetLayerDefn())
+    feat["b_id"] = 0
+    feat.SetGeometryDirectly(
+        ogr.CreateGeometryFromWkt("POLYGON((-1 -1,-1 0.5,0.5 0.5,0.5 -1,-1 -1))")
+    )
+    lyr.CreateFeature(feat)
+    ds = None
+
+    results = []
+    for jobs in (1, 4):
+        output_path = str(tmp_path / f"output_layer_{jobs}.shp")
+        _, err = test_py_scripts.run_py_script(
+            script_path,
+            "ogr_layer_algebra",
+            f"{op_str} -input_ds {input_path} -method_ds {method_path} -output_ds {output_path} -j {jobs} -q",
+            return_stderr=True,
+        )
+        assert "ERROR" not in err
+        results.append(_get_result_features(output_path))
+
+    assert results[1] == results[0]
+    assert len(results[0][1]) > 0
+
+
+###############################################################################
+# Test -j with features without geometry, which are skipped by the operations
+
+
+@pytest.mark.parametrize(
+    "op_str",
+    ["Intersection", "Union", "SymDifference", "Identity", "Update", "Clip", "Erase"],
+)
+def test_ogr_layer_algebra_jobs_null_geometry(script_path, tmp_path, op_str):
+
+    input_path = str(tmp_path / "input_layer.shp")
+    method_path = str(tmp_path / "method_layer.shp")
+
+    for path, field_name, wkts in (
+        (
+            input_path,
+            "a_id",
+            [
+                None,
+                "POLYGON((0 0,0 1,1 1,1 0,0 0))",
+                None,
+                "POLYGON((5 5,5 6,6 6,6 5,5 5))",
+            ],
+        ),
+        (
+            method_path,
+            "b_id",
+            ["POLYGON((0.5 0.5,0.5 5.5,5.5 5.5,5.5 0.5,0.5 0.5))", None],
+        ),
+    ):
+        ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(path)
+        lyr = ds.CreateLayer(field_name, geom_type=ogr.wkbPolygon)
+        lyr.CreateField(ogr.FieldDefn(field_name, ogr.OFTInteger))
+        for i, wkt in enumerate(wkts):
+            feat = ogr.Feature(lyr.GetLayerDefn())
+            feat[field_name] = i
+            if wkt:
+                feat.SetGeometryDirectly(ogr.CreateGeometryFromWkt(wkt))
+            lyr.CreateFeature(feat)
+        ds = None
+
+    results = []
+    for jobs in (1, 4):
+        output_path = str(tmp_path / f"output_layer_{jobs}.shp")
+        _, err = test_py_scripts.run_py_script(
+            script_path,
+            "ogr_layer_algebra",
+            f"{op_str} -input_ds {input_path} -method_ds {method_path} -output_ds {output_path} -j {jobs} -q",
+            return_stderr=True,
+        )
+        assert "ERROR" not in err
+        results.append(_get_result_features(output_path))
+
+    assert results[1] == results[0]
+    assert len(results[0][1]) > 0
+
+
+def test_ogr_layer_algebra_jobs_invalid(script_path, tmp_path):
+
+    _, err = test_py_scripts.run_py_script(
+        script_path,
+        "ogr_layer_algebra",
+        f"Union -input_ds {tmp_path}/in.shp -method_ds {tmp_path}/method.shp -output_ds {tmp_path}/out.shp -j 0",
+        return_stderr=True,
+    )
+    assert "-j 0: invalid number of jobs" in err
@@ -11,6 +11,7 @@
 # SPDX-License-Identifier: MIT
 ###############################################################################
 
+import os
 import sys
 
 import gdaltest
@@ -654,3 +655,177 @@ def test_ogrmerge_gpkg_curve_geom_in_generic_layer(script_path, tmp_path):
     ds = None
 
     _validate_check(out_gpkg)
+
+
+###############################################################################
+# Test the Arrow based copy against the feature by feature one
+
+
+def _create_ogrmerge_source(filename, fields, values):
+
+    ds = ogr.GetDriverByName("ESRI Shapefile").CreateDataSource(filename)
+    lyr = ds.CreateLayer(
+        os.path.splitext(os.path.basename(filename))[0], geom_type=ogr.wkbPoint
+    )
+    for name, field_type in fields:
+        lyr.CreateField(ogr.FieldDefn(name, field_type))
+    for i, row in enumerate(values):
+        f = ogr.Feature(lyr.GetLayerDefn())
+        for (name, _), value in zip(fields, row):
+            f[name] = value
+        f.SetGeometry(ogr.CreateGeometryFromWkt(f"POINT({i} {len(row)})"))
+        lyr.CreateFeature(f)
+
+
+def _get_ogrmerge_result(filename):
+
+    ds = ogr.Open(filename)
+    ret = []
+    for lyr in ds:
+        layer_defn = lyr.GetLayerDefn()
+        ret.append(
+            (
+                lyr.GetName(),
+                [
+                    (
+                        layer_defn.GetFieldDefn(i).GetName(),
+                        layer_defn.GetFieldDefn(i).GetType(),
+                    )
+                    for i in range(layer_defn.GetFieldCount())
+                ],
+                [
+                    (f.GetFID(), f.GetGeometryRef().ExportToWkt(), f.items())
+                    for f in lyr
+                ],
+            )
+        )
+    return ret
+
+
+def _check_arrow_ogrmerge_used(monkeypatch, args, expected):
+    """Run ogrmerge in process, and check whether the features are copied
+    by Arrow batches"""
+
+    ogrmerge = pytest.importorskip("osgeo_utils.ogrmerge")
+
+    calls = []
+    arrow_ogrmerge = ogrmerge._arrow_ogrmerge
+
+    def spy_arrow_ogrmerge(*args, **kwargs):
+        calls.append(args)
+        return arrow_ogrmerge(*args, **kwargs)
+
+    monkeypatch.setattr(ogrmerge, "_arrow_ogrmerge", spy_arrow_ogrmerge)
+    assert ogrmerge.process(args.split()) == 0
+    assert bool(calls) == expected
+
+
+@pytest.mark.require_driver("GPKG")
+@pytest.mark.parametrize(
+    "options",
+    [
+        "-single",
+        "-single -src_layer_field_name src",
+        "-single -field_strategy Intersection",
+        "-single -field_strategy FirstLayer",
+        "",
+    ],
+)
+@pytest.mark.parametrize("compatible_types", [True, False])
+def test_ogrmerge_arrow(script_path, tmp_path, monkeypatch, options, compatible_types):
+
+    pytest.importorskip("pyarrow")
+
+    a_shp = str(tmp_path / "a.shp")
+    b_shp = str(tmp_path / "b.shp")
+    _create_ogrmerge_source(
+        a_shp,
+        [("id", ogr.OFTInteger), ("name", ogr.OFTString)],
+        [(1, "one"), (2, None), (3, "three")],
+    )
+    _create_ogrmerge_source(
+        b_shp,
+        [
+            ("other", ogr.OFTString),
+            ("id", ogr.OFTReal if compatible_types else ogr.OFTString),
+        ],
+        [("x", 1.5 if compatible_types else "1.5"), (None, None)],
+    )
+
+    results = []
+    for enable_arrow in ("YES", "NO"):
+        out_gpkg = str(tmp_path / f"out_{enable_arrow}.gpkg")
+        _, err = test_py_scripts.run_py_script(
+            script_path,
+            "ogrmerge",
+            f"--config OGR_MERGE_ENABLE_ARROW_OPTIM {enable_arrow} -f GPKG -o {out_gpkg} {a_shp} {b_shp} {options}",
+            return_stderr=True,
+        )
+        assert "ERROR" not in err
+        results.append(_get_ogrmerge_result(out_gpkg))
+
+    assert results[0] == results[1]
+    assert sum(len(features) for _, _, features in results[0]) == 5
+
+    # Fields of different types are merged into a String field, or a Real one
+    # for Integer and Real fields, and -field_strategy FirstLayer takes the
+    # Integer type of the first layer, which all require a type conversion
+    # not done by the Arrow based copy.
+    out_gpkg = str(tmp_path / "out_check.gpkg")
+    _check_arrow_ogrmerge_used(
+        monkeypatch,
+        f"-f GPKG -o {out_gpkg} {a_shp} {b_shp} {options}",
+        options == "" or (compatible_types and "FirstLayer" not in options),
+    )
+    assert _get_ogrmerge_result(out_gpkg) == results[0]
+
+
+###############################################################################
+# Test merging many sources, which are prefetched by several threads
+
+
+@pytest.mark.require_driver("GPKG")
+@pytest.mark.parametrize("num_threads", ["1", "4"])
+def test_ogrmerge_many_sources(script_path, tmp_path, monkeypatch, num_threads):
+
+    pytest.importorskip("pyarrow")
+
+    src_filenames = []
+    for i in range(12):
+        src_filenames.append(str(tmp_path / f"src{i}.shp"))
+        _create_ogrmerge_source(
+            src_filenames[-1],
+            [("id", ogr.OFTInteger), (f"field{i % 3}", ogr.OFTString)],
+            [(j, f"{i}_{j}") for j in range(i)],
+        )
+
+    results = []
+    for enable_arrow in ("YES", "NO"):
+        out_gpkg = str(tmp_path / f"out_{enable_arrow}.gpkg")
+        out, err = test_py_scripts.run_py_script(
+            script_path,
+            "ogrmerge",
+            f"--config GDAL_NUM_THREADS {num_threads} --config OGR_MERGE_ENABLE_ARROW_OPTIM {enable_arrow} -single -progress -field_strategy Union -src_layer_field_name src -f GPKG -o {out_gpkg} "
+            + " ".join(src_filenames),
+            return_stderr=True,
+        )
+        assert "ERROR" not in err
+        assert "100 - done" in out
+        results.append(_get_ogrmerge_result(out_gpkg))
+
+    assert results[0] == results[1]
+    _, fields, features = results[0][0]
+    assert [name for name, _ in fields] == ["src", "id", "field0", "field1", "field2"]
+    assert len(features) == sum(range(12))
+    assert features[0][2]["src"] == "src1"
+    assert features[-1][2]["src"] == "src11"
+
+    out_gpkg = str(tmp_path / "out_check.gpkg")
+    with gdal.config_option("GDAL_NUM_THREADS", num_threads):
+        _check_arrow_ogrmerge_used(
+            monkeypatch,
+            f"-single -field_strategy Union -src_layer_field_name src -f GPKG -o {out_gpkg} "
+            + " ".join(src_filenames),
+            True,
+        )
+    assert _get_ogrmerge_result(out_gpkg) == results[0]
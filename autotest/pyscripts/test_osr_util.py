@@ -153,3 +153,31 @@ def test_transform():
         osr_util.transform_points(ct, x, y)
         d = array_util.array_dist(x, utm_x), array_util.array_dist(y, utm_y)
         assert max(d) < 0.01
+
+
+@pytest.mark.parametrize("num_threads", [1, 2])
+def test_transform_numpy(num_threads):
+    np = pytest.importorskip("numpy")
+
+    pj_utm = osr_util.get_srs(32636)
+    pj4326 = osr_util.get_srs(4326, axis_order=osr.OAMS_TRADITIONAL_GIS_ORDER)
+    ct = osr_util.get_transform(pj4326, pj_utm)
+
+    lon = np.tile([35.0, 35.0], 20000)
+    lat = np.tile([31.0, 32.0], 20000)
+    z = np.zeros(lon.shape)
+    osr_util.transform_points(ct, lon, lat, z, num_threads=num_threads)
+    assert np.abs(lon - np.tile([690950.4640, 688927.6381], 20000)).max() < 0.01
+    assert np.abs(lat - np.tile([3431318.8435, 3542183.4911], 20000)).max() < 0.01
+
+    # Non contiguous arrays are transformed point by point
+    lon = np.array([[35.0, 0], [35.0, 0]])[:, 0]
+    lat = np.array([31.0, 32.0])
+    osr_util.transform_points(ct, lon, lat)
+    assert np.abs(lon - [690950.4640, 688927.6381]).max() < 0.01
+
+    # Invalid latitude
+    lon = np.array([35.0, 35.0])
+    lat = np.array([31.0, 100.0])
+    with pytest.raises(Exception):
+        osr_util.transform_points(ct, lon, lat)
@@ -427,3 +427,49 @@ See Also
 :py:func:`config_option`
 :py:func:`config_options`
 ";
+
+// gdal.VSIFReadIntoL
+%feature("docstring") wrapper_VSIFReadIntoL "
+
+Read from a file into a writable buffer, without intermediate copy.
+
+.. versionadded:: 3.11
+
+Parameters
+----------
+buffer : bytearray, memoryview or any object supporting the writable buffer protocol
+    contiguous buffer to fill. Its whole size is requested.
+fp : VSILFILE
+    file handle opened with :py:func:`VSIFOpenL` or :py:func:`VSIFOpenExL`
+
+Returns
+-------
+int
+    number of bytes read, lower than the size of the buffer at end of file
+";
+
+// gdal.VSIFReadMultiRangeL
+%feature("docstring") wrapper_VSIFReadMultiRangeL "
+
+Read several ranges of bytes from a file.
+See :cpp:func:`VSIFReadMultiRangeL`.
+
+On network file systems such as /vsicurl/ or /vsis3/, the ranges are
+fetched in parallel, and neighbouring ranges are merged.
+
+.. versionadded:: 3.11
+
+Parameters
+----------
+offsets : list[int]
+    offsets of the ranges, sorted in ascending order and not overlapping
+sizes : list[int]
+    sizes of the ranges, in bytes
+fp : VSILFILE
+    file handle opened with :py:func:`VSIFOpenL` or :py:func:`VSIFOpenExL`
+
+Returns
+-------
+list[bytearray]
+    content of each range, or None in case of failure
+";
@@ -66,6 +66,57 @@ tuple
 
 ";
 
+%feature("docstring") TransformPointsInPlace "
+
+Transform in place the coordinates of multiple points, stored in arrays.
+
+The coordinates are transformed by a single native call, without holding
+the Python Global Interpreter Lock.
+
+See :cpp:func:`OCTTransform4D`.
+
+.. versionadded:: 3.11
+
+Parameters
+----------
+x : array
+    Writable C contiguous buffer of float64 values, typically a numpy array,
+    with the first coordinate of the points
+y : array
+    Buffer of the same type and size with the second coordinate
+z : array, optional
+    Buffer of the same type and size with the third coordinate
+t : array, optional
+    Buffer of the same type and size with the time coordinate
+num_threads : int, default=1
+    Maximum number of threads among which the points are split.
+    Small arrays are not split.
+
+Returns
+-------
+bool
+    True if all points were transformed. The coordinates of the points
+    that could not be transformed are set to infinity.
+
+Examples
+--------
+>>> import numpy as np
+>>> wgs84 = osr.SpatialReference()
+>>> wgs84.ImportFromEPSG(4326)
+0
+>>> vt_sp = osr.SpatialReference()
+>>> vt_sp.ImportFromEPSG(5646)
+0
+>>> ct = osr.CoordinateTransformation(wgs84, vt_sp)
+>>> x = np.array([44.26, 44.26])
+>>> y = np.array([-72.58, -72.59])
+>>> ct.TransformPointsInPlace(x, y)
+True
+>>> x
+array([1619458.11085598, 1616838.29131931])
+
+";
+
 %feature("docstring") TransformPoints "
 
 Transform multiple points.
@@ -309,6 +309,116 @@ unsigned int wrapper_VSIFReadL( void **buf, unsigned int nMembSize, unsigned int
 }
 %}
 %clear (void **buf );
+
+/* -------------------------------------------------------------------- */
+/*      VSIFReadIntoL()                                                 */
+/* -------------------------------------------------------------------- */
+
+%rename (VSIFReadIntoL) wrapper_VSIFReadIntoL;
+
+%pythonprepend wrapper_VSIFReadIntoL %{
+    if args[1].this is None:
+        raise ValueError("I/O operation on closed file.")
+%}
+
+%inline %{
+size_t wrapper_VSIFReadIntoL( PyObject *buffer, VSILFILE *fp)
+{
+    Py_buffer view;
+    SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+    if (PyObject_GetBuffer(buffer, &view, PyBUF_SIMPLE | PyBUF_WRITABLE) != 0)
+    {
+        PyErr_Clear();
+        SWIG_PYTHON_THREAD_END_BLOCK;
+        CPLError(CE_Failure, CPLE_AppDefined,
+                 "buffer is not a simple writable buffer");
+        return 0;
+    }
+    SWIG_PYTHON_THREAD_END_BLOCK;
+    const size_t nRet = VSIFReadL( view.buf, 1, static_cast<size_t>(view.len), fp );
+    SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+    PyBuffer_Release(&view);
+    SWIG_PYTHON_THREAD_END_BLOCK;
+    return nRet;
+}
+%}
+
+/* -------------------------------------------------------------------- */
+/*      VSIFReadMultiRangeL()                                           */
+/* -------------------------------------------------------------------- */
+
+%rename (VSIFReadMultiRangeL) wrapper_VSIFReadMultiRangeL;
+
+%pythonprepend wrapper_VSIFReadMultiRangeL %{
+    if args[2].this is None:
+        raise ValueError("I/O operation on closed file.")
+%}
+
+%apply ( void **outPythonObject ) { (void **buf ) };
+%apply (int nList, GUIntBig* pList) {(int nOffsets, GUIntBig *panOffsets)};
+%apply (int nList, GUIntBig* pList) {(int nSizes, GUIntBig *panSizes)};
+%inline %{
+int wrapper_VSIFReadMultiRangeL( void **buf, int nOffsets, GUIntBig *panOffsets,
+                                 int nSizes, GUIntBig *panSizes, VSILFILE *fp)
+{
+    *buf = NULL;
+    if (nOffsets != nSizes)
+    {
+        CPLError(CE_Failure, CPLE_IllegalArg,
+                 "offsets and sizes should have the same number of elements");
+        return -1;
+    }
+
+    std::vector<void*> apData(nOffsets);
+    std::vector<vsi_l_offset> anOffsets(nOffsets);
+    std::vector<size_t> anSizes(nOffsets);
+
+    SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+    PyObject* list = PyList_New(nOffsets);
+    for (int i = 0; list != NULL && i < nOffsets; ++i)
+    {
+        PyObject* o = NULL;
+        if (panSizes[i] <= static_cast<GUIntBig>(PY_SSIZE_T_MAX))
+            o = PyByteArray_FromStringAndSize(NULL, static_cast<Py_ssize_t>(panSizes[i]));
+        if (o == NULL)
+        {
+            Py_DECREF(list);
+            list = NULL;
+            break;
+        }
+        PyList_SET_ITEM(list, i, o);
+        apData[i] = PyByteArray_AsString(o);
+        anOffsets[i] = static_cast<vsi_l_offset>(panOffsets[i]);
+        anSizes[i] = static_cast<size_t>(panSizes[i]);
+    }
+    if (list == NULL)
+    {
+        if( !GetUseExceptions() )
+        {
+            PyErr_Clear();
+        }
+        SWIG_PYTHON_THREAD_END_BLOCK;
+        CPLError(CE_Failure, CPLE_OutOfMemory, "Cannot allocate result buffers");
+        return -1;
+    }
+    SWIG_PYTHON_THREAD_END_BLOCK;
+
+    const int nRet = VSIFReadMultiRangeL(nOffsets, apData.data(), anOffsets.data(),
+                                         anSizes.data(), fp);
+    if (nRet != 0)
+    {
+        SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+        Py_DECREF(list);
+        SWIG_PYTHON_THREAD_END_BLOCK;
+        return nRet;
+    }
+    *buf = list;
+    return 0;
+}
+%}
+%clear (void **buf );
+%clear (int nOffsets, GUIntBig *panOffsets);
+%clear (int nSizes, GUIntBig *panSizes);
 %clear VSILFILE* fp;
 
 /* -------------------------------------------------------------------- */
@@ -5340,20 +5450,50 @@ def ComputeMinMaxLocation(self, *args, **kwargs):
 # VSIFile: Copyright (c) 2024, Dan Baston <dbaston at gmail.com>
 
 from io import BytesIO
+import re
 
 class VSIFile(BytesIO):
     """Class wrapping a GDAL VSILFILE instance as a Python BytesIO instance
 
+       Reads go through a read-ahead buffer of ``buffering`` bytes, which is
+       notably used by line iteration, so that it does not call into GDAL for
+       each line. Reads larger than the buffer bypass it, and :py:meth:`readinto`
+       fills the caller buffer directly from the file.
+
        :since: GDAL 3.11
     """
 
-    def __init__(self, path, mode, encoding="utf-8"):
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+
+    # Same end of line sequences as CPLReadLineL()
+    _end_of_line = re.compile(b"\r\n?|\n\r?")
+
+    def __init__(self, path, mode, encoding="utf-8", buffering=-1):
+        """
+        Parameters
+        ----------
+        path : str
+            file name
+        mode : str
+            access mode, as in :py:func:`VSIFOpenL`
+        encoding : str
+            encoding of text (non-binary) files
+        buffering : int
+            size of the read-ahead buffer in bytes, 0 to disable it, or -1 for
+            :py:attr:`DEFAULT_BUFFER_SIZE`
+        """
         self._path = path
         self._mode = mode
 
         self._binary = "b" in mode
         self._encoding = encoding
 
+        self._buffer_size = self.DEFAULT_BUFFER_SIZE if buffering < 0 else buffering
+        # Read-ahead bytes, consumed from _buffer_pos
+        self._buffer = bytearray()
+        self._buffer_pos = 0
+        self._eof = False
+
         self._fp = VSIFOpenExL(self._path, self._mode, True)
         if self._fp is None:
             self._closed = True
@@ -5371,34 +5511,168 @@ class VSIFile(BytesIO):
         return self
 
     def __next__(self):
-        line = CPLReadLineL(self._fp)
+        if self._buffer_size == 0:
+            line = CPLReadLineL(self._fp)
+            if line is None:
+                raise StopIteration
+            if self._binary:
+                return line.encode()
+            return line
+
+        line = self._read_line()
         if line is None:
             raise StopIteration
         if self._binary:
-            return line.encode()
-        return line
+            return line
+        return line.decode(self._encoding)
+
+    def _buffered(self):
+        return len(self._buffer) - self._buffer_pos
+
+    def _drop_buffer(self):
+        self._buffer = bytearray()
+        self._buffer_pos = 0
+        self._eof = False
+
+    def _fill_buffer(self, size):
+        """Append up to size bytes read from the file to the buffer.
+
+           Returns the number of bytes read.
+        """
+        if self._buffer_pos:
+            del self._buffer[: self._buffer_pos]
+            self._buffer_pos = 0
+        raw = VSIFReadL(1, size, self._fp) if size > 0 else None
+        if not raw:
+            self._eof = True
+            return 0
+        self._buffer += raw
+        return len(raw)
+
+    def _take_buffered(self, size):
+        """Consume up to size bytes from the buffer"""
+        pos = self._buffer_pos
+        size = min(size, self._buffered())
+        self._buffer_pos = pos + size
+        return self._buffer[pos : pos + size]
+
+    def _read_line(self):
+        """Read a line from the buffer, without its end of line sequence"""
+        search_pos = self._buffer_pos
+        while True:
+            match = self._end_of_line.search(self._buffer, search_pos)
+            # An end of line at the end of the buffer may be the first byte
+            # of a two-byte sequence.
+            if match and (
+                match.end() < len(self._buffer)
+                or match.end() - match.start() == 2
+                or self._eof
+            ):
+                line = bytes(self._buffer[self._buffer_pos : match.start()])
+                self._buffer_pos = match.end()
+                return line
+            if self._eof:
+                if self._buffered() == 0:
+                    return None
+                return bytes(self._take_buffered(self._buffered()))
+            # _fill_buffer() discards the consumed bytes
+            search_offset = (match.start() if match else len(self._buffer)) - self._buffer_pos
+            self._fill_buffer(self._buffer_size)
+            search_pos = self._buffer_pos + search_offset
 
     def close(self):
         if self._closed:
             return
 
         self._closed = True
+        self._drop_buffer()
         VSIFCloseL(self._fp)
 
     def read(self, size=-1):
-        if size == -1:
+        if size is None or size < 0:
             pos = self.tell()
-            self.seek(0, 2)
-            size = self.tell()
+            VSIFSeekL(self._fp, 0, 2)
+            size = VSIFTellL(self._fp) - pos
             self.seek(pos)
 
-        raw = VSIFReadL(1, size, self._fp)
+        raw = self._read(size)
 
         if self._binary:
             return bytes(raw)
         else:
             return raw.decode(self._encoding)
 
+    def _read(self, size):
+        buffered = self._buffered()
+        if size <= buffered:
+            return self._take_buffered(size)
+        raw = self._take_buffered(buffered)
+        remaining = size - buffered
+        if remaining >= self._buffer_size:
+            chunk = VSIFReadL(1, remaining, self._fp)
+            if not raw:
+                return chunk or bytearray()
+            if chunk:
+                raw += chunk
+        elif self._fill_buffer(self._buffer_size):
+            raw += self._take_buffered(remaining)
+        return raw
+
+    def read1(self, size=-1):
+        """Read up to size bytes, with at most one read from the file"""
+        if size is None or size < 0:
+            size = max(self._buffered(), self._buffer_size, 1)
+        if self._buffered() == 0:
+            if size >= self._buffer_size:
+                return bytes(VSIFReadL(1, size, self._fp) or b"")
+            self._fill_buffer(self._buffer_size)
+        return bytes(self._take_buffered(size))
+
+    def readinto(self, b):
+        """Read bytes into a pre-allocated, writable buffer b.
+
+           Returns the number of bytes read, 0 at end of file.
+        """
+        view = memoryview(b).cast("B")
+        size = len(view)
+        n = min(size, self._buffered())
+        view[:n] = self._take_buffered(n)
+        if n == size:
+            return n
+        if size - n >= self._buffer_size:
+            return n + VSIFReadIntoL(view[n:], self._fp)
+        if self._fill_buffer(self._buffer_size):
+            m = min(size - n, self._buffered())
+            view[n : n + m] = self._take_buffered(m)
+            n += m
+        return n
+
+    def readinto1(self, b):
+        """Read bytes into a pre-allocated, writable buffer b, with at most
+           one read from the file.
+
+           Returns the number of bytes read, 0 at end of file.
+        """
+        view = memoryview(b).cast("B")
+        size = len(view)
+        if self._buffered() == 0:
+            if size >= self._buffer_size:
+                return VSIFReadIntoL(view, self._fp) if size else 0
+            self._fill_buffer(self._buffer_size)
+        n = min(size, self._buffered())
+        view[:n] = self._take_buffered(n)
+        return n
+
+    def peek(self, size=0):
+        """Return buffered bytes without advancing the position.
+
+           At least one byte is returned, unless at end of file, and possibly
+           more than size bytes.
+        """
+        if self._buffered() < max(size, 1) and not self._eof:
+            self._fill_buffer(max(size - self._buffered(), self._buffer_size, 1))
+        return bytes(self._buffer[self._buffer_pos :])
+
     def write(self, x):
 
         if self._binary:
@@ -5407,6 +5681,10 @@ class VSIFile(BytesIO):
             assert type(x) is str
             x = x.encode(self._encoding)
 
+        if self._buffer or self._eof:
+            # move the file position back to the logical position
+            self.seek(0, 1)
+
         planned_write = len(x)
         actual_write = VSIFWriteL(x, 1, planned_write, self._fp)
 
@@ -5428,11 +5706,15 @@ class VSIFile(BytesIO):
            Returns the new absolute position.
         """
 
+        if whence == 1:
+            offset -= self._buffered()
         if VSIFSeekL(self._fp, offset, whence) != 0:
             raise OSError(VSIGetLastErrorMsg())
+        self._drop_buffer()
+        return VSIFTellL(self._fp)
 
     def tell(self):
-        return VSIFTellL(self._fp)
+        return VSIFTellL(self._fp) - self._buffered()
 %}
 
 
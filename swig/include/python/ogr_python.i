@@ -503,6 +503,140 @@ def _WarnIfUserHasNotSpecifiedIfUsingExceptions():
   }
   %clear (const char* value );
 
+  /* Return the name of the field of index id, or None if out of range */
+  const char* _GetFieldNameRef(int id) {
+    OGRFeatureDefnH hDefn = OGR_F_GetDefnRef(self);
+    if( id < 0 || id >= OGR_FD_GetFieldCount(hDefn) )
+        return NULL;
+    return OGR_Fld_GetNameRef(OGR_FD_GetFieldDefn(hDefn, id));
+  }
+
+  /* Return the list of field names in a single call */
+  PyObject* _GetFieldNames() {
+    OGRFeatureDefnH hDefn = OGR_F_GetDefnRef(self);
+    const int nFieldCount = OGR_FD_GetFieldCount(hDefn);
+    SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+    PyObject* list = PyList_New(nFieldCount);
+    for( int i = 0; list != NULL && i < nFieldCount; i++ )
+    {
+        PyObject* name = GDALPythonObjectFromCStr(
+            OGR_Fld_GetNameRef(OGR_FD_GetFieldDefn(hDefn, i)));
+        if( name == NULL )
+        {
+            Py_DECREF(list);
+            list = NULL;
+            break;
+        }
+        PyList_SetItem(list, i, name);
+    }
+    SWIG_PYTHON_THREAD_END_BLOCK;
+    return list;
+  }
+
+  /* Return the list of field values in a single call, converted as */
+  /* GetField() does */
+  PyObject* _GetFieldValues() {
+    OGRFeatureDefnH hDefn = OGR_F_GetDefnRef(self);
+    const int nFieldCount = OGR_FD_GetFieldCount(hDefn);
+    SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+    PyObject* list = PyList_New(nFieldCount);
+    for( int i = 0; list != NULL && i < nFieldCount; i++ )
+    {
+        OGRFieldDefnH hFieldDefn = OGR_FD_GetFieldDefn(hDefn, i);
+        const OGRFieldSubType eSubType = OGR_Fld_GetSubType(hFieldDefn);
+        PyObject* value = NULL;
+        if( !OGR_F_IsFieldSetAndNotNull(self, i) )
+        {
+            Py_INCREF(Py_None);
+            value = Py_None;
+        }
+        else
+        {
+            switch( OGR_Fld_GetType(hFieldDefn) )
+            {
+                case OFTInteger:
+                {
+                    const int nVal = OGR_F_GetFieldAsInteger(self, i);
+                    value = eSubType == OFSTBoolean ? PyBool_FromLong(nVal) :
+                                                      PyLong_FromLong(nVal);
+                    break;
+                }
+                case OFTInteger64:
+                    value = PyLong_FromLongLong(OGR_F_GetFieldAsInteger64(self, i));
+                    break;
+                case OFTReal:
+                    value = PyFloat_FromDouble(OGR_F_GetFieldAsDouble(self, i));
+                    break;
+                case OFTStringList:
+                {
+                    char** papszList = OGR_F_GetFieldAsStringList(self, i);
+                    if( papszList == NULL )
+                    {
+                        Py_INCREF(Py_None);
+                        value = Py_None;
+                        break;
+                    }
+                    const int nCount = CSLCount(papszList);
+                    value = PyList_New(nCount);
+                    for( int j = 0; value != NULL && j < nCount; j++ )
+                    {
+                        PyList_SetItem(value, j, GDALPythonObjectFromCStr(papszList[j]));
+                    }
+                    break;
+                }
+                case OFTIntegerList:
+                {
+                    int nCount = 0;
+                    const int* panList = OGR_F_GetFieldAsIntegerList(self, i, &nCount);
+                    value = PyList_New(nCount);
+                    for( int j = 0; value != NULL && j < nCount; j++ )
+                    {
+                        PyList_SetItem(value, j,
+                            eSubType == OFSTBoolean ? PyBool_FromLong(panList[j]) :
+                                                      PyLong_FromLong(panList[j]));
+                    }
+                    break;
+                }
+                case OFTInteger64List:
+                {
+                    int nCount = 0;
+                    const GIntBig* panList = OGR_F_GetFieldAsInteger64List(self, i, &nCount);
+                    value = PyList_New(nCount);
+                    for( int j = 0; value != NULL && j < nCount; j++ )
+                    {
+                        PyList_SetItem(value, j, PyLong_FromLongLong(panList[j]));
+                    }
+                    break;
+                }
+                case OFTRealList:
+                {
+                    int nCount = 0;
+                    const double* padfList = OGR_F_GetFieldAsDoubleList(self, i, &nCount);
+                    value = PyList_New(nCount);
+                    for( int j = 0; value != NULL && j < nCount; j++ )
+                    {
+                        PyList_SetItem(value, j, PyFloat_FromDouble(padfList[j]));
+                    }
+                    break;
+                }
+                default:
+                    /* Non UTF-8 strings are returned as bytes */
+                    value = GDALPythonObjectFromCStr(OGR_F_GetFieldAsString(self, i));
+                    break;
+            }
+        }
+        if( value == NULL )
+        {
+            Py_DECREF(list);
+            list = NULL;
+            break;
+        }
+        PyList_SetItem(list, i, value);
+    }
+    SWIG_PYTHON_THREAD_END_BLOCK;
+    return list;
+  }
+
   %pythoncode %{
     def Reference(self):
       pass
@@ -524,16 +658,54 @@ def _WarnIfUserHasNotSpecifiedIfUsingExceptions():
     def __copy__(self):
         return self.Clone()
 
+    # Maps of field names, and of lowercase field names, to field indices,
+    # per feature definition.
+    # An entry is only trusted after checking that the field at the cached
+    # index still has the requested name, so that schema changes (and the
+    # reuse of the address of a destroyed feature definition) are taken
+    # into account. Misses are confirmed by a single native lookup.
+    _field_index_maps = {}
+
     def _getfieldindex(self, fieldname):
-        case_insensitive_idx = -1
-        fdefn = _ogr.Feature_GetDefnRef(self)
-        for i in range(fdefn.GetFieldCount()):
-            name = fdefn.GetFieldDefn(i).GetName()
-            if name == fieldname:
-                return i
-            elif case_insensitive_idx < 0 and name.lower() == fieldname.lower():
-                case_insensitive_idx = i
-        return case_insensitive_idx
+        defn_key = int(_ogr.Feature_GetDefnRef(self).this)
+        field_index_maps = Feature._field_index_maps.get(defn_key)
+        if field_index_maps is not None:
+            field_index_map, lower_field_index_map, field_count = field_index_maps
+            idx = field_index_map.get(fieldname)
+            if idx is not None:
+                if _ogr.Feature__GetFieldNameRef(self, idx) == fieldname:
+                    return idx
+            elif _ogr.Feature_GetFieldCount(self) == field_count:
+                lower_fieldname = fieldname.lower()
+                idx = lower_field_index_map.get(lower_fieldname)
+                if idx is None:
+                    if _ogr.Feature_GetFieldIndex(self, fieldname) < 0:
+                        return -1
+                else:
+                    name = _ogr.Feature__GetFieldNameRef(self, idx)
+                    if name is not None and name.lower() == lower_fieldname:
+                        return idx
+
+        field_index_map = {}
+        lower_field_index_map = {}
+        names = _ogr.Feature__GetFieldNames(self)
+        for i, name in enumerate(names):
+            if name not in field_index_map:
+                field_index_map[name] = i
+            lower_name = name.lower()
+            if lower_name not in lower_field_index_map:
+                lower_field_index_map[lower_name] = i
+        if len(Feature._field_index_maps) >= 64:
+            Feature._field_index_maps.clear()
+        Feature._field_index_maps[defn_key] = (
+            field_index_map,
+            lower_field_index_map,
+            len(names),
+        )
+        idx = field_index_map.get(fieldname)
+        if idx is None:
+            idx = lower_field_index_map.get(fieldname.lower(), -1)
+        return idx
 
     # This makes it possible to fetch fields in the form "feature.area".
     # This has some risk of name collisions.
@@ -733,18 +905,14 @@ def _WarnIfUserHasNotSpecifiedIfUsingExceptions():
 
     def keys(self):
         """Return the list of field names (of the layer definition)"""
-        names = []
-        for i in range(self.GetFieldCount()):
-            fieldname = self.GetFieldDefnRef(i).GetName()
-            names.append(fieldname)
-        return names
+        return self._GetFieldNames()
 
     def items(self):
         """Return a dictionary with the field names as key, and their value in the feature"""
-        keys = self.keys()
         output = {}
-        for key in keys:
-            output[key] = self.GetField(key)
+        for key, value in zip(self._GetFieldNames(), self._GetFieldValues()):
+            # Same as GetField(key) if several fields have the same name
+            output.setdefault(key, value)
         return output
 
     def geometry(self):
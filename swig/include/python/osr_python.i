@@ -108,8 +108,157 @@ def _WarnIfUserHasNotSpecifiedIfUsingExceptions():
 %}
 }
 
+%{
+#include <algorithm>
+#include <climits>
+#include <string>
+#include <thread>
+#include <vector>
+
+/* Get a writable C contiguous buffer of native float64 values */
+/* Must be called with the GIL held */
+static bool GetFloat64Buffer(PyObject* obj, const char* pszName,
+                             Py_buffer* view, std::string& osError)
+{
+    if( PyObject_GetBuffer(obj, view, PyBUF_WRITABLE | PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) != 0 )
+    {
+        PyErr_Clear();
+        osError = std::string(pszName) + " is not a writable contiguous buffer";
+        return false;
+    }
+    const char* pszFormat = view->format ? view->format : "B";
+    if( view->itemsize != static_cast<Py_ssize_t>(sizeof(double)) ||
+        !(strcmp(pszFormat, "d") == 0 || strcmp(pszFormat, "@d") == 0 ||
+          strcmp(pszFormat, "=d") == 0
+#if CPL_IS_LSB
+          || strcmp(pszFormat, "<d") == 0
+#endif
+         ) )
+    {
+        PyBuffer_Release(view);
+        osError = std::string(pszName) + " is not a buffer of native float64 values";
+        return false;
+    }
+    return true;
+}
+
+/* Transform points by chunks that fit in the int count of OCTTransform4D() */
+static bool TransformPointsRange(OSRCoordinateTransformationShadow* hCT,
+                                 size_t nStart, size_t nEnd,
+                                 double* x, double* y, double* z, double* t)
+{
+    bool bRet = true;
+    const size_t nMaxChunkSize = static_cast<size_t>(INT_MAX);
+    for( size_t i = nStart; i < nEnd; i += nMaxChunkSize )
+    {
+        const int nCount = static_cast<int>(std::min(nEnd - i, nMaxChunkSize));
+        if( !OCTTransform4D(hCT, nCount, x + i, y + i,
+                            z ? z + i : NULL, t ? t + i : NULL, NULL) )
+            bRet = false;
+    }
+    return bRet;
+}
+%}
+
 %extend OSRCoordinateTransformationShadow {
 
+
+%feature( "kwargs" ) TransformPointsInPlace;
+  bool TransformPointsInPlace( PyObject* x, PyObject* y, PyObject* z = NULL, PyObject* t = NULL, int num_threads = 1 ) {
+    if (self == NULL)
+        return false;
+
+    PyObject* const apoObjects[4] = { x, y, z, t };
+    const char* const apszNames[4] = { "x", "y", "z", "t" };
+    Py_buffer aoViews[4];
+    double* apadfCoords[4] = { NULL, NULL, NULL, NULL };
+    size_t nCount = 0;
+    std::string osError;
+
+    {
+        SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+        for( int i = 0; i < 4 && osError.empty(); i++ )
+        {
+            if( i >= 2 && (apoObjects[i] == NULL || apoObjects[i] == Py_None) )
+                continue;
+            if( !GetFloat64Buffer(apoObjects[i], apszNames[i], &aoViews[i], osError) )
+                break;
+            apadfCoords[i] = static_cast<double*>(aoViews[i].buf);
+            const size_t nThisCount = static_cast<size_t>(aoViews[i].len) / sizeof(double);
+            if( i == 0 )
+                nCount = nThisCount;
+            else if( nThisCount != nCount )
+                osError = std::string(apszNames[i]) + " has not the same size as x";
+        }
+        if( !osError.empty() )
+        {
+            for( int i = 0; i < 4; i++ )
+            {
+                if( apadfCoords[i] )
+                    PyBuffer_Release(&aoViews[i]);
+            }
+        }
+        SWIG_PYTHON_THREAD_END_BLOCK;
+    }
+    if( !osError.empty() )
+    {
+        CPLError(CE_Failure, CPLE_AppDefined, "%s", osError.c_str());
+        return false;
+    }
+
+    // Do not bother starting threads for less than 10000 points each
+    const size_t nThreads = std::max<size_t>(1,
+        std::min<size_t>(num_threads > 0 ? num_threads : 1, nCount / 10000));
+    const size_t nChunkSize = nThreads > 1 ? (nCount + nThreads - 1) / nThreads : nCount;
+    std::vector<OSRCoordinateTransformationShadow*> ahClones;
+    std::vector<std::thread> aoThreads;
+    std::vector<char> abThreadRet(nThreads, true);
+    for( size_t i = 1; i < nThreads; i++ )
+    {
+        // Transformations are not thread-safe: give each thread its own one
+        OSRCoordinateTransformationShadow* hClone =
+            (OSRCoordinateTransformationShadow*) OCTClone(self);
+        if( hClone == NULL )
+            break;
+        ahClones.push_back(hClone);
+        const size_t nStart = i * nChunkSize;
+        const size_t nEnd = std::min(nCount, nStart + nChunkSize);
+        aoThreads.emplace_back([&abThreadRet, hClone, i, nStart, nEnd, &apadfCoords]()
+        {
+            abThreadRet[i] = TransformPointsRange(hClone, nStart, nEnd,
+                apadfCoords[0], apadfCoords[1], apadfCoords[2], apadfCoords[3]);
+        });
+    }
+    // Points of the threads that could not be started are transformed here
+    bool bRet = TransformPointsRange(self, 0,
+        aoThreads.empty() ? nCount : std::min(nCount, nChunkSize),
+        apadfCoords[0], apadfCoords[1], apadfCoords[2], apadfCoords[3]);
+    if( !aoThreads.empty() && aoThreads.size() + 1 < nThreads )
+    {
+        if( !TransformPointsRange(self, (aoThreads.size() + 1) * nChunkSize, nCount,
+                apadfCoords[0], apadfCoords[1], apadfCoords[2], apadfCoords[3]) )
+            bRet = false;
+    }
+    for( size_t i = 0; i < aoThreads.size(); i++ )
+    {
+        aoThreads[i].join();
+        OCTDestroyCoordinateTransformation(ahClones[i]);
+        if( !abThreadRet[i + 1] )
+            bRet = false;
+    }
+
+    {
+        SWIG_PYTHON_THREAD_BEGIN_BLOCK;
+        for( int i = 0; i < 4; i++ )
+        {
+            if( apadfCoords[i] )
+                PyBuffer_Release(&aoViews[i]);
+        }
+        SWIG_PYTHON_THREAD_END_BLOCK;
+    }
+    return bRet;
+  }
+
 %feature("shadow") TransformPoint %{
 
 def TransformPoint(self, *args):
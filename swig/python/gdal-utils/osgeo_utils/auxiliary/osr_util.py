@@ -117,14 +117,35 @@ def get_transform(
         return osr.CoordinateTransformation(src_srs, tgt_srs)
 
 
+def _is_float64_buffer(a) -> bool:
+    try:
+        view = memoryview(a)
+    except TypeError:
+        return False
+    return not view.readonly and view.c_contiguous and view.format in ("d", "@d", "=d")
+
+
 def transform_points(
     ct: Optional[osr.CoordinateTransformation],
     x: ArrayLike,
     y: ArrayLike,
     z: Optional[ArrayLike] = None,
+    num_threads: int = 1,
 ) -> None:
+    """
+    Transform in place the coordinates of points.
+
+    When the coordinates are writable contiguous buffers of float64 values,
+    like NumPy arrays, all the points are transformed by a single native call,
+    split across num_threads threads for large arrays. Other sequences are
+    transformed point by point.
+    An exception is raised if some points could not be transformed.
+    """
     if ct is not None:
-        if z is None:
+        if all(_is_float64_buffer(a) for a in (x, y, z) if a is not None):
+            if not ct.TransformPointsInPlace(x, y, z, num_threads=num_threads):
+                raise Exception("Some points could not be transformed")
+        elif z is None:
             for idx, (x0, y0) in enumerate(zip(x, y)):
                 x[idx], y[idx], _z = ct.TransformPoint(x0, y0)
         else:
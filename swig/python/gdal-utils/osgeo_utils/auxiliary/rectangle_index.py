@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ******************************************************************************
+#
+#  Project:  GDAL
+#  Purpose:  static spatial index of rectangles
+#
+# ******************************************************************************
+#  Copyright (c) 2024, GDAL contributors
+#
+# SPDX-License-Identifier: MIT
+# ******************************************************************************
+import math
+from typing import List, Optional, Sequence, Tuple
+
+Rectangle = Tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+class RectangleIndex:
+    """
+    Static R-tree of rectangles, bulk loaded with the Sort-Tile-Recursive
+    (STR) algorithm.
+
+    Rectangles are (min_x, min_y, max_x, max_y) tuples, and are identified
+    by their index in the sequence given at construction. None entries are
+    allowed, and are never returned by queries.
+    """
+
+    def __init__(
+        self, rectangles: Sequence[Optional[Rectangle]], node_capacity: int = 16
+    ):
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+        self.node_capacity = node_capacity
+        self.count = 0
+
+        # A node is a (min_x, min_y, max_x, max_y, children) tuple, whose
+        # children are rectangle indices for the leaves.
+        nodes = []
+        for i, rect in enumerate(rectangles):
+            if rect is not None:
+                nodes.append((rect[0], rect[1], rect[2], rect[3], i))
+                self.count += 1
+
+        self.depth = 0
+        while len(nodes) > node_capacity or self.depth == 0:
+            nodes = self._pack(nodes)
+            self.depth += 1
+        self.root = nodes
+
+    def _pack(self, nodes):
+        """Group nodes by node_capacity into parent nodes, tile by tile."""
+
+        node_capacity = self.node_capacity
+        nb_parents = math.ceil(len(nodes) / node_capacity)
+        nb_slices = max(1, math.ceil(math.sqrt(nb_parents)))
+        slice_size = nb_slices * node_capacity
+
+        nodes = sorted(nodes, key=lambda node: node[0] + node[2])
+        parents = []
+        for i in range(0, len(nodes), slice_size):
+            slice_nodes = sorted(
+                nodes[i : i + slice_size], key=lambda node: node[1] + node[3]
+            )
+            for j in range(0, len(slice_nodes), node_capacity):
+                children = slice_nodes[j : j + node_capacity]
+                parents.append(
+                    (
+                        min(node[0] for node in children),
+                        min(node[1] for node in children),
+                        max(node[2] for node in children),
+                        max(node[3] for node in children),
+                        children,
+                    )
+                )
+        return parents
+
+    def __len__(self) -> int:
+        return self.count
+
+    def query(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> List[int]:
+        """
+        Return the sorted indices of the rectangles intersecting
+        (min_x, min_y, max_x, max_y), including the ones only touching it.
+        """
+
+        result = []
+        stack = [(self.root, self.depth)]
+        while stack:
+            nodes, depth = stack.pop()
+            for node in nodes:
+                if (
+                    node[0] <= max_x
+                    and node[2] >= min_x
+                    and node[1] <= max_y
+                    and node[3] >= min_y
+                ):
+                    if depth == 0:
+                        result.append(node[4])
+                    else:
+                        stack.append((node[4], depth - 1))
+        result.sort()
+        return result
@@ -19,8 +19,13 @@
 # SPDX-License-Identifier: MIT
 # ******************************************************************************
 
+import abc
+import concurrent.futures
 import contextlib
 import glob
+import gzip
+import hashlib
+import itertools
 import json
 import logging
 import math
@@ -28,11 +33,22 @@ import optparse
 import os
 import shutil
 import stat
+import struct
 import sys
 import tempfile
 import threading
+from collections import OrderedDict
 from functools import partial
-from typing import Any, List, NoReturn, Optional, Tuple
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    NoReturn,
+    Optional,
+    Tuple,
+)
 from uuid import uuid4
 from xml.etree import ElementTree
 
@@ -111,6 +127,603 @@ def my_open(filename, mode):
         yield open(filename, mode)
 
 
+class EncodedTile(NamedTuple):
+    """Tile written by a worker, as reported to the main process"""
+
+    tz: int
+    tx: int
+    ty: int  # with a bottom-y (TMS) origin
+    # Encoded tile, for a tile sink. None if written into a file, or if
+    # duplicate of a tile previously encoded by the same worker.
+    data: Optional[bytes]
+    # Digest of the tile pixels, with --dedup
+    digest: Optional[str] = None
+    duplicate: bool = False
+
+
+class TileSink(abc.ABC):
+    """
+    Single file output (tile archive) of gdal2tiles.
+
+    Tiles are identified by (tz, tx, ty) with a bottom-y (TMS) origin, whatever
+    the --xyz option. Only the main process writes into a tile sink: workers
+    encode tiles in memory and hand them to it. has_tile() and read_tile() can
+    be used from any process, and see the tiles written up to the last flush().
+
+    With dedup, tiles with identical pixels are stored once, and referenced
+    by their digest.
+    """
+
+    extension = ""
+    name = ""
+
+    def __init__(
+        self, filename: str, resume: bool = False, dedup: bool = False
+    ) -> None:
+        self.filename = filename
+        self.resume = resume
+        self.dedup = dedup
+
+    @abc.abstractmethod
+    def open(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def set_metadata(self, metadata: Dict[str, Any]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def has_tile(self, tz: int, tx: int, ty: int) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def read_tile(self, tz: int, tx: int, ty: int) -> Optional[bytes]:
+        pass
+
+    @abc.abstractmethod
+    def write_tiles(self, tiles: List[EncodedTile]) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteTileSink(TileSink):
+    """
+    Tile sink storing tiles in a SQLite database, during generation at least.
+
+    The main process writes in batched transactions. Other processes read
+    through their own read-only connection, the database being in WAL mode
+    while tiles are generated so that they are never blocked by the writer.
+
+    With dedup, the "tiles" table is replaced by a "tiles" view joining a
+    "map" table from tile keys to content ids, and an "images" table from
+    content ids to tile data.
+    """
+
+    batch_size = 1000
+    key_columns: Tuple[str, ...] = ()
+    key_column_definitions = ""
+    content_id_column = "content_id"
+
+    def __init__(
+        self, filename: str, resume: bool = False, dedup: bool = False
+    ) -> None:
+        super().__init__(filename, resume, dedup)
+        self.db_filename = filename
+        self.conn = None
+        self.conn_thread_id = None
+        self.nb_pending_tiles = 0
+
+    def __getstate__(self):
+        # The connection of the writer is not shared with worker processes
+        state = self.__dict__.copy()
+        state["conn"] = None
+        return state
+
+    def create_tables(self, conn) -> None:
+        keys = ", ".join(self.key_columns)
+        if not self.dedup:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tiles (%s, tile_data blob)"
+                % self.key_column_definitions
+            )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (%s)" % keys
+            )
+            return
+
+        content_id = self.content_id_column
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS map (%s, %s text)"
+            % (self.key_column_definitions, content_id)
+        )
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS map_index ON map (%s)" % keys)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS images (tile_data blob, %s text)" % content_id
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS images_id ON images (%s)" % content_id
+        )
+        conn.execute(
+            "CREATE VIEW IF NOT EXISTS tiles AS SELECT %s, images.tile_data AS "
+            "tile_data FROM map JOIN images ON images.%s = map.%s"
+            % (
+                ", ".join("map.%s AS %s" % (col, col) for col in self.key_columns),
+                content_id,
+                content_id,
+            )
+        )
+
+    @abc.abstractmethod
+    def tile_key(self, tz: int, tx: int, ty: int) -> Tuple[int, ...]:
+        pass
+
+    def open(self) -> None:
+        import sqlite3
+
+        if not self.resume and os.path.exists(self.db_filename):
+            os.unlink(self.db_filename)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_filename)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_filename)
+        self.conn_thread_id = threading.get_ident()
+        row = self.conn.execute(
+            "SELECT type FROM sqlite_master WHERE name = 'tiles'"
+        ).fetchone()
+        if row and (row[0] == "view") != self.dedup:
+            raise Exception(
+                "%s has been created %s --dedup. Use the same setting to resume it"
+                % (self.filename, "with" if row[0] == "view" else "without")
+            )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables(self.conn)
+        self.conn.commit()
+
+    def _select(self, columns: str, tz: int, tx: int, ty: int):
+        sql = "SELECT %s FROM tiles WHERE %s" % (
+            columns,
+            " AND ".join("%s = ?" % col for col in self.key_columns),
+        )
+        if self.conn is not None and self.conn_thread_id == threading.get_ident():
+            return self.conn.execute(sql, self.tile_key(tz, tx, ty)).fetchone()
+
+        # Short lived connection, so that the writer is never prevented from
+        # closing the database, and that worker threads do not use the
+        # connection of the writer
+        import sqlite3
+
+        with contextlib.closing(
+            sqlite3.connect("file:%s?mode=ro" % self.db_filename, uri=True, timeout=60)
+        ) as conn:
+            return conn.execute(sql, self.tile_key(tz, tx, ty)).fetchone()
+
+    def has_tile(self, tz: int, tx: int, ty: int) -> bool:
+        return self._select("1", tz, tx, ty) is not None
+
+    def read_tile(self, tz: int, tx: int, ty: int) -> Optional[bytes]:
+        row = self._select("tile_data", tz, tx, ty)
+        return bytes(row[0]) if row else None
+
+    def write_tiles(self, tiles: List[EncodedTile]) -> None:
+        if not tiles:
+            return
+        placeholders = ", ".join("?" * (len(self.key_columns) + 1))
+        if not self.dedup:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tiles (%s, tile_data) VALUES (%s)"
+                % (", ".join(self.key_columns), placeholders),
+                [self.tile_key(t.tz, t.tx, t.ty) + (t.data,) for t in tiles],
+            )
+        else:
+            # Duplicate tiles only reference the tile data previously sent
+            # for their digest by the same worker
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO images (tile_data, %s) VALUES (?, ?)"
+                % self.content_id_column,
+                [(t.data, t.digest) for t in tiles if t.data is not None],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO map (%s, %s) VALUES (%s)"
+                % (", ".join(self.key_columns), self.content_id_column, placeholders),
+                [self.tile_key(t.tz, t.tx, t.ty) + (t.digest,) for t in tiles],
+            )
+        self.nb_pending_tiles += len(tiles)
+        if self.nb_pending_tiles >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.conn.commit()
+        self.nb_pending_tiles = 0
+
+    def close(self) -> None:
+        if self.conn is None:
+            return
+        self.flush()
+        # Back to a single file database
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.close()
+        self.conn = None
+
+
+class MBTilesTileSink(SQLiteTileSink):
+    """MBTiles 1.3 output (https://github.com/mapbox/mbtiles-spec)"""
+
+    extension = ".mbtiles"
+    name = "MBTiles"
+    key_columns = ("zoom_level", "tile_column", "tile_row")
+    key_column_definitions = "zoom_level integer, tile_column integer, tile_row integer"
+    # Name used by the deduplicated layout of other MBTiles writers
+    content_id_column = "tile_id"
+
+    def create_tables(self, conn) -> None:
+        conn.execute("CREATE TABLE IF NOT EXISTS metadata (name text, value text)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS name_index ON metadata (name)")
+        super().create_tables(conn)
+
+    def tile_key(self, tz: int, tx: int, ty: int) -> Tuple[int, ...]:
+        # MBTiles rows use a bottom-y origin as well
+        return (tz, tx, ty)
+
+    def set_metadata(self, metadata: Dict[str, Any]) -> None:
+        values = dict(metadata)
+        values["bounds"] = ",".join("%.9g" % v for v in metadata["bounds"])
+        values["center"] = ",".join("%.9g" % v for v in metadata["center"])
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items() if v is not None],
+        )
+        self.conn.commit()
+
+
+def pmtiles_tile_id(tz: int, tx: int, ty: int) -> int:
+    """Return the PMTiles tile id (position on the Hilbert curves of all zoom
+    levels) of a tile with a top-y (XYZ) origin"""
+
+    tile_id = ((1 << (2 * tz)) - 1) // 3
+    n = 1 << tz
+    s = n >> 1
+    while s > 0:
+        rx = 1 if tx & s else 0
+        ry = 1 if ty & s else 0
+        tile_id += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                tx = n - 1 - tx
+                ty = n - 1 - ty
+            tx, ty = ty, tx
+        s >>= 1
+    return tile_id
+
+
+def pmtiles_tile_zxy(tile_id: int) -> Tuple[int, int, int]:
+    """Reverse of pmtiles_tile_id(), returning the tile with a bottom-y
+    (TMS) origin"""
+
+    tz = 0
+    first_tile_id = 0
+    while first_tile_id + (1 << (2 * tz)) <= tile_id:
+        first_tile_id += 1 << (2 * tz)
+        tz += 1
+
+    n = 1 << tz
+    pos = tile_id - first_tile_id
+    tx = ty = 0
+    s = 1
+    while s < n:
+        rx = 1 & (pos // 2)
+        ry = 1 & (pos ^ rx)
+        if ry == 0:
+            if rx == 1:
+                tx = s - 1 - tx
+                ty = s - 1 - ty
+            tx, ty = ty, tx
+        tx += s * rx
+        ty += s * ry
+        pos //= 4
+        s *= 2
+    return tz, tx, n - 1 - ty
+
+
+def _write_varint(buf: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def pmtiles_serialize_directory(entries: List[List[int]]) -> bytes:
+    """Serialize and gzip compress a list of [tile_id, offset, length, run_length]
+    PMTiles directory entries"""
+
+    buf = bytearray()
+    _write_varint(buf, len(entries))
+    last_tile_id = 0
+    for entry in entries:
+        _write_varint(buf, entry[0] - last_tile_id)
+        last_tile_id = entry[0]
+    for entry in entries:
+        _write_varint(buf, entry[3])
+    for entry in entries:
+        _write_varint(buf, entry[2])
+    for i, entry in enumerate(entries):
+        if i > 0 and entry[1] == entries[i - 1][1] + entries[i - 1][2]:
+            _write_varint(buf, 0)
+        else:
+            _write_varint(buf, entry[1] + 1)
+    return gzip.compress(bytes(buf), mtime=0)
+
+
+def pmtiles_deserialize_directory(data: bytes) -> List[List[int]]:
+    """Reverse of pmtiles_serialize_directory()"""
+
+    data = gzip.decompress(data)
+    nb_entries, pos = _read_varint(data, 0)
+    entries = [[0, 0, 0, 0] for _ in range(nb_entries)]
+    last_tile_id = 0
+    for entry in entries:
+        delta, pos = _read_varint(data, pos)
+        last_tile_id += delta
+        entry[0] = last_tile_id
+    for field in (3, 2):
+        for entry in entries:
+            entry[field], pos = _read_varint(data, pos)
+    for i, entry in enumerate(entries):
+        offset, pos = _read_varint(data, pos)
+        if offset == 0 and i > 0:
+            entry[1] = entries[i - 1][1] + entries[i - 1][2]
+        else:
+            entry[1] = offset - 1
+    return entries
+
+
+class PMTilesTileSink(SQLiteTileSink):
+    """
+    PMTiles version 3 output (https://github.com/protomaps/PMTiles).
+
+    Tiles are staged in a SQLite database indexed by PMTiles tile id, from
+    which a clustered archive is written when closing the sink. The staging
+    database is kept if the generation is interrupted, so that --resume can
+    start from it.
+    """
+
+    extension = ".pmtiles"
+    name = "PMTiles"
+    key_columns = ("tile_id",)
+    key_column_definitions = "tile_id INTEGER PRIMARY KEY"
+
+    header_size = 127
+    max_root_directory_size = 16384 - header_size
+    header_struct = struct.Struct("<7sB11QBBBBBBiiiiBii")
+    tile_types = {"png": 2, "jpg": 3, "webp": 4}
+
+    def __init__(
+        self, filename: str, resume: bool = False, dedup: bool = False
+    ) -> None:
+        super().__init__(filename, resume, dedup)
+        self.db_filename = filename + ".tmp.sqlite"
+        self.metadata = {}
+
+    def tile_key(self, tz: int, tx: int, ty: int) -> Tuple[int, ...]:
+        return (pmtiles_tile_id(tz, tx, (1 << tz) - 1 - ty),)
+
+    def open(self) -> None:
+        resume_from_archive = (
+            self.resume
+            and not os.path.exists(self.db_filename)
+            and os.path.exists(self.filename)
+        )
+        super().open()
+        if resume_from_archive:
+            self.import_archive()
+
+    def set_metadata(self, metadata: Dict[str, Any]) -> None:
+        self.metadata = metadata
+
+    def import_archive(self) -> None:
+        """Load the tiles of an existing archive into the staging database"""
+
+        with open(self.filename, "rb") as f:
+            header = self.header_struct.unpack(f.read(self.header_size))
+            if header[0] != b"PMTiles" or header[1] != 3:
+                raise Exception("%s is not a PMTiles v3 file" % self.filename)
+            (
+                root_offset,
+                root_length,
+                _,
+                _,
+                leaves_offset,
+                _,
+                data_offset,
+            ) = header[2:9]
+            if header[14] != 2:
+                raise Exception(
+                    "%s: only gzip compressed directories are supported" % self.filename
+                )
+
+            def import_directory(offset, length):
+                f.seek(offset)
+                for (
+                    tile_id,
+                    entry_offset,
+                    entry_length,
+                    run_length,
+                ) in pmtiles_deserialize_directory(f.read(length)):
+                    if run_length == 0:
+                        import_directory(leaves_offset + entry_offset, entry_length)
+                        continue
+                    f.seek(data_offset + entry_offset)
+                    data = f.read(entry_length)
+                    self.write_tiles(
+                        [
+                            EncodedTile(
+                                *pmtiles_tile_zxy(tile_id + i),
+                                data,
+                                # Tiles sharing their data in the archive
+                                # share it in the staging database too
+                                digest="archive:%d" % entry_offset,
+                            )
+                            for i in range(run_length)
+                        ]
+                    )
+
+            import_directory(root_offset, root_length)
+        self.flush()
+
+    def build_directories(self, entries: List[List[int]]) -> Tuple[bytes, bytes]:
+        """Return the root directory and the leaf directories of entries"""
+
+        root = pmtiles_serialize_directory(entries)
+        leaf_size = 4096
+        while len(root) > self.max_root_directory_size:
+            root_entries = []
+            leaves = bytearray()
+            for i in range(0, len(entries), leaf_size):
+                leaf = pmtiles_serialize_directory(entries[i : i + leaf_size])
+                root_entries.append([entries[i][0], len(leaves), len(leaf), 0])
+                leaves += leaf
+            root = pmtiles_serialize_directory(root_entries)
+            if len(root) <= self.max_root_directory_size:
+                return root, bytes(leaves)
+            leaf_size *= 2
+        return root, b""
+
+    def write_archive(self) -> None:
+        """Write the tiles of the staging database as a clustered archive"""
+
+        if self.dedup:
+            sql = (
+                "SELECT map.tile_id, map.content_id, images.tile_data FROM map "
+                "JOIN images ON images.content_id = map.content_id "
+                "ORDER BY map.tile_id"
+            )
+        else:
+            sql = "SELECT tile_id, NULL, tile_data FROM tiles ORDER BY tile_id"
+
+        tmp_data_filename = self.filename + ".tmp.data"
+        entries = []
+        # Offset and length of the data of each content id
+        contents = {}
+        addressed_tiles = 0
+        offset = 0
+        last_content = None
+        with open(tmp_data_filename, "wb") as data_f:
+            for tile_id, content_id, data in self.conn.execute(sql):
+                addressed_tiles += 1
+                content = content_id if content_id is not None else data
+                last_entry = entries[-1] if entries else None
+                if (
+                    last_entry
+                    and tile_id == last_entry[0] + last_entry[3]
+                    and content == last_content
+                ):
+                    # Run of identical consecutive tiles
+                    last_entry[3] += 1
+                    continue
+                last_content = content
+
+                if content_id in contents:
+                    # Data shared with a previous tile
+                    entries.append([tile_id, *contents[content_id], 1])
+                    continue
+                data_f.write(data)
+                entries.append([tile_id, offset, len(data), 1])
+                if content_id is not None:
+                    contents[content_id] = (offset, len(data))
+                offset += len(data)
+
+        root, leaves = self.build_directories(entries)
+        metadata = gzip.compress(
+            json.dumps(self.metadata, sort_keys=True).encode("utf-8"), mtime=0
+        )
+        west, south, east, north = self.metadata.get("bounds", (-180, -85, 180, 85))
+        center_lon, center_lat, center_zoom = self.metadata.get(
+            "center", (0, 0, self.metadata.get("minzoom", 0))
+        )
+
+        def e7(value):
+            return int(round(value * 10000000))
+
+        metadata_offset = self.header_size + len(root)
+        leaves_offset = metadata_offset + len(metadata)
+        data_offset = leaves_offset + len(leaves)
+        header = self.header_struct.pack(
+            b"PMTiles",
+            3,
+            self.header_size,
+            len(root),
+            metadata_offset,
+            len(metadata),
+            leaves_offset,
+            len(leaves),
+            data_offset,
+            offset,
+            addressed_tiles,
+            len(entries),
+            len(contents) if self.dedup else len(entries),
+            1,  # clustered
+            2,  # gzip internal compression
+            1,  # no tile compression
+            self.tile_types.get(self.metadata.get("format"), 0),
+            self.metadata.get("minzoom", 0),
+            self.metadata.get("maxzoom", 0),
+            e7(west),
+            e7(south),
+            e7(east),
+            e7(north),
+            center_zoom,
+            e7(center_lon),
+            e7(center_lat),
+        )
+
+        tmp_filename = self.filename + ".tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(header)
+            f.write(root)
+            f.write(metadata)
+            f.write(leaves)
+            with open(tmp_data_filename, "rb") as data_f:
+                shutil.copyfileobj(data_f, f)
+        os.unlink(tmp_data_filename)
+        os.replace(tmp_filename, self.filename)
+
+    def close(self) -> None:
+        if self.conn is None:
+            return
+        self.flush()
+        self.write_archive()
+        self.conn.close()
+        self.conn = None
+        os.unlink(self.db_filename)
+
+
+tile_sink_classes = (MBTilesTileSink, PMTilesTileSink)
+
+
+def get_tile_sink_class(output: str):
+    """Return the TileSink class to use for an output, or None for a directory"""
+
+    for tile_sink_class in tile_sink_classes:
+        if output.lower().endswith(tile_sink_class.extension):
+            return tile_sink_class
+    return None
+
+
 class UnsupportedTileMatrixSet(Exception):
     pass
 
@@ -1282,7 +1895,168 @@ def _get_creation_options(options):
     return copts
 
 
-def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") -> None:
+def get_dedup_tiles(tile_job_info: "TileJobInfo") -> "OrderedDict[str, str]":
+    """Return the digests of the tiles recently encoded by this worker, with
+    their file name"""
+
+    dedup_tiles = getattr(threadLocal, "dedup_tiles", None)
+    if dedup_tiles is None or dedup_tiles[0] != tile_job_info.dedup_id:
+        dedup_tiles = (tile_job_info.dedup_id, OrderedDict())
+        threadLocal.dedup_tiles = dedup_tiles
+    return dedup_tiles[1]
+
+
+def link_tile(target: str, tilefilename: str, link_type: str) -> None:
+    """Create tilefilename as a hard or symbolic link to target, or as a copy
+    if links are not supported"""
+
+    if not tilefilename.startswith("/vsi"):
+        if os.path.lexists(tilefilename):
+            os.unlink(tilefilename)
+        try:
+            if link_type == "symlink":
+                os.symlink(
+                    os.path.relpath(target, os.path.dirname(tilefilename)),
+                    tilefilename,
+                )
+            else:
+                os.link(target, tilefilename)
+            return
+        except OSError:
+            pass
+
+    if gdal.CopyFile(target, tilefilename) != 0:
+        raise Exception("Cannot copy %s to %s" % (target, tilefilename))
+
+
+def unlink_shared_tile(tilefilename: str) -> None:
+    """Remove a tile file that is a link created by --dedup, so that writing
+    it does not modify the tiles sharing its content"""
+
+    if tilefilename.startswith("/vsi"):
+        return
+    try:
+        st = os.lstat(tilefilename)
+    except OSError:
+        return
+    if stat.S_ISLNK(st.st_mode) or st.st_nlink > 1:
+        os.unlink(tilefilename)
+
+
+def write_tile(
+    tile_job_info: "TileJobInfo",
+    dstile: gdal.Dataset,
+    tilefilename: str,
+    tile: Tuple[int, int, int],
+    encoded_tiles: Optional[List[EncodedTile]],
+) -> None:
+    """Encode a tile into its file, or in memory into encoded_tiles when the
+    output is a tile sink.
+
+    With --dedup, a tile with the same pixels as a tile recently encoded by
+    the same worker is not encoded again: it is linked to the file of that
+    tile, or only referenced by its digest for a tile sink.
+    """
+
+    options = tile_job_info.options
+    tile_sink = tile_job_info.tile_sink
+
+    digest = None
+    if options.dedup:
+        digest = hashlib.blake2b(dstile.ReadRaster(), digest_size=16).hexdigest()
+        dedup_tiles = get_dedup_tiles(tile_job_info)
+        previous_tilefilename = dedup_tiles.get(digest)
+        if previous_tilefilename is not None:
+            dedup_tiles.move_to_end(digest)
+            if tile_sink is None:
+                link_tile(previous_tilefilename, tilefilename, options.dedup_link)
+            encoded_tiles.append(EncodedTile(*tile, None, digest, duplicate=True))
+            return
+        dedup_tiles[digest] = tilefilename
+        if len(dedup_tiles) > 4096:
+            dedup_tiles.popitem(last=False)
+
+    if tile_sink is not None:
+        tilefilename = "/vsimem/gdal2tiles/%s.%s" % (
+            uuid4(),
+            tile_job_info.tile_extension,
+        )
+    else:
+        unlink_shared_tile(tilefilename)
+
+    # Write a copy of tile to png/jpg
+    out_driver = gdal.GetDriverByName(tile_job_info.tile_driver)
+    out_driver.CreateCopy(
+        tilefilename,
+        dstile if tile_job_info.tile_driver != "JPEG" else remove_alpha_band(dstile),
+        strict=0,
+        options=_get_creation_options(options),
+    )
+
+    # Remove useless side car file
+    aux_xml = tilefilename + ".aux.xml"
+    if gdal.VSIStatL(aux_xml) is not None:
+        gdal.Unlink(aux_xml)
+
+    if tile_sink is not None:
+        with gdal.VSIFile(tilefilename, "rb") as f:
+            encoded_tiles.append(EncodedTile(*tile, f.read(), digest))
+        gdal.Unlink(tilefilename)
+    elif digest is not None:
+        encoded_tiles.append(EncodedTile(*tile, None, digest))
+
+
+def open_tile_data(data: bytes, tile_extension: str) -> gdal.Dataset:
+    """Decode a tile read from a tile sink into a MEM dataset"""
+
+    tilefilename = "/vsimem/gdal2tiles/%s.%s" % (uuid4(), tile_extension)
+    gdal.FileFromMemBuffer(tilefilename, data)
+    try:
+        ds = gdal.Open(tilefilename, gdal.GA_ReadOnly)
+        return gdal.GetDriverByName("MEM").CreateCopy("", ds, 0)
+    finally:
+        ds = None
+        gdal.Unlink(tilefilename)
+
+
+def tile_exists(
+    tile_job_info: "TileJobInfo", tilefilename: str, tile: Tuple[int, int, int]
+) -> bool:
+    if tile_job_info.tile_sink is not None:
+        return tile_job_info.tile_sink.has_tile(*tile)
+    return isfile(tilefilename)
+
+
+def create_base_tile(
+    tile_job_info: "TileJobInfo", tile_detail: "TileDetail"
+) -> List[EncodedTile]:
+    """Generate a base tile, and return the records of the tiles written
+    (encoded if the output is a tile sink)"""
+    encoded_tiles = []
+    _create_base_tile(tile_job_info, tile_detail, encoded_tiles)
+    return encoded_tiles
+
+
+def create_base_tile_batch(
+    tile_job_info: "TileJobInfo", batch: Tuple[int, List["TileDetail"]]
+) -> Tuple[int, List[EncodedTile]]:
+    """Generate a batch of base tiles, as returned by
+    GDAL2Tiles.generate_base_tile_batches(), and return the number of tiles
+    of the batch and the records of the tiles written"""
+    nb_tiles, tile_details = batch
+    encoded_tiles = []
+    for tile_detail in tile_details:
+        _create_base_tile(tile_job_info, tile_detail, encoded_tiles)
+    return nb_tiles, encoded_tiles
+
+
+def _create_base_tile(
+    tile_job_info: "TileJobInfo",
+    tile_detail: "TileDetail",
+    encoded_tiles: Optional[List[EncodedTile]] = None,
+) -> Optional[gdal.Dataset]:
+    """Generate a base tile and return its in-memory dataset, or None if it
+    has been excluded"""
 
     dataBandsCount = tile_job_info.nb_data_bands
     output = tile_job_info.output_file_path
@@ -1300,7 +2074,6 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
         threadLocal.cached_ds = ds
 
     mem_drv = gdal.GetDriverByName("MEM")
-    out_drv = gdal.GetDriverByName(tile_job_info.tile_driver)
     alphaband = ds.GetRasterBand(1).GetMaskBand()
 
     tx = tile_detail.tx
@@ -1338,7 +2111,7 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
         if tile_job_info.exclude_transparent and len(alpha) == alpha.count(
             "\x00".encode("ascii")
         ):
-            return
+            return None
 
         data = ds.ReadRaster(
             rx,
@@ -1392,21 +2165,14 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
 
     del data
 
-    # Write a copy of tile to png/jpg
-    out_drv.CreateCopy(
+    write_tile(
+        tile_job_info,
+        dstile,
         tilefilename,
-        dstile if tile_job_info.tile_driver != "JPEG" else remove_alpha_band(dstile),
-        strict=0,
-        options=_get_creation_options(options),
+        (tz, tx, GDAL2Tiles.getYTile(ty, tz, options)),
+        encoded_tiles,
     )
 
-    # Remove useless side car file
-    aux_xml = tilefilename + ".aux.xml"
-    if gdal.VSIStatL(aux_xml) is not None:
-        gdal.Unlink(aux_xml)
-
-    del dstile
-
     # Create a KML file for this tile.
     if tile_job_info.kml:
         swne = get_tile_swne(tile_job_info, options)
@@ -1431,6 +2197,8 @@ def create_base_tile(tile_job_info: "TileJobInfo", tile_detail: "TileDetail") ->
                         ).encode("utf-8")
                     )
 
+    return dstile
+
 
 def remove_alpha_band(src_ds):
     if (
@@ -1470,8 +2238,56 @@ def create_overview_tile(
     output_folder: str,
     tile_job_info: "TileJobInfo",
     options: Options,
-):
+) -> List[EncodedTile]:
     """Generating an overview tile from no more than 4 underlying tiles(base tiles)"""
+    encoded_tiles = []
+    _create_overview_tile(
+        base_tz,
+        base_tiles,
+        output_folder,
+        tile_job_info,
+        options,
+        encoded_tiles=encoded_tiles,
+    )
+    return encoded_tiles
+
+
+def create_overview_tile_batch(
+    base_tz: int,
+    tile_job_info: "TileJobInfo",
+    base_tile_groups: List[List[Tuple[int, int]]],
+) -> Tuple[int, List[EncodedTile]]:
+    """Generate the overview tiles of a batch of groups of base tiles, and
+    return the number of overview tiles of the batch and the records of the
+    tiles written"""
+    encoded_tiles = []
+    for base_tiles in base_tile_groups:
+        _create_overview_tile(
+            base_tz,
+            base_tiles,
+            tile_job_info.output_file_path,
+            tile_job_info,
+            tile_job_info.options,
+            encoded_tiles=encoded_tiles,
+        )
+    return len(base_tile_groups), encoded_tiles
+
+
+def _create_overview_tile(
+    base_tz: int,
+    base_tiles: List[Tuple[int, int]],
+    output_folder: str,
+    tile_job_info: "TileJobInfo",
+    options: Options,
+    base_tile_datasets: Optional[Dict[Tuple[int, int], gdal.Dataset]] = None,
+    encoded_tiles: Optional[List[EncodedTile]] = None,
+) -> Optional[gdal.Dataset]:
+    """Generate an overview tile and return its in-memory dataset, or None if
+    it has not been generated.
+
+    Base tiles found in base_tile_datasets are used directly, the other ones
+    are read back from the output folder or tile sink.
+    """
 
     overview_tz = base_tz - 1
     overview_tx = base_tiles[0][0] >> 1
@@ -1486,14 +2302,14 @@ def create_overview_tile(
     )
     if options.verbose:
         logger.debug(tilefilename)
-    if options.resume and isfile(tilefilename):
+    if options.resume and tile_exists(
+        tile_job_info, tilefilename, (overview_tz, overview_tx, overview_ty)
+    ):
         if options.verbose:
             logger.debug("Tile generation skipped because of --resume")
-        return
+        return None
 
     mem_driver = gdal.GetDriverByName("MEM")
-    tile_driver = tile_job_info.tile_driver
-    out_driver = gdal.GetDriverByName(tile_driver)
 
     tilebands = tile_job_info.nb_data_bands + 1
 
@@ -1512,18 +2328,30 @@ def create_overview_tile(
     for base_tile in base_tiles:
         base_tx = base_tile[0]
         base_ty = base_tile[1]
-        base_ty_real = GDAL2Tiles.getYTile(base_ty, base_tz, options)
 
-        base_tile_path = os.path.join(
-            output_folder,
-            str(base_tz),
-            str(base_tx),
-            "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
-        )
-        if not isfile(base_tile_path):
-            continue
+        dsquerytile = None
+        if base_tile_datasets:
+            dsquerytile = base_tile_datasets.get(base_tile)
+        if dsquerytile is None and tile_job_info.tile_sink is not None:
+            base_tile_data = tile_job_info.tile_sink.read_tile(
+                base_tz, base_tx, base_ty
+            )
+            if base_tile_data is None:
+                continue
+            dsquerytile = open_tile_data(base_tile_data, tile_job_info.tile_extension)
+        elif dsquerytile is None:
+            base_ty_real = GDAL2Tiles.getYTile(base_ty, base_tz, options)
+
+            base_tile_path = os.path.join(
+                output_folder,
+                str(base_tz),
+                str(base_tx),
+                "%s.%s" % (base_ty_real, tile_job_info.tile_extension),
+            )
+            if not isfile(base_tile_path):
+                continue
 
-        dsquerytile = gdal.Open(base_tile_path, gdal.GA_ReadOnly)
+            dsquerytile = gdal.Open(base_tile_path, gdal.GA_ReadOnly)
 
         if base_tx % 2 == 0:
             tileposx = 0
@@ -1607,21 +2435,17 @@ def create_overview_tile(
         usable_base_tiles.append(base_tile)
 
     if not usable_base_tiles:
-        return
+        return None
 
     scale_query_to_tile(dsquery, dstile, options, tilefilename=tilefilename)
 
-    # Write a copy of tile to png/jpg
-    out_driver.CreateCopy(
+    write_tile(
+        tile_job_info,
+        dstile,
         tilefilename,
-        dstile if tile_job_info.tile_driver != "JPEG" else remove_alpha_band(dstile),
-        strict=0,
-        options=_get_creation_options(options),
+        (overview_tz, overview_tx, overview_ty),
+        encoded_tiles,
     )
-    # Remove useless side car file
-    aux_xml = tilefilename + ".aux.xml"
-    if gdal.VSIStatL(aux_xml) is not None:
-        gdal.Unlink(aux_xml)
 
     if options.verbose:
         logger.debug(
@@ -1653,41 +2477,188 @@ def create_overview_tile(
                     ).encode("utf-8")
                 )
 
+    return dstile
 
-def group_overview_base_tiles(
-    base_tz: int, output_folder: str, tile_job_info: "TileJobInfo"
-) -> List[List[Tuple[int, int]]]:
-    """Group base tiles that belong to the same overview tile"""
 
-    overview_to_bases = {}
+def iter_tiles_in_morton_order(
+    tminx: int, tminy: int, tmaxx: int, tmaxy: int
+) -> Iterator[Tuple[int, int]]:
+    """Iterate the tiles of a tile range in Morton (Z) order, quadrant by
+    quadrant of the tile quadtree, so that consecutive tiles are spatially close"""
+
+    shift = 0
+    while (tminx >> shift, tminy >> shift) != (tmaxx >> shift, tmaxy >> shift):
+        shift += 1
+
+    def visit(tx, ty, shift):
+        if shift == 0:
+            yield tx, ty
+            return
+        shift -= 1
+        for sub_ty in (2 * ty, 2 * ty + 1):
+            if tminy >> shift <= sub_ty <= tmaxy >> shift:
+                for sub_tx in (2 * tx, 2 * tx + 1):
+                    if tminx >> shift <= sub_tx <= tmaxx >> shift:
+                        yield from visit(sub_tx, sub_ty, shift)
+
+    yield from visit(tminx >> shift, tminy >> shift, shift)
+
+
+def iter_batches(iterable, batch_size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of up to batch_size items"""
+
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def get_batch_size(nb_tiles: int, nb_processes: int) -> int:
+    """Return the number of tiles of a job: large enough to amortize the
+    dispatching of the jobs, but small enough to give several jobs to each
+    process, so that they finish at about the same time"""
+
+    return max(1, min(64, nb_tiles // (4 * nb_processes)))
+
+
+def iter_overview_base_tile_groups(
+    base_tz: int, tile_job_info: "TileJobInfo"
+) -> Iterator[List[Tuple[int, int]]]:
+    """Group base tiles that belong to the same overview tile, in Morton order
+    of the overview tiles"""
+
     tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[base_tz]
-    for ty in range(tmaxy, tminy - 1, -1):
-        overview_ty = ty >> 1
-        for tx in range(tminx, tmaxx + 1):
-            overview_tx = tx >> 1
-            base_tile = (tx, ty)
-            overview_tile = (overview_tx, overview_ty)
+    for overview_tx, overview_ty in iter_tiles_in_morton_order(
+        tminx >> 1, tminy >> 1, tmaxx >> 1, tmaxy >> 1
+    ):
+        yield [
+            (tx, ty)
+            for ty in (2 * overview_ty + 1, 2 * overview_ty)
+            if tminy <= ty <= tmaxy
+            for tx in (2 * overview_tx, 2 * overview_tx + 1)
+            if tminx <= tx <= tmaxx
+        ]
 
-            if overview_tile not in overview_to_bases:
-                overview_to_bases[overview_tile] = []
 
-            overview_to_bases[overview_tile].append(base_tile)
+def makedirs_overview_tiles(
+    base_tz: int, output_folder: str, tile_job_info: "TileJobInfo"
+) -> None:
+    """Create the directories of the overview tiles built from base_tz"""
+
+    if tile_job_info.tile_sink is not None:
+        return
 
-    # Create directories for the tiles
+    tminx, _, tmaxx, _ = tile_job_info.tminmax[base_tz]
     overview_tz = base_tz - 1
-    for tx in range(tminx, tmaxx + 1):
-        overview_tx = tx >> 1
+    for overview_tx in range(tminx >> 1, (tmaxx >> 1) + 1):
         tiledirname = os.path.join(output_folder, str(overview_tz), str(overview_tx))
         makedirs(tiledirname)
 
-    return list(overview_to_bases.values())
+
+def get_subtree_root_zoom(tile_job_info: "TileJobInfo", nb_processes: int) -> int:
+    """Return the zoom level of the roots of the quadtree subtrees that are
+    generated independently with --in-memory-overviews: the lowest one with
+    enough tiles to keep all processes busy"""
+
+    root_tz = tile_job_info.tmaxz
+    if nb_processes <= 1:
+        root_tz = tile_job_info.tminz
+    else:
+        for tz in range(tile_job_info.tminz, tile_job_info.tmaxz):
+            tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
+            if (1 + tmaxx - tminx) * (1 + tmaxy - tminy) >= 4 * nb_processes:
+                root_tz = tz
+                break
+
+    if tile_job_info.tile_sink is not None:
+        # The encoded tiles of a subtree are handed to the tile sink at once:
+        # bound their number
+        root_tz = max(root_tz, tile_job_info.tmaxz - 5)
+
+    return root_tz
+
+
+def create_tile_subtree(
+    tile_job_info: "TileJobInfo",
+    root_tz: int,
+    subtree: Tuple[Tuple[int, int], List["TileDetail"]],
+) -> Tuple[int, List[EncodedTile]]:
+    """Generate the base tiles and overview tiles of the quadtree below a tile
+    of zoom level root_tz, and return the number of tiles processed, and the
+    encoded tiles if the output is a tile sink.
+
+    The quadtree is walked depth-first, so that each overview tile is built
+    from the in-memory datasets of its (up to 4) children, which are released
+    right after. At most 4 tiles per zoom level are thus held in memory.
+    """
+
+    (root_tx, root_ty), tile_details = subtree
+    options = tile_job_info.options
+    output_folder = tile_job_info.output_file_path
+    tmaxz = tile_job_info.tmaxz
+
+    base_tile_details = {
+        (tile_detail.tx, GDAL2Tiles.getYTile(tile_detail.ty, tmaxz, options)): (
+            tile_detail
+        )
+        for tile_detail in tile_details
+    }
+    nb_tiles = 0
+    encoded_tiles = []
+
+    def visit(tz, tx, ty):
+        nonlocal nb_tiles
+
+        nb_tiles += 1
+        if tz == tmaxz:
+            tile_detail = base_tile_details.get((tx, ty))
+            if tile_detail is None:
+                # Tile without pixel coverage or skipped because of --resume
+                return None
+            return _create_base_tile(tile_job_info, tile_detail, encoded_tiles)
+
+        tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz + 1]
+        base_tiles = [
+            (base_tx, base_ty)
+            for base_ty in (2 * ty + 1, 2 * ty)
+            for base_tx in (2 * tx, 2 * tx + 1)
+            if tminx <= base_tx <= tmaxx and tminy <= base_ty <= tmaxy
+        ]
+        if not base_tiles:
+            return None
+
+        base_tile_datasets = {}
+        for base_tile in base_tiles:
+            base_tile_ds = visit(tz + 1, base_tile[0], base_tile[1])
+            if base_tile_ds is not None:
+                base_tile_datasets[base_tile] = base_tile_ds
+
+        return _create_overview_tile(
+            tz + 1,
+            base_tiles,
+            output_folder,
+            tile_job_info,
+            options,
+            base_tile_datasets,
+            encoded_tiles,
+        )
+
+    visit(root_tz, root_tx, root_ty)
+
+    return nb_tiles, encoded_tiles
+
+
+def count_tiles(tile_job_info: "TileJobInfo", tz: int) -> int:
+    tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
+    return (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
 
 
 def count_overview_tiles(tile_job_info: "TileJobInfo") -> int:
     tile_number = 0
     for tz in range(tile_job_info.tmaxz - 1, tile_job_info.tminz - 1, -1):
-        tminx, tminy, tmaxx, tmaxy = tile_job_info.tminmax[tz]
-        tile_number += (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
+        tile_number += count_tiles(tile_job_info, tz)
 
     return tile_number
 
@@ -1789,6 +2760,12 @@ def optparse_init() -> optparse.OptionParser:
         type="int",
         help="Number of processes to use for tiling",
     )
+    p.add_option(
+        "--threads",
+        dest="nb_threads",
+        type="int",
+        help="Number of threads to use for tiling, instead of processes",
+    )
     p.add_option(
         "--mpi",
         action="store_true",
@@ -1796,6 +2773,29 @@ def optparse_init() -> optparse.OptionParser:
         help="Assume launched by mpiexec and ignore --processes. "
         "User should set GDAL_CACHEMAX to size per process.",
     )
+    p.add_option(
+        "--in-memory-overviews",
+        action="store_true",
+        dest="in_memory_overviews",
+        help="Build overview tiles from the in-memory pixels of their child tiles, "
+        "walking the tile quadtree depth-first, instead of reading back and "
+        "decoding the written tiles",
+    )
+    p.add_option(
+        "--dedup",
+        action="store_true",
+        dest="dedup",
+        help="Encode tiles with identical pixels only once: link them to the "
+        "same file, or store their content once in MBTiles/PMTiles outputs",
+    )
+    p.add_option(
+        "--dedup-link",
+        dest="dedup_link",
+        choices=["hardlink", "symlink"],
+        default="hardlink",
+        help="Type of link to create for duplicated tiles in a directory output "
+        "('hardlink','symlink'; default: '%default')",
+    )
     p.add_option(
         "--tilesize",
         dest="tilesize",
@@ -2039,6 +3039,27 @@ def options_post_processing(
             out_path = out_path[:-1]
         options.url += os.path.basename(out_path) + "/"
 
+    if options.nb_threads and (
+        options.mpi or (options.nb_processes and options.nb_processes > 1)
+    ):
+        exit_with_error("--threads cannot be combined with --processes or --mpi")
+
+    tile_sink_class = get_tile_sink_class(output_folder)
+    if tile_sink_class is not None:
+        if options.profile != "mercator":
+            exit_with_error(
+                "%s output is only supported with the mercator profile"
+                % tile_sink_class.name
+            )
+        if output_folder.startswith("/vsi"):
+            exit_with_error(
+                "%s output must be a local file, not a /vsi path" % tile_sink_class.name
+            )
+        if options.kml:
+            exit_with_error(
+                "KML generation is not supported with %s output" % tile_sink_class.name
+            )
+
     # Supported options
     if options.resampling == "antialias":
         print(
@@ -2119,6 +3140,8 @@ class TileJobInfo:
     is_epsg_4326 = False
     options = None
     exclude_transparent = False
+    tile_sink = None
+    dedup_id = None
 
     def __init__(self, **kwargs):
         for key in kwargs:
@@ -2179,9 +3202,21 @@ class GDAL2Tiles:
             self.tileext = "webp"
         else:
             self.tileext = "jpg"
+
+        # Single file output
+        self.tile_sink = None
+        tile_sink_class = get_tile_sink_class(output_folder)
+        if tile_sink_class is not None:
+            self.tile_sink = tile_sink_class(
+                output_folder, options.resume, options.dedup
+            )
+
         if options.mpi:
-            makedirs(output_folder)
-            self.tmp_dir = tempfile.mkdtemp(dir=output_folder)
+            tmp_parent_dir = output_folder
+            if self.tile_sink is not None:
+                tmp_parent_dir = os.path.dirname(os.path.abspath(output_folder))
+            makedirs(tmp_parent_dir)
+            self.tmp_dir = tempfile.mkdtemp(dir=tmp_parent_dir)
         else:
             self.tmp_dir = tempfile.mkdtemp()
         self.tmp_vrt_filename = os.path.join(self.tmp_dir, str(uuid4()) + ".vrt")
@@ -2660,6 +3695,10 @@ class GDAL2Tiles:
         tiles are generated during the tile processing).
         """
 
+        if self.tile_sink is not None:
+            self.generate_tile_sink_metadata()
+            return
+
         makedirs(self.output_folder)
 
         if self.options.profile == "mercator":
@@ -2778,9 +3817,37 @@ class GDAL2Tiles:
                             ).encode("utf-8")
                         )
 
-    def generate_base_tiles(self) -> Tuple[TileJobInfo, List[TileDetail]]:
+    def generate_tile_sink_metadata(self) -> None:
         """
-        Generation of the base tiles (the lowest in the pyramid) directly from the input raster
+        Open the tile sink, and write the metadata of the tile set into it
+        """
+
+        south, west = self.mercator.MetersToLatLon(self.ominx, self.ominy)
+        north, east = self.mercator.MetersToLatLon(self.omaxx, self.omaxy)
+        south, west = max(-85.05112878, south), max(-180.0, west)
+        north, east = min(85.05112878, north), min(180.0, east)
+        self.swne = (south, west, north, east)
+
+        self.tile_sink.open()
+        self.tile_sink.set_metadata(
+            {
+                "name": self.options.title,
+                "description": "Generated by gdal2tiles from %s"
+                % os.path.basename(self.input_file),
+                "attribution": self.options.copyright,
+                "version": "1.1",
+                "type": "overlay",
+                "format": self.tileext,
+                "minzoom": self.tminz,
+                "maxzoom": self.tmaxz,
+                "bounds": (west, south, east, north),
+                "center": ((west + east) / 2, (south + north) / 2, self.tminz),
+            }
+        )
+
+    def prepare_base_tiles(self) -> None:
+        """
+        Prepare the generation of the base tiles (the lowest in the pyramid)
         """
 
         if not self.options.quiet:
@@ -2791,139 +3858,178 @@ class GDAL2Tiles:
             logger.debug("Tiles generated from the max zoom level:")
             logger.debug("----------------------------------------")
             logger.debug("")
-
-        # Set the bounds
-        tminx, tminy, tmaxx, tmaxy = self.tminmax[self.tmaxz]
-
-        ds = self.warped_input_dataset
-        tilebands = self.dataBandsCount + 1
-        querysize = self.querysize
-
-        if self.options.verbose:
             logger.debug("dataBandsCount: %d" % self.dataBandsCount)
-            logger.debug("tilebands: %d" % tilebands)
+            logger.debug("tilebands: %d" % (self.dataBandsCount + 1))
 
-        tcount = (1 + abs(tmaxx - tminx)) * (1 + abs(tmaxy - tminy))
-        ti = 0
+        # Create directories for the tiles
+        if self.tile_sink is None:
+            tminx, _, tmaxx, _ = self.tminmax[self.tmaxz]
+            for tx in range(tminx, tmaxx + 1):
+                tiledirname = os.path.join(self.output_folder, str(self.tmaxz), str(tx))
+                makedirs(tiledirname)
 
-        tile_details = []
+    def get_base_tile_detail(self, tx: int, ty: int) -> Optional[TileDetail]:
+        """
+        Return the details of the base tile (tx, ty), or None if it must not
+        be generated
+        """
 
+        ds = self.warped_input_dataset
+        querysize = self.querysize
         tz = self.tmaxz
+        tminx, tminy, tmaxx, tmaxy = self.tminmax[tz]
+
+        ytile = GDAL2Tiles.getYTile(ty, tz, self.options)
+        tilefilename = os.path.join(
+            self.output_folder,
+            str(tz),
+            str(tx),
+            "%s.%s" % (ytile, self.tileext),
+        )
+        if self.options.verbose:
+            logger.debug(tilefilename)
 
-        # Create directories for the tiles
-        for tx in range(tminx, tmaxx + 1):
-            tiledirname = os.path.join(self.output_folder, str(tz), str(tx))
-            makedirs(tiledirname)
-
-        for ty in range(tmaxy, tminy - 1, -1):
-            for tx in range(tminx, tmaxx + 1):
+        if self.options.resume and (
+            self.tile_sink.has_tile(tz, tx, ty)
+            if self.tile_sink is not None
+            else isfile(tilefilename)
+        ):
+            if self.options.verbose:
+                logger.debug("Tile generation skipped because of --resume")
+            return None
 
-                ti += 1
-                ytile = GDAL2Tiles.getYTile(ty, tz, self.options)
-                tilefilename = os.path.join(
-                    self.output_folder,
-                    str(tz),
-                    str(tx),
-                    "%s.%s" % (ytile, self.tileext),
-                )
-                if self.options.verbose:
-                    logger.debug("%d / %d, %s" % (ti, tcount, tilefilename))
+        if self.options.profile == "mercator":
+            # Tile bounds in EPSG:3857
+            b = self.mercator.TileBounds(tx, ty, tz)
+        elif self.options.profile == "geodetic":
+            b = self.geodetic.TileBounds(tx, ty, tz)
+        elif self.options.profile != "raster":
+            b = tmsMap[self.options.profile].TileBounds(tx, ty, tz, self.tile_size)
 
-                if self.options.resume and isfile(tilefilename):
-                    if self.options.verbose:
-                        logger.debug("Tile generation skipped because of --resume")
-                    continue
+        # Don't scale up by nearest neighbour, better change the querysize
+        # to the native resolution (and return smaller query tile) for scaling
 
-                if self.options.profile == "mercator":
-                    # Tile bounds in EPSG:3857
-                    b = self.mercator.TileBounds(tx, ty, tz)
-                elif self.options.profile == "geodetic":
-                    b = self.geodetic.TileBounds(tx, ty, tz)
-                elif self.options.profile != "raster":
-                    b = tmsMap[self.options.profile].TileBounds(
-                        tx, ty, tz, self.tile_size
-                    )
+        if self.options.profile != "raster":
+            rb, wb = self.geo_query(ds, b[0], b[3], b[2], b[1])
 
-                # Don't scale up by nearest neighbour, better change the querysize
-                # to the native resolution (and return smaller query tile) for scaling
+            # Pixel size in the raster covering query geo extent
+            nativesize = wb[0] + wb[2]
+            if self.options.verbose:
+                logger.debug(f"\tNative Extent (querysize {nativesize}): {rb}, {wb}")
+
+            # Tile bounds in raster coordinates for ReadRaster query
+            rb, wb = self.geo_query(ds, b[0], b[3], b[2], b[1], querysize=querysize)
+
+            rx, ry, rxsize, rysize = rb
+            wx, wy, wxsize, wysize = wb
+
+        else:  # 'raster' profile:
+
+            tsize = int(
+                self.tsize[tz]
+            )  # tile_size in raster coordinates for actual zoom
+            xsize = (
+                self.warped_input_dataset.RasterXSize
+            )  # size of the raster in pixels
+            ysize = self.warped_input_dataset.RasterYSize
+            querysize = self.tile_size
+
+            rx = tx * tsize
+            rxsize = 0
+            if tx == tmaxx:
+                rxsize = xsize % tsize
+            if rxsize == 0:
+                rxsize = tsize
+
+            ry = ty * tsize
+            rysize = 0
+            if ty == tmaxy:
+                rysize = ysize % tsize
+            if rysize == 0:
+                rysize = tsize
+
+            wx, wy = 0, 0
+            wxsize = int(rxsize / float(tsize) * self.tile_size)
+            wysize = int(rysize / float(tsize) * self.tile_size)
+
+            if not self.options.xyz:
+                ry = ysize - (ty * tsize) - rysize
+                if wysize != self.tile_size:
+                    wy = self.tile_size - wysize
+
+        if rxsize == 0 or rysize == 0 or wxsize == 0 or wysize == 0:
+            if self.options.verbose:
+                logger.debug("\tExcluding tile with no pixel coverage")
+            return None
+
+        # Read the source raster if anything is going inside the tile as per the computed
+        # geo_query
+        return TileDetail(
+            tx=tx,
+            ty=ytile,
+            tz=tz,
+            rx=rx,
+            ry=ry,
+            rxsize=rxsize,
+            rysize=rysize,
+            wx=wx,
+            wy=wy,
+            wxsize=wxsize,
+            wysize=wysize,
+            querysize=querysize,
+        )
 
-                if self.options.profile != "raster":
-                    rb, wb = self.geo_query(ds, b[0], b[3], b[2], b[1])
+    def generate_base_tile_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[int, List[TileDetail]]]:
+        """
+        Generate lazily the details of the base tiles, by batches of up to
+        batch_size tiles that are spatially close, in Morton order.
 
-                    # Pixel size in the raster covering query geo extent
-                    nativesize = wb[0] + wb[2]
-                    if self.options.verbose:
-                        logger.debug(
-                            f"\tNative Extent (querysize {nativesize}): {rb}, {wb}"
-                        )
+        Each batch is returned with the number of tiles it covers, including
+        the ones that must not be generated, for progress reporting.
+        """
 
-                    # Tile bounds in raster coordinates for ReadRaster query
-                    rb, wb = self.geo_query(
-                        ds, b[0], b[3], b[2], b[1], querysize=querysize
-                    )
+        tiles = iter_tiles_in_morton_order(*self.tminmax[self.tmaxz])
+        for batch in iter_batches(tiles, batch_size):
+            tile_details = []
+            for tx, ty in batch:
+                tile_detail = self.get_base_tile_detail(tx, ty)
+                if tile_detail is not None:
+                    tile_details.append(tile_detail)
+            yield len(batch), tile_details
+
+    def generate_base_tile_subtrees(
+        self, root_tz: int
+    ) -> Iterator[Tuple[Tuple[int, int], List[TileDetail]]]:
+        """
+        Generate lazily the details of the base tiles below each tile of zoom
+        level root_tz, in Morton order of these tiles
+        """
 
-                    rx, ry, rxsize, rysize = rb
-                    wx, wy, wxsize, wysize = wb
-
-                else:  # 'raster' profile:
-
-                    tsize = int(
-                        self.tsize[tz]
-                    )  # tile_size in raster coordinates for actual zoom
-                    xsize = (
-                        self.warped_input_dataset.RasterXSize
-                    )  # size of the raster in pixels
-                    ysize = self.warped_input_dataset.RasterYSize
-                    querysize = self.tile_size
-
-                    rx = tx * tsize
-                    rxsize = 0
-                    if tx == tmaxx:
-                        rxsize = xsize % tsize
-                    if rxsize == 0:
-                        rxsize = tsize
-
-                    ry = ty * tsize
-                    rysize = 0
-                    if ty == tmaxy:
-                        rysize = ysize % tsize
-                    if rysize == 0:
-                        rysize = tsize
-
-                    wx, wy = 0, 0
-                    wxsize = int(rxsize / float(tsize) * self.tile_size)
-                    wysize = int(rysize / float(tsize) * self.tile_size)
-
-                    if not self.options.xyz:
-                        ry = ysize - (ty * tsize) - rysize
-                        if wysize != self.tile_size:
-                            wy = self.tile_size - wysize
-
-                if rxsize == 0 or rysize == 0 or wxsize == 0 or wysize == 0:
-                    if self.options.verbose:
-                        logger.debug("\tExcluding tile with no pixel coverage")
-                    continue
+        tminx, tminy, tmaxx, tmaxy = self.tminmax[self.tmaxz]
+        shift = self.tmaxz - root_tz
+        for root_tx, root_ty in iter_tiles_in_morton_order(*self.tminmax[root_tz]):
+            tile_details = []
+            for ty in range(
+                max(tminy, root_ty << shift),
+                min(tmaxy, ((root_ty + 1) << shift) - 1) + 1,
+            ):
+                for tx in range(
+                    max(tminx, root_tx << shift),
+                    min(tmaxx, ((root_tx + 1) << shift) - 1) + 1,
+                ):
+                    tile_detail = self.get_base_tile_detail(tx, ty)
+                    if tile_detail is not None:
+                        tile_details.append(tile_detail)
+            yield (root_tx, root_ty), tile_details
 
-                # Read the source raster if anything is going inside the tile as per the computed
-                # geo_query
-                tile_details.append(
-                    TileDetail(
-                        tx=tx,
-                        ty=ytile,
-                        tz=tz,
-                        rx=rx,
-                        ry=ry,
-                        rxsize=rxsize,
-                        rysize=rysize,
-                        wx=wx,
-                        wy=wy,
-                        wxsize=wxsize,
-                        wysize=wysize,
-                        querysize=querysize,
-                    )
-                )
+    def get_tile_job_info(self) -> TileJobInfo:
+        """
+        Return the configuration of the tile jobs
+        """
 
-        conf = TileJobInfo(
+        return TileJobInfo(
             src_file=self.tmp_vrt_filename,
             nb_data_bands=self.dataBandsCount,
             output_file_path=self.output_folder,
@@ -2940,9 +4046,24 @@ class GDAL2Tiles:
             is_epsg_4326=self.isepsg4326,
             options=self.options,
             exclude_transparent=self.options.exclude_transparent,
+            tile_sink=self.tile_sink,
+            dedup_id=uuid4().hex,
         )
 
-        return conf, tile_details
+    def generate_base_tiles(self) -> Tuple[TileJobInfo, List[TileDetail]]:
+        """
+        Generation of the base tiles (the lowest in the pyramid) directly from the input raster
+
+        The details of all the base tiles are returned at once: the tiling
+        functions rather use generate_base_tile_batches(), whose memory use
+        does not depend on the number of tiles.
+        """
+
+        self.prepare_base_tiles()
+        tile_details = []
+        for _, batch in self.generate_base_tile_batches(64):
+            tile_details += batch
+        return self.get_tile_job_info(), tile_details
 
     def geo_query(self, ds, ulx, uly, lrx, lry, querysize=0):
         """
@@ -4399,14 +5520,13 @@ function ExtDraggableObject(src, opt_drag) {
         return ty
 
 
-def worker_tile_details(
+def worker_tile_job_info(
     input_file: str, output_folder: str, options: Options
-) -> Tuple[TileJobInfo, List[TileDetail]]:
+) -> Tuple[TileJobInfo, "GDAL2Tiles"]:
     gdal2tiles = GDAL2Tiles(input_file, output_folder, options)
     gdal2tiles.open_input()
     gdal2tiles.generate_metadata()
-    tile_job_info, tile_details = gdal2tiles.generate_base_tiles()
-    return tile_job_info, tile_details
+    return gdal2tiles.get_tile_job_info(), gdal2tiles
 
 
 class ProgressBar:
@@ -4476,6 +5596,45 @@ def get_tile_swne(tile_job_info, options):
     return tile_swne
 
 
+class TileWriter:
+    """
+    Receive, in the main process, the tiles encoded by the workers: hand them
+    to the tile sink, if any, and count the tiles deduplicated by --dedup
+    """
+
+    def __init__(self, tile_job_info: TileJobInfo) -> None:
+        self.tile_job_info = tile_job_info
+        self.tile_sink = tile_job_info.tile_sink
+        self.nb_tiles = 0
+        self.nb_duplicates = 0
+        self.digests = set()
+
+    def write(self, encoded_tiles: List[EncodedTile]) -> None:
+        if self.tile_job_info.options.dedup:
+            for encoded_tile in encoded_tiles:
+                self.nb_tiles += 1
+                if encoded_tile.duplicate:
+                    self.nb_duplicates += 1
+                self.digests.add(encoded_tile.digest)
+        if self.tile_sink is not None:
+            self.tile_sink.write_tiles(encoded_tiles)
+
+    def flush(self) -> None:
+        """Make the tiles written so far readable by the workers"""
+        if self.tile_sink is not None:
+            self.tile_sink.flush()
+
+    def close(self) -> None:
+        if self.tile_sink is not None:
+            self.tile_sink.close()
+        options = self.tile_job_info.options
+        if options.dedup and not options.quiet and self.nb_tiles:
+            logger.info(
+                "Deduplication: %d tiles, %d distinct contents, %d tiles not encoded"
+                % (self.nb_tiles, len(self.digests), self.nb_duplicates)
+            )
+
+
 def single_threaded_tiling(
     input_file: str, output_folder: str, options: Options
 ) -> None:
@@ -4483,42 +5642,18 @@ def single_threaded_tiling(
     Keep a single threaded version that stays clear of multiprocessing, for platforms that would not
     support it
     """
-    if options.verbose:
-        logger.debug("Begin tiles details calc")
-    conf, tile_details = worker_tile_details(input_file, output_folder, options)
+    conf, gdal2tiles = worker_tile_job_info(input_file, output_folder, options)
 
-    if options.verbose:
-        logger.debug("Tiles details calc complete.")
-
-    if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
-        base_progress_bar.start()
-
-    for tile_detail in tile_details:
-        create_base_tile(conf, tile_detail)
+    tile_writer = TileWriter(conf)
 
-        if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
+    if options.in_memory_overviews:
+        in_memory_overviews_tiling(conf, gdal2tiles, options, tile_writer)
+    else:
+        batched_tiling(conf, gdal2tiles, options, tile_writer)
 
     if getattr(threadLocal, "cached_ds", None):
         del threadLocal.cached_ds
-
-    if not options.quiet:
-        count = count_overview_tiles(conf)
-        if count:
-            logger.info("Generating Overview Tiles:")
-
-            if not options.verbose:
-                overview_progress_bar = ProgressBar(count)
-                overview_progress_bar.start()
-
-    for base_tz in range(conf.tmaxz, conf.tminz, -1):
-        base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
-        for base_tiles in base_tile_groups:
-            create_overview_tile(base_tz, base_tiles, output_folder, conf, options)
-            if not options.verbose and not options.quiet:
-                overview_progress_bar.log_progress()
-
+    tile_writer.close()
     shutil.rmtree(os.path.dirname(conf.src_file))
 
 
@@ -4526,28 +5661,106 @@ def single_threaded_tiling(
 def multi_threaded_tiling(
     input_file: str, output_folder: str, options: Options, pool
 ) -> None:
+    conf, gdal2tiles = worker_tile_job_info(input_file, output_folder, options)
+
+    tile_writer = TileWriter(conf)
+
+    if options.in_memory_overviews:
+        in_memory_overviews_tiling(conf, gdal2tiles, options, tile_writer, pool)
+    else:
+        batched_tiling(conf, gdal2tiles, options, tile_writer, pool)
+
+    tile_writer.close()
+    shutil.rmtree(os.path.dirname(conf.src_file))
+
+
+def pool_imap_unordered(pool, func, iterable, max_pending: int) -> Iterator[Any]:
+    """
+    Apply func to the items of iterable in the pool, and yield the results as
+    they are available.
+
+    Contrary to Pool.imap_unordered(), which consumes the whole iterable at
+    once, no more than max_pending items are submitted ahead: jobs can be
+    generated lazily with a bounded memory use, and are pulled by the workers
+    as soon as they are idle.
+    """
+
+    if hasattr(pool, "submit"):
+        # concurrent.futures executor (MPI)
+        submit = pool.submit
+    else:
+
+        def submit(func, item):
+            future = concurrent.futures.Future()
+            pool.apply_async(
+                func,
+                (item,),
+                callback=future.set_result,
+                error_callback=future.set_exception,
+            )
+            return future
+
+    pending = set()
+    for item in iterable:
+        pending.add(submit(func, item))
+        if len(pending) >= max_pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                yield future.result()
+
+    for future in concurrent.futures.as_completed(pending):
+        yield future.result()
+
+
+def get_imap(options: Options, pool=None):
+    """Return a map-like function running jobs in the pool, if any"""
+    if pool is None:
+        return map
     nb_processes = options.nb_processes or 1
+    use_threads = isinstance(pool, concurrent.futures.ThreadPoolExecutor)
 
-    if options.verbose:
-        logger.debug("Begin tiles details calc")
+    def imap(func, iterable):
+        if use_threads:
+            # The GDAL exception state is per thread
+            func = enable_gdal_exceptions(func)
+        return pool_imap_unordered(pool, func, iterable, 4 * nb_processes)
 
-    conf, tile_details = worker_tile_details(input_file, output_folder, options)
+    return imap
 
-    if options.verbose:
-        logger.debug("Tiles details calc complete.")
+
+def batched_tiling(
+    conf: "TileJobInfo",
+    gdal2tiles: "GDAL2Tiles",
+    options: Options,
+    tile_writer: TileWriter,
+    pool=None,
+) -> None:
+    """
+    Generate the base tiles, and then the overview tiles zoom level by zoom
+    level, by batches of spatially close tiles generated lazily
+    """
+    nb_processes = 1 if pool is None else (options.nb_processes or 1)
+    imap = get_imap(options, pool)
+
+    gdal2tiles.prepare_base_tiles()
+    nb_base_tiles = count_tiles(conf, conf.tmaxz)
 
     if not options.verbose and not options.quiet:
-        base_progress_bar = ProgressBar(len(tile_details))
+        base_progress_bar = ProgressBar(nb_base_tiles)
         base_progress_bar.start()
 
-    # TODO: gbataille - check the confs for which each element is an array... one useless level?
-    # TODO: gbataille - assign an ID to each job for print in verbose mode "ReadRaster Extent ..."
-    chunksize = max(1, min(128, len(tile_details) // nb_processes))
-    for _ in pool.imap_unordered(
-        partial(create_base_tile, conf), tile_details, chunksize=chunksize
+    for nb_tiles, encoded_tiles in imap(
+        partial(create_base_tile_batch, conf),
+        gdal2tiles.generate_base_tile_batches(
+            get_batch_size(nb_base_tiles, nb_processes)
+        ),
     ):
+        tile_writer.write(encoded_tiles)
         if not options.verbose and not options.quiet:
-            base_progress_bar.log_progress()
+            base_progress_bar.log_progress(nb_tiles)
+    tile_writer.flush()
 
     if not options.quiet:
         count = count_overview_tiles(conf)
@@ -4559,23 +5772,68 @@ def multi_threaded_tiling(
                 overview_progress_bar.start()
 
     for base_tz in range(conf.tmaxz, conf.tminz, -1):
-        base_tile_groups = group_overview_base_tiles(base_tz, output_folder, conf)
-        chunksize = max(1, min(128, len(base_tile_groups) // nb_processes))
-        for _ in pool.imap_unordered(
-            partial(
-                create_overview_tile,
-                base_tz,
-                output_folder=output_folder,
-                tile_job_info=conf,
-                options=options,
-            ),
-            base_tile_groups,
-            chunksize=chunksize,
+        makedirs_overview_tiles(base_tz, conf.output_file_path, conf)
+        batch_size = get_batch_size(count_tiles(conf, base_tz - 1), nb_processes)
+        for nb_tiles, encoded_tiles in imap(
+            partial(create_overview_tile_batch, base_tz, conf),
+            iter_batches(iter_overview_base_tile_groups(base_tz, conf), batch_size),
         ):
+            tile_writer.write(encoded_tiles)
             if not options.verbose and not options.quiet:
-                overview_progress_bar.log_progress()
+                overview_progress_bar.log_progress(nb_tiles)
+        tile_writer.flush()
 
-    shutil.rmtree(os.path.dirname(conf.src_file))
+
+def in_memory_overviews_tiling(
+    conf: "TileJobInfo",
+    gdal2tiles: "GDAL2Tiles",
+    options: Options,
+    tile_writer: TileWriter,
+    pool=None,
+) -> None:
+    """
+    Generate the base and overview tiles by quadtree subtrees, building the
+    overview tiles from the in-memory pixels of their children
+    (--in-memory-overviews)
+    """
+    nb_processes = 1 if pool is None else (options.nb_processes or 1)
+    imap = get_imap(options, pool)
+
+    gdal2tiles.prepare_base_tiles()
+    root_tz = get_subtree_root_zoom(conf, nb_processes)
+    for base_tz in range(conf.tmaxz, root_tz, -1):
+        makedirs_overview_tiles(base_tz, conf.output_file_path, conf)
+
+    if options.verbose:
+        logger.debug("Generating quadtree subtrees from zoom level %d" % root_tz)
+
+    if not options.verbose and not options.quiet:
+        progress_bar = ProgressBar(
+            count_tiles(conf, conf.tmaxz) + count_overview_tiles(conf)
+        )
+        progress_bar.start()
+
+    for nb_tiles, encoded_tiles in imap(
+        partial(create_tile_subtree, conf, root_tz),
+        gdal2tiles.generate_base_tile_subtrees(root_tz),
+    ):
+        tile_writer.write(encoded_tiles)
+        if not options.verbose and not options.quiet:
+            progress_bar.log_progress(nb_tiles)
+    tile_writer.flush()
+
+    # Remaining overview tiles above the subtree roots
+    for base_tz in range(root_tz, conf.tminz, -1):
+        makedirs_overview_tiles(base_tz, conf.output_file_path, conf)
+        batch_size = get_batch_size(count_tiles(conf, base_tz - 1), nb_processes)
+        for nb_tiles, encoded_tiles in imap(
+            partial(create_overview_tile_batch, base_tz, conf),
+            iter_batches(iter_overview_base_tile_groups(base_tz, conf), batch_size),
+        ):
+            tile_writer.write(encoded_tiles)
+            if not options.verbose and not options.quiet:
+                progress_bar.log_progress(nb_tiles)
+        tile_writer.flush()
 
 
 class DividedCache:
@@ -4613,8 +5871,6 @@ def main(argv: List[str] = sys.argv, called_from_main=False) -> int:
         with MPICommExecutor(MPI.COMM_WORLD, root=0) as pool:
             if pool is None:
                 return 0
-            # add interface of multiprocessing.Pool to MPICommExecutor
-            pool.imap_unordered = partial(pool.map, unordered=True)
             return submain(
                 argv, pool, MPI.COMM_WORLD.Get_size(), called_from_main=called_from_main
             )
@@ -4633,12 +5889,19 @@ def submain(argv: List[str], pool=None, pool_size=0, called_from_main=False) ->
     )
     if pool_size:
         options.nb_processes = pool_size
+    if options.nb_threads:
+        options.nb_processes = options.nb_threads
     nb_processes = options.nb_processes or 1
 
     if pool is not None:  # MPI
         multi_threaded_tiling(input_file, output_folder, options, pool)
     elif nb_processes == 1:
         single_threaded_tiling(input_file, output_folder, options)
+    elif options.nb_threads:
+        # Threads share the GDAL block cache, and each one opens its own
+        # handle on the source dataset
+        with concurrent.futures.ThreadPoolExecutor(max_workers=nb_processes) as pool:
+            multi_threaded_tiling(input_file, output_folder, options, pool)
     else:
         # Trick inspired from https://stackoverflow.com/questions/45720153/python-multiprocessing-error-attributeerror-module-main-has-no-attribute
         # and https://bugs.python.org/issue42949
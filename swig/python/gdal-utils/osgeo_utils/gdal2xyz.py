@@ -12,19 +12,26 @@
 #
 # SPDX-License-Identifier: MIT
 ###############################################################################
+import argparse
+import contextlib
+import os
+import struct
 import sys
+import tempfile
 import textwrap
+import zipfile
 from numbers import Number
-from typing import Optional, Sequence, Tuple, Union
+from typing import Iterator, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
 from osgeo import gdal
-from osgeo_utils.auxiliary.base import PathLikeOrStr
+from osgeo_utils.auxiliary.base import PathLikeOrStr, get_extension
 from osgeo_utils.auxiliary.gdal_argparse import GDALArgumentParser, GDALScript
 from osgeo_utils.auxiliary.numpy_util import GDALTypeCodeAndNumericTypeCodeFromDataSet
 from osgeo_utils.auxiliary.progress import (
     OptionalProgressCallback,
+    ProgressCallback,
     get_progress_callback,
 )
 from osgeo_utils.auxiliary.util import (
@@ -34,6 +41,9 @@ from osgeo_utils.auxiliary.util import (
     open_ds,
 )
 
+# number of points processed at once
+DefaultBatchSize = 65536
+
 
 @enable_gdal_exceptions
 def gdal2xyz(
@@ -49,6 +59,8 @@ def gdal2xyz(
     return_np_arrays: bool = False,
     pre_allocate_np_arrays: bool = True,
     progress_callback: OptionalProgressCallback = ...,
+    output_format: Optional[str] = None,
+    batch_size: int = DefaultBatchSize,
 ) -> Optional[Tuple]:
     """
     translates a raster file (or dataset) into xyz format
@@ -67,9 +79,14 @@ def gdal2xyz(
     srcfile - The source dataset filename or dataset object
     dstfile - The output dataset filename; for dstfile=None - if return_np_arrays=False then output will be printed to stdout
     return_np_arrays - return numpy arrays of the result, otherwise returns None
-    pre_allocate_np_arrays - pre-allocated result arrays.
-        Should be faster unless skip_nodata and the input is very sparse thus most data points will be skipped.
+    pre_allocate_np_arrays - ignored, kept for backward compatibility:
+        the result arrays are always built from whole batches of points.
     progress_callback - progress callback function. use None for quiet or Ellipsis for using the default callback
+    output_format - XYZ (delimited text), NPY, NPZ, Arrow (IPC file format) or Parquet.
+        default (`None`) - guessed from the dstfile extension, XYZ if unknown.
+        Binary formats have the columns x, y (float64) and band_<n> (data type of the first band).
+    batch_size - approximate number of points processed at once,
+        which is also the size of the record batches of the Arrow and Parquet formats.
     """
 
     result = None
@@ -95,8 +112,13 @@ def gdal2xyz(
 
     dt, np_dt = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
 
-    # Open the output file.
-    if dstfile is not None:
+    output_format = get_xyz_output_format(output_format, dstfile)
+
+    # Open the output file, binary writers being created below.
+    writer = None
+    if dstfile is not None and output_format != "XYZ":
+        dst_fh = None
+    elif dstfile is not None:
         dst_fh = gdal.VSIFOpenL(dstfile, "wb")
     elif return_np_arrays:
         dst_fh = None
@@ -138,93 +160,365 @@ def gdal2xyz(
 
     skip_nodata = skip_nodata and (src_nodata is not None)
     replace_nodata = (not skip_nodata) and (dst_nodata is not None)
-    process_nodata = skip_nodata or replace_nodata
 
+    if dst_fh:
+        line_format = frmt.replace("%s", band_format)
+
+    if return_np_arrays:
+        all_geo_x = []
+        all_geo_y = []
+        all_data = []
+
+    try:
+        if dstfile is not None and output_format != "XYZ":
+            writer = XYZBinaryWriters[output_format](
+                dstfile,
+                ["x", "y"] + [f"band_{band.GetBand()}" for band in bands],
+                [np.float64, np.float64] + [np_dt] * band_count,
+            )
+
+        # Loop emitting data.
+        for geo_x, geo_y, data in iter_xyz_batches(
+            bands,
+            gt,
+            srcwin,
+            skip,
+            np_dt,
+            src_nodata=src_nodata,
+            dst_nodata=dst_nodata,
+            skip_nodata=skip_nodata,
+            batch_size=batch_size,
+            progress_callback=progress_callback,
+        ):
+            count = len(geo_x)
+            if writer and count:
+                writer.write([geo_x, geo_y, *data])
+            if dst_fh and count:
+                # format the whole batch at once, and write it in one call
+                values = np.empty((count, 2 + band_count), dtype=object)
+                values[:, 0] = geo_x
+                values[:, 1] = geo_y
+                values[:, 2:] = data.transpose()
+                text = ((line_format * count) % tuple(values.ravel().tolist())).encode(
+                    "UTF-8"
+                )
+                if gdal.VSIFWriteL(text, len(text), 1, dst_fh) != 1:
+                    gdal.VSIFCloseL(dst_fh)
+                    raise IOError("Cannot write into destination file")
+            if return_np_arrays:
+                all_geo_x.append(geo_x)
+                all_geo_y.append(geo_y)
+                all_data.append(data)
+    except BaseException:
+        # do not leave the (temporary) output files open
+        if writer:
+            writer.abort()
+        raise
+
+    if return_np_arrays:
+        nodata = None if skip_nodata else dst_nodata if replace_nodata else src_nodata
+        if all_data:
+            all_geo_x = np.concatenate(all_geo_x)
+            all_geo_y = np.concatenate(all_geo_y)
+            all_data = np.concatenate(all_data, axis=1)
+        else:
+            all_geo_x = np.empty(0)
+            all_geo_y = np.empty(0)
+            all_data = np.empty((band_count, 0), dtype=np_dt)
+        result = all_geo_x, all_geo_y, all_data, nodata
+
+    if dst_fh:
+        gdal.VSIFCloseL(dst_fh)
+    if writer:
+        writer.close()
+
+    return result
+
+
+def iter_xyz_batches(
+    bands: Sequence[gdal.Band],
+    gt: Sequence[float],
+    srcwin: Sequence[int],
+    skip: Union[int, Sequence[int]] = 1,
+    np_dt=None,
+    src_nodata: Optional[np.ndarray] = None,
+    dst_nodata: Optional[np.ndarray] = None,
+    skip_nodata: bool = False,
+    batch_size: int = DefaultBatchSize,
+    progress_callback: ProgressCallback = None,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    yields the (geo_x, geo_y, data) arrays of batches of whole rows of srcwin,
+    with about batch_size points per batch. data dims: (bands, points).
+
+    src_nodata/dst_nodata - arrays of the nodata values per band:
+        points whose all bands are src_nodata are skipped if skip_nodata is set,
+        otherwise they are replaced with dst_nodata if it is not None.
+    """
     if isinstance(skip, Sequence):
         x_skip, y_skip = skip
     else:
         x_skip = y_skip = skip
 
     x_off, y_off, x_size, y_size = srcwin
-    bands_count = len(bands)
+    band_count = len(bands)
+    skip_nodata = skip_nodata and (src_nodata is not None)
+    replace_nodata = (not skip_nodata) and (dst_nodata is not None)
+
+    lines = range(y_off, y_off + y_size, y_skip)
+    pixels = np.arange(x_off, x_off + x_size, x_skip)
+    lines_per_batch = max(1, batch_size // max(1, len(pixels)))
 
-    nXBlocks = (x_size - x_off) // x_skip
-    nYBlocks = (y_size - y_off) // y_skip
-    progress_end = nXBlocks * nYBlocks
-    progress_curr = 0
+    progress_end = len(lines)
     progress_prev = -1
     progress_parts = 100
 
-    if return_np_arrays:
-        size = progress_end if pre_allocate_np_arrays else 0
-        all_geo_x = np.empty(size)
-        all_geo_y = np.empty(size)
-        all_data = np.empty((size, band_count), dtype=np_dt)
+    # pixel centers
+    px = pixels + 0.5
 
-    # Loop emitting data.
-    idx = 0
-    for y in range(y_off, y_off + y_size, y_skip):
+    for line_idx in range(0, len(lines), lines_per_batch):
+        batch_lines = lines[line_idx : line_idx + lines_per_batch]
 
-        size = bands_count if pre_allocate_np_arrays else 0
-        data = np.empty((size, x_size), dtype=np_dt)  # dims: (bands_count, x_size)
+        # dims: (bands, lines, pixels)
+        data = np.empty((band_count, len(batch_lines), len(pixels)), dtype=np_dt)
         for i_bnd, band in enumerate(bands):
-            band_data = band.ReadAsArray(x_off, y, x_size, 1)  # read one band line
-            if pre_allocate_np_arrays:
-                data[i_bnd] = band_data[0]
+            if y_skip == 1:
+                band_data = band.ReadAsArray(
+                    x_off, batch_lines[0], x_size, len(batch_lines)
+                )
+                data[i_bnd] = band_data[:, ::x_skip]
             else:
-                data = np.append(data, band_data, axis=0)
-
-        for x_i in range(0, x_size, x_skip):
-
-            progress_curr += 1
-            if progress_callback:
-                progress_frac = progress_curr / progress_end
-                progress = int(progress_frac * progress_parts)
-                if progress > progress_prev:
-                    progress_prev = progress
-                    progress_callback(progress_frac)
-
-            x_i_data = data[:, x_i]  # single pixel, dims: (bands)
-            if process_nodata and np.array_equal(src_nodata, x_i_data):
-                if skip_nodata:
-                    continue
-                elif replace_nodata:
-                    x_i_data = dst_nodata
-
-            x = x_i + x_off
-
-            geo_x = gt[0] + (x + 0.5) * gt[1] + (y + 0.5) * gt[2]
-            geo_y = gt[3] + (x + 0.5) * gt[4] + (y + 0.5) * gt[5]
-
-            if dst_fh:
-                band_str = band_format % tuple(x_i_data)
-                line = (frmt % (float(geo_x), float(geo_y), band_str)).encode("UTF-8")
-                if gdal.VSIFWriteL(line, len(line), 1, dst_fh) != 1:
-                    gdal.VSIFCloseL(dst_fh)
-                    raise IOError("Cannot write into destination file")
-            if return_np_arrays:
-                if pre_allocate_np_arrays:
-                    all_geo_x[idx] = geo_x
-                    all_geo_y[idx] = geo_y
-                    all_data[idx] = x_i_data
-                else:
-                    all_geo_x = np.append(all_geo_x, geo_x)
-                    all_geo_y = np.append(all_geo_y, geo_y)
-                    all_data = np.append(all_data, [x_i_data], axis=0)
-            idx += 1
+                for i, y in enumerate(batch_lines):
+                    band_data = band.ReadAsArray(x_off, y, x_size, 1)
+                    data[i_bnd, i] = band_data[0, ::x_skip]
+        data = data.reshape(band_count, -1)
+
+        py = np.asarray(batch_lines, dtype=np.float64)[:, np.newaxis] + 0.5
+        geo_x = (gt[0] + px * gt[1] + py * gt[2]).ravel()
+        geo_y = (gt[3] + px * gt[4] + py * gt[5]).ravel()
+
+        if skip_nodata or replace_nodata:
+            is_nodata = np.all(data == src_nodata[:, np.newaxis], axis=0)
+            if skip_nodata:
+                is_data = ~is_nodata
+                geo_x = geo_x[is_data]
+                geo_y = geo_y[is_data]
+                data = data[:, is_data]
+            else:
+                data[:, is_nodata] = dst_nodata[:, np.newaxis]
+
+        if progress_callback:
+            progress_frac = (line_idx + len(batch_lines)) / progress_end
+            progress = int(progress_frac * progress_parts)
+            if progress > progress_prev:
+                progress_prev = progress
+                progress_callback(progress_frac)
+
+        yield geo_x, geo_y, data
+
+
+def get_xyz_output_format(
+    output_format: Optional[str], dstfile: Optional[PathLikeOrStr]
+) -> str:
+    """returns the output format name, guessed from the dstfile extension if not set"""
+    if output_format is None:
+        ext = get_extension(dstfile).lower() if dstfile is not None else ""
+        return XYZOutputFormatByExtension.get(ext, "XYZ")
+    for name in XYZOutputFormats:
+        if name.lower() == output_format.lower():
+            return name
+    raise Exception(
+        f"Unsupported output format {output_format}, "
+        f"must be one of {', '.join(XYZOutputFormats)}"
+    )
+
+
+def open_binary_output(dstfile: PathLikeOrStr):
+    """returns a file object writing to a file, using the GDAL VSI API for /vsi paths"""
+    dstfile = os.fspath(dstfile)
+    if dstfile.startswith("/vsi") and hasattr(gdal, "VSIFile"):
+        return gdal.VSIFile(dstfile, "wb")
+    return open(dstfile, "wb")
+
+
+def npy_header(dtype: np.dtype, count: int, size: Optional[int] = None) -> bytes:
+    """
+    returns the header of a .npy file of a 1D array of count elements of dtype,
+    padded to size bytes, or to the smallest multiple of 64 bytes if size is None
+    """
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+        np.lib.format.dtype_to_descr(dtype),
+        count,
+    )
+    if size is None:
+        size = -(-(10 + len(header) + 1) // 64) * 64
+    header = header.ljust(size - 10 - 1) + "\n"
+    return (
+        np.lib.format.magic(1, 0)
+        + struct.pack("<H", len(header))
+        + header.encode("latin1")
+    )
+
+
+class NpyArrayWriter:
+    """
+    streams a 1D array to a .npy file, whose header is rewritten
+    with the final number of elements when closing.
+    """
 
-    if return_np_arrays:
-        nodata = None if skip_nodata else dst_nodata if replace_nodata else src_nodata
-        if idx != progress_curr:
-            all_geo_x = all_geo_x[:idx]
-            all_geo_y = all_geo_y[:idx]
-            all_data = all_data[:idx, :]
-        result = all_geo_x, all_geo_y, all_data.transpose(), nodata
+    def __init__(self, dstfile: PathLikeOrStr, dtype: np.dtype):
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        # reserve room for the largest count
+        self.header_size = len(npy_header(self.dtype, 2**63 - 1))
+        self.fh = open_binary_output(dstfile)
+        try:
+            self.fh.write(npy_header(self.dtype, 0, self.header_size))
+        except BaseException:
+            self.fh.close()
+            raise
 
-    if dst_fh:
-        gdal.VSIFCloseL(dst_fh)
+    def write(self, array: np.ndarray):
+        self.fh.write(np.ascontiguousarray(array, dtype=self.dtype).tobytes())
+        self.count += len(array)
 
-    return result
+    def close(self):
+        self.fh.seek(0)
+        self.fh.write(npy_header(self.dtype, self.count, self.header_size))
+        self.fh.close()
+
+    def abort(self):
+        self.fh.close()
+
+
+class NpyXYZWriter:
+    """writes the points as a .npy file of a 1D structured array with the fields x, y and band_<n>"""
+
+    def __init__(self, dstfile: PathLikeOrStr, names: Sequence[str], dtypes):
+        self.writer = NpyArrayWriter(dstfile, list(zip(names, dtypes)))
+
+    def write(self, columns: Sequence[np.ndarray]):
+        records = np.empty(len(columns[0]), dtype=self.writer.dtype)
+        for name, column in zip(self.writer.dtype.names, columns):
+            records[name] = column
+        self.writer.write(records)
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        self.writer.abort()
+
+
+class NpzXYZWriter:
+    """
+    writes the points as a .npz file with the arrays x, y and band_<n>.
+    Each column is streamed to a temporary .npy file, and these are put
+    together in the .npz archive when closing.
+    """
+
+    def __init__(self, dstfile: PathLikeOrStr, names: Sequence[str], dtypes):
+        self.dstfile = dstfile
+        with contextlib.ExitStack() as stack:
+            tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+            self.filenames = {
+                name: os.path.join(tmpdir, f"{name}.npy") for name in names
+            }
+            self.writers = []
+            for name, dt in zip(names, dtypes):
+                writer = NpyArrayWriter(self.filenames[name], dt)
+                stack.callback(writer.abort)
+                self.writers.append(writer)
+            # the temporary files are closed and removed by close() or abort()
+            self.cleanup = stack.pop_all()
+
+    def write(self, columns: Sequence[np.ndarray]):
+        for writer, column in zip(self.writers, columns):
+            writer.write(column)
+
+    def close(self):
+        with self.cleanup:
+            for writer in self.writers:
+                writer.close()
+            with open_binary_output(self.dstfile) as fh, zipfile.ZipFile(
+                fh, "w", zipfile.ZIP_STORED, allowZip64=True
+            ) as zf:
+                for name, filename in self.filenames.items():
+                    zf.write(filename, f"{name}.npy")
+
+    def abort(self):
+        self.cleanup.close()
+
+
+class ArrowXYZWriter:
+    """writes the points as an Arrow IPC file, with one record batch per batch of points"""
+
+    def __init__(self, dstfile: PathLikeOrStr, names: Sequence[str], dtypes):
+        try:
+            import pyarrow
+        except ImportError:
+            raise Exception(
+                "pyarrow is required to write the Arrow and Parquet output formats"
+            )
+        self.pa = pyarrow
+        self.schema = pyarrow.schema(
+            [(name, pyarrow.from_numpy_dtype(dt)) for name, dt in zip(names, dtypes)]
+        )
+        self.fh = open_binary_output(dstfile)
+        try:
+            self.writer = self.open_writer()
+        except BaseException:
+            self.fh.close()
+            raise
+
+    def open_writer(self):
+        return self.pa.ipc.new_file(self.fh, self.schema)
+
+    def write(self, columns: Sequence[np.ndarray]):
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(column) for column in columns], schema=self.schema
+        )
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        self.fh.close()
+
+    def abort(self):
+        self.fh.close()
+
+
+class ParquetXYZWriter(ArrowXYZWriter):
+    """writes the points as a Parquet file, with one row group per batch of points"""
+
+    def open_writer(self):
+        import pyarrow.parquet
+
+        return pyarrow.parquet.ParquetWriter(self.fh, self.schema)
+
+    def write(self, columns: Sequence[np.ndarray]):
+        self.writer.write_table(
+            self.pa.Table.from_arrays(
+                [self.pa.array(column) for column in columns], schema=self.schema
+            )
+        )
+
+
+# binary output formats and their writer classes
+XYZBinaryWriters = {
+    "NPY": NpyXYZWriter,
+    "NPZ": NpzXYZWriter,
+    "Arrow": ArrowXYZWriter,
+    "Parquet": ParquetXYZWriter,
+}
+XYZOutputFormats = ("XYZ", *XYZBinaryWriters.keys())
+XYZOutputFormatByExtension = {
+    "npy": "NPY",
+    "npz": "NPZ",
+    "arrow": "Arrow",
+    "feather": "Arrow",
+    "parquet": "Parquet",
+}
 
 
 class GDAL2XYZ(GDALScript):
@@ -241,6 +535,12 @@ class GDAL2XYZ(GDALScript):
             * Return the output as numpy arrays."""
         )
 
+    def output_format(self, output_format: str) -> str:
+        try:
+            return get_xyz_output_format(output_format, None)
+        except Exception as e:
+            raise argparse.ArgumentTypeError(str(e))
+
     def get_parser(self, argv) -> GDALArgumentParser:
         parser = self.parser
 
@@ -324,6 +624,16 @@ class GDAL2XYZ(GDALScript):
             "(per band or per dataset).",
         )
 
+        parser.add_argument(
+            "-of",
+            dest="output_format",
+            metavar="format",
+            choices=XYZOutputFormats,
+            type=self.output_format,
+            help="Output format: XYZ (delimited text), NPY, NPZ, Arrow or Parquet. "
+            "Default: guessed from the destination file extension, XYZ otherwise.",
+        )
+
         parser.add_argument(
             "srcfile",
             metavar="src_dataset",
@@ -16,14 +16,24 @@
 # ******************************************************************************
 
 import argparse
+import ast
+import builtins
+import collections
+import concurrent.futures
+import contextlib
+import functools
 import glob
+import math
+import operator
 import os
 import os.path
 import string
 import sys
 import textwrap
+import threading
+import types
 from numbers import Number
-from typing import Dict, Optional, Sequence, Tuple, Union
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union
 
 import numpy
 
@@ -65,9 +75,301 @@ DefaultNDVLookup = {
     gdal.GDT_CFloat64: None,
 }
 
+# maximum number of pixels of a processing window
+DefaultMaxWindowPixels = 4 * 1024 * 1024
+
 # tuple of available output datatypes names
 GDALDataTypeNames = tuple(gdal.GetDataTypeName(dt) for dt in DefaultNDVLookup.keys())
 
+
+def get_num_threads(num_threads: Optional[Union[int, str]]) -> int:
+    """returns the number of threads to use, from a number or ALL_CPUS"""
+    if num_threads is None:
+        return 1
+    if isinstance(num_threads, str):
+        if num_threads.upper() == "ALL_CPUS":
+            return os.cpu_count() or 1
+        num_threads = int(num_threads)
+    return max(1, num_threads)
+
+
+class CalcExpression:
+    """
+    A calculation compiled once into a code object, and evaluated for each block.
+
+    When optimize is set, the expression is lowered to a plan of numpy ufunc
+    calls (arithmetic and comparison operators, and calls to ufuncs such as
+    log10()) whose intermediate results are written with out= into buffers
+    that are kept from one block to the next, instead of allocating new
+    temporary arrays for each operation. The final result is always a new
+    array. Sub-expressions that cannot be lowered are evaluated as is.
+    """
+
+    binary_ops = {
+        ast.Add: (numpy.add, operator.add),
+        ast.Sub: (numpy.subtract, operator.sub),
+        ast.Mult: (numpy.multiply, operator.mul),
+        ast.Div: (numpy.true_divide, operator.truediv),
+        ast.FloorDiv: (numpy.floor_divide, operator.floordiv),
+        ast.Mod: (numpy.remainder, operator.mod),
+        ast.Pow: (numpy.power, operator.pow),
+        ast.BitAnd: (numpy.bitwise_and, operator.and_),
+        ast.BitOr: (numpy.bitwise_or, operator.or_),
+        ast.BitXor: (numpy.bitwise_xor, operator.xor),
+        ast.LShift: (numpy.left_shift, operator.lshift),
+        ast.RShift: (numpy.right_shift, operator.rshift),
+        ast.Lt: (numpy.less, operator.lt),
+        ast.LtE: (numpy.less_equal, operator.le),
+        ast.Gt: (numpy.greater, operator.gt),
+        ast.GtE: (numpy.greater_equal, operator.ge),
+        ast.Eq: (numpy.equal, operator.eq),
+        ast.NotEq: (numpy.not_equal, operator.ne),
+    }
+
+    unary_ops = {
+        ast.USub: (numpy.negative, operator.neg),
+        ast.UAdd: (numpy.positive, operator.pos),
+        ast.Invert: (numpy.invert, operator.invert),
+    }
+
+    def __init__(
+        self,
+        calc: str,
+        allowed_names: Optional[Sequence[str]] = None,
+        global_namespace: Optional[Dict] = None,
+        local_names: Sequence[str] = (),
+        optimize: bool = False,
+    ):
+        self.calc = calc
+        try:
+            tree = ast.parse(calc.strip(), mode="eval")
+        except SyntaxError as e:
+            raise Exception(f"Error! Invalid calculation {calc}: {e.msg}")
+        if allowed_names is not None:
+            self.check_names(tree, allowed_names)
+        self.code = compile(tree, "<calc>", "eval")
+        self.steps = None
+        if optimize:
+            self.steps = []
+            self.lower(tree.body, global_namespace or {}, local_names)
+            if self.steps[-1][0] != "ufunc":
+                # nothing to gain, the whole expression is evaluated at once
+                self.steps = None
+        # buffers of the intermediate results, per thread
+        self.thread_data = threading.local()
+
+    def check_names(self, tree, allowed_names):
+        """raises if the expression uses a name that is not defined"""
+        bound_names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+                bound_names.add(node.id)
+            elif isinstance(node, ast.arg):
+                bound_names.add(node.arg)
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Name)
+                and node.id not in allowed_names
+                and node.id not in bound_names
+            ):
+                raise Exception(
+                    f"Error! Unknown name '{node.id}' in calculation {self.calc}.  Cannot proceed"
+                )
+
+    @staticmethod
+    def resolve_ufunc(node, global_namespace, local_names):
+        """returns the ufunc called by a node like log10 or numpy.log10, or None"""
+        attrs = []
+        while isinstance(node, ast.Attribute):
+            attrs.insert(0, node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name) or node.id in local_names:
+            return None
+        obj = global_namespace.get(node.id)
+        for attr in attrs:
+            if not isinstance(obj, types.ModuleType):
+                return None
+            obj = getattr(obj, attr, None)
+        if isinstance(obj, numpy.ufunc) and obj.nout == 1:
+            return obj
+        return None
+
+    def lower(self, node, global_namespace, local_names) -> int:
+        """appends the steps evaluating node, returns the index of its result"""
+        operands = None
+        if isinstance(node, ast.Constant) and isinstance(node.value, Number):
+            self.steps.append(("const", node.value))
+            return len(self.steps) - 1
+        elif isinstance(node, ast.BinOp) and type(node.op) in self.binary_ops:
+            ufunc, fallback = self.binary_ops[type(node.op)]
+            operands = [node.left, node.right]
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in self.unary_ops:
+            ufunc, fallback = self.unary_ops[type(node.op)]
+            operands = [node.operand]
+        elif (
+            isinstance(node, ast.Compare)
+            and len(node.ops) == 1
+            and type(node.ops[0]) in self.binary_ops
+        ):
+            ufunc, fallback = self.binary_ops[type(node.ops[0])]
+            operands = [node.left, node.comparators[0]]
+        elif isinstance(node, ast.Call) and not node.keywords:
+            ufunc = self.resolve_ufunc(node.func, global_namespace, local_names)
+            if (
+                ufunc is not None
+                and ufunc.nin == len(node.args)
+                and not any(isinstance(arg, ast.Starred) for arg in node.args)
+            ):
+                fallback = ufunc
+                operands = node.args
+
+        if operands is None:
+            code = compile(ast.Expression(body=node), "<calc>", "eval")
+            self.steps.append(("eval", code))
+        else:
+            indices = [
+                self.lower(operand, global_namespace, local_names)
+                for operand in operands
+            ]
+            self.steps.append(("ufunc", ufunc, fallback, indices))
+        return len(self.steps) - 1
+
+    @staticmethod
+    def buffer_key(args):
+        """
+        returns a key that determines the shape and dtype of a ufunc result,
+        or None if the arguments are not plain arrays and scalars
+        """
+        key = []
+        has_array = False
+        for arg in args:
+            if type(arg) is numpy.ndarray:
+                has_array = True
+                key.append((arg.dtype, arg.shape))
+            elif isinstance(arg, (Number, numpy.generic)):
+                key.append((type(arg), arg))
+            else:
+                return None
+        return tuple(key) if has_array else None
+
+    def evaluate(self, global_namespace: Dict, local_namespace: Dict):
+        if self.steps is None:
+            return eval(self.code, global_namespace, local_namespace)
+
+        buffers = getattr(self.thread_data, "buffers", None)
+        if buffers is None:
+            buffers = self.thread_data.buffers = {}
+        last = len(self.steps) - 1
+        values = []
+        for idx, step in enumerate(self.steps):
+            if step[0] == "const":
+                values.append(step[1])
+            elif step[0] == "eval":
+                values.append(eval(step[1], global_namespace, local_namespace))
+            else:
+                _, ufunc, fallback, indices = step
+                args = [values[i] for i in indices]
+                key = None if idx == last else self.buffer_key(args)
+                if key is None:
+                    values.append(fallback(*args))
+                    continue
+                buffer_key, buffer = buffers.get(idx, (None, None))
+                if buffer_key == key:
+                    values.append(ufunc(*args, out=buffer))
+                else:
+                    result = ufunc(*args)
+                    buffers[idx] = (key, result)
+                    values.append(result)
+        return values[last]
+
+
+def lcm(*values: int) -> int:
+    """returns the least common multiple of positive integers"""
+    return functools.reduce(lambda a, b: a * b // math.gcd(a, b), values, 1)
+
+
+def get_window_size(
+    block_sizes: Sequence[Tuple[int, int]],
+    dimensions: Sequence[int],
+    max_window_pixels: int = DefaultMaxWindowPixels,
+) -> Tuple[int, int]:
+    """
+    returns the size of the processing window, from the block sizes of the rasters.
+    The window is a common multiple of all the block sizes (a block spanning the whole
+    width or height of the raster does not constrain that dimension), so that no
+    block is split between windows, unless it exceeds max_window_pixels.
+    In that case, the height, then the width, of the window are reduced to a multiple
+    of the block sizes that do not span the whole height/width.
+    """
+    window = []
+    base = []
+    for dim, size in enumerate(dimensions):
+        block_dims = [max(1, min(block_size[dim], size)) for block_size in block_sizes]
+        window.append(min(lcm(*block_dims), size))
+        base.append(min(lcm(*[b for b in block_dims if b < size] or [1]), size))
+    if window[0] * window[1] > max_window_pixels:
+        window[1] = max(base[1], (max_window_pixels // window[0]) // base[1] * base[1])
+    if window[0] * window[1] > max_window_pixels:
+        window[0] = max(base[0], (max_window_pixels // window[1]) // base[0] * base[0])
+    return window[0], window[1]
+
+
+def get_windows(
+    window_size: Sequence[int], dimensions: Sequence[int]
+) -> Iterator[Tuple[int, int, int, int]]:
+    """yields the (xoff, yoff, xsize, ysize) windows covering a raster, row by row"""
+    for yoff in range(0, dimensions[1], window_size[1]):
+        ysize = min(window_size[1], dimensions[1] - yoff)
+        for xoff in range(0, dimensions[0], window_size[0]):
+            xsize = min(window_size[0], dimensions[0] - xoff)
+            yield xoff, yoff, xsize, ysize
+
+
+def get_read_amplification(
+    block_size: Sequence[int],
+    window_size: Sequence[int],
+    dimensions: Sequence[int],
+    block_bytes: Optional[int] = None,
+    cache_max: Optional[int] = None,
+) -> float:
+    """
+    returns the expected ratio between the number of blocks of a raster read while
+    processing all the windows, and the number of blocks of that raster.
+    If the blocks touched by a row of windows fit in the block cache, blocks split
+    between windows are read from the cache, and are only decoded once.
+    """
+    touched = []
+    for dim in range(2):
+        bs = block_size[dim]
+        touched.append(
+            sum(
+                (min(off + window_size[dim], dimensions[dim]) - 1) // bs - off // bs + 1
+                for off in range(0, dimensions[dim], window_size[dim])
+            )
+        )
+    nb_blocks = [
+        (dimensions[dim] + block_size[dim] - 1) // block_size[dim] for dim in range(2)
+    ]
+    amplification = touched[0] * touched[1] / (nb_blocks[0] * nb_blocks[1])
+    if block_bytes is not None and cache_max is not None and amplification > 1:
+        # blocks touched by one row of windows: if twice that fits in the cache,
+        # no block is evicted before all the windows that need it are processed
+        row_blocks = nb_blocks[0] * (
+            (window_size[1] + block_size[1] - 1) // block_size[1] + 1
+        )
+        if 2 * row_blocks * block_bytes <= cache_max:
+            amplification = 1.0
+    return amplification
+
+
+def get_nodata_dtype(dtype: numpy.dtype, nodata: Number) -> numpy.dtype:
+    """returns a dtype that can hold both the values of dtype and the nodata value"""
+    nodata_dtype = numpy.min_scalar_type(nodata)
+    if numpy.can_cast(nodata_dtype, dtype):
+        return dtype
+    return numpy.promote_types(dtype, nodata_dtype)
+
+
 """ Perform raster calculations with numpy syntax.
 Use any basic arithmetic supported by numpy arrays such as +-* along with logical
 operators such as >. Note that all files must have the same dimensions, but no projection checking is performed.
@@ -113,6 +415,9 @@ def Calc(
     debug: bool = False,
     quiet: bool = False,
     progress_callback: Optional = gdal.TermProgress_nocb,
+    num_threads: Optional[Union[int, str]] = None,
+    optimize: bool = False,
+    masked: bool = False,
     **input_files,
 ):
 
@@ -318,6 +623,19 @@ def Calc(
     else:
         allBandsCount = len(calc)
 
+    # compile the calculations once, checking the names they use
+    allowed_names = set(global_namespace) | set(dir(builtins)) | set(myAlphaList)
+    myCalcs = [
+        CalcExpression(
+            c,
+            allowed_names=allowed_names,
+            global_namespace=global_namespace,
+            local_names=myAlphaList,
+            optimize=optimize,
+        )
+        for c in calc
+    ]
+
     if extent not in [Extent.IGNORE, Extent.FAIL] and (
         GeoTransformDiffer or isinstance(extent, GeoRectangle)
     ):
@@ -335,6 +653,8 @@ def Calc(
             temp_vrt_filename, temp_vrt_ds = extent_util.make_temp_vrt(
                 myFiles[i], ExtentCheck
             )
+            # write the vrt to disk, so that worker threads can reopen it
+            temp_vrt_ds.FlushCache()
             myTempFileNames.append(temp_vrt_filename)
             myFiles[i] = None  # close original ds
             myFiles[i] = temp_vrt_ds  # replace original ds with vrt_ds
@@ -463,37 +783,123 @@ def Calc(
         )
 
     ################################################################
-    # find block size to chop grids into bite-sized chunks
+    # plan the windows used to chop grids into bite-sized chunks
     ################################################################
 
-    # use the block size of the first layer to read efficiently
-    myBlockSize = myFiles[0].GetRasterBand(myBands[0]).GetBlockSize()
-    # find total x and y blocks to be read
-    nXBlocks = (int)((DimensionsCheck[0] + myBlockSize[0] - 1) / myBlockSize[0])
-    nYBlocks = (int)((DimensionsCheck[1] + myBlockSize[1] - 1) / myBlockSize[1])
-    myBufSize = myBlockSize[0] * myBlockSize[1]
+    # use a window size aligned on the block sizes of all the inputs and of
+    # the output, so that every block is read and written at most once
+    myBlockSizes = [
+        myFiles[i].GetRasterBand(myBands[i]).GetBlockSize() for i in range(len(myFiles))
+    ]
+    myWindowSize = get_window_size(
+        myBlockSizes + [myOut.GetRasterBand(1).GetBlockSize()], DimensionsCheck
+    )
 
     if debug:
-        print(f"using blocksize {myBlockSize[0]} x {myBlockSize[1]}")
+        print(f"using window size {myWindowSize[0]} x {myWindowSize[1]}")
+        cache_max = gdal.GetCacheMax()
+        for i, Alpha in enumerate(myAlphaList):
+            band = myFiles[i].GetRasterBand(myBands[i])
+            block_bytes = (
+                myBlockSizes[i][0]
+                * myBlockSizes[i][1]
+                * gdal.GetDataTypeSize(band.DataType)
+                // 8
+            )
+            amplification = get_read_amplification(
+                myBlockSizes[i], myWindowSize, DimensionsCheck, block_bytes, cache_max
+            )
+            print(
+                f"file {Alpha}: blocksize {myBlockSizes[i][0]} x {myBlockSizes[i][1]}, "
+                f"expected read amplification {amplification:.2f}"
+            )
+
+    # list of (bandNo, xoff, yoff, xsize, ysize) windows to be processed,
+    # in the order in which they are written to the output: row by row, and
+    # all the output bands of a window in a row, so that the blocks of the
+    # inputs are still in the block cache when they are needed again
+    myWindows = [
+        (bandNo, *window)
+        for window in get_windows(myWindowSize, DimensionsCheck)
+        for bandNo in range(1, allBandsCount + 1)
+    ]
 
     # variables for displaying progress
-    ProgressCt = -1
-    ProgressEnd = nXBlocks * nYBlocks * allBandsCount
+    ProgressCt = 0
+    ProgressEnd = len(myWindows)
 
     ################################################################
-    # start looping through each band in allBandsCount
+    # set up access to the input layers
     ################################################################
 
-    for bandNo in range(1, allBandsCount + 1):
-
-        ################################################################
-        # start looping through blocks of data
-        ################################################################
+    num_threads = get_num_threads(num_threads)
+    if debug and num_threads > 1:
+        print(f"using {num_threads} threads")
+
+    # In multi-threaded mode, each worker thread opens its own handle on
+    # the inputs that can be reopened by name, as a gdal.Dataset must not be
+    # accessed concurrently. Inputs given as a Dataset, and the temporary VRT
+    # wrapping them, which may refer to an in-memory dataset, are shared
+    # between the threads and protected by a lock.
+    myReopenNames = []  # name used to reopen each input, or None
+    myInputLocks = []  # lock protecting each input dataset
+    for i in range(len(myFiles)):
+        name = myFileNames[i]
+        if name is not None and myTempFileNames:
+            name = myTempFileNames[i]
+        myReopenNames.append(name if num_threads > 1 else None)
+        if num_threads > 1 and name is None:
+            myInputLocks.append(threading.Lock())
+        else:
+            myInputLocks.append(contextlib.nullcontext())
+
+    thread_data = threading.local()
+    myThreadFiles = []  # all the per-thread input datasets, to close them
+    myThreadFilesLock = threading.Lock()
+
+    def get_input_files():
+        files = getattr(thread_data, "files", None)
+        if files is None:
+            files = [
+                myFiles[i] if name is None else open_ds(name)
+                for i, name in enumerate(myReopenNames)
+            ]
+            thread_data.files = files
+            with myThreadFilesLock:
+                myThreadFiles.append(files)
+        return files
+
+    def get_mask_buffers(shape):
+        # two boolean buffers per block shape and per thread
+        masks = getattr(thread_data, "masks", None)
+        if masks is None:
+            masks = thread_data.masks = {}
+        if shape not in masks:
+            masks[shape] = (
+                numpy.empty(shape, dtype=bool),
+                numpy.empty(shape, dtype=bool),
+            )
+        return masks[shape]
+
+    # output nodata value used to fill the results, as an int when possible,
+    # so that it does not promote integer results to floating point
+    myFillNDV = myOutNDV
+    if (
+        myOutNDV is not None
+        and float(myOutNDV).is_integer()
+        and -(2**63) <= myOutNDV < 2**64
+    ):
+        myFillNDV = int(myOutNDV)
 
-        # store these numbers in variables that may change later
-        nXValid = myBlockSize[0]
-        nYValid = myBlockSize[1]
+    # arrays of the global namespace, that must not be modified in place
+    myGlobalArrays = [
+        v for v in global_namespace.values() if isinstance(v, numpy.ndarray)
+    ]
 
+    # number of files and largest datatype per alpha, for each output band
+    count_file_per_alpha_per_band = {}
+    largest_datatype_per_alpha_per_band = {}
+    for bandNo in range(1, allBandsCount + 1):
         count_file_per_alpha = {}
         largest_datatype_per_alpha = {}
         for i, Alpha in enumerate(myAlphaList):
@@ -513,139 +919,207 @@ def Calc(
                         largest_datatype_per_alpha[Alpha] = gdal.DataTypeUnion(
                             largest_datatype_per_alpha[Alpha], band.DataType
                         )
+        count_file_per_alpha_per_band[bandNo] = count_file_per_alpha
+        largest_datatype_per_alpha_per_band[bandNo] = largest_datatype_per_alpha
 
-        # loop through X-lines
-        for X in range(0, nXBlocks):
-
-            # in case the blocks don't fit perfectly
-            # change the block size of the final piece
-            if X == nXBlocks - 1:
-                nXValid = DimensionsCheck[0] - X * myBlockSize[0]
-
-            # find X offset
-            myX = X * myBlockSize[0]
-
-            # reset buffer size for start of Y loop
-            nYValid = myBlockSize[1]
-            myBufSize = nXValid * nYValid
-
-            # loop through Y lines
-            for Y in range(0, nYBlocks):
-                ProgressCt += 1
-                if not quiet:
-                    progress_callback(float(ProgressCt) / ProgressEnd, "", None)
-
-                # change the block size of the final piece
-                if Y == nYBlocks - 1:
-                    nYValid = DimensionsCheck[1] - Y * myBlockSize[1]
-                    myBufSize = nXValid * nYValid
+    ################################################################
+    # read and calculate a block of data
+    ################################################################
 
-                # find Y offset
-                myY = Y * myBlockSize[1]
+    @enable_gdal_exceptions
+    def calc_block(bandNo, myX, myY, nXValid, nYValid):
+        input_files = get_input_files()
+        count_file_per_alpha = count_file_per_alpha_per_band[bandNo]
+        largest_datatype_per_alpha = largest_datatype_per_alpha_per_band[bandNo]
+
+        # buffer to mark where nodata occurs
+        myNDVs = None
+        # masks of the nodata values of each alpha, in masked mode
+        masks_per_alpha = {}
+
+        # make local namespace for calculation
+        local_namespace = {}
+
+        # Create destination numpy arrays for each alpha
+        numpy_arrays = {}
+        counter_per_alpha = {}
+        for Alpha in count_file_per_alpha:
+            dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
+                largest_datatype_per_alpha[Alpha]
+            )
+            if count_file_per_alpha[Alpha] == 1:
+                numpy_arrays[Alpha] = numpy.empty((nYValid, nXValid), dtype=dtype)
+            else:
+                numpy_arrays[Alpha] = numpy.empty(
+                    (count_file_per_alpha[Alpha], nYValid, nXValid), dtype=dtype
+                )
+            counter_per_alpha[Alpha] = 0
 
-                # create empty buffer to mark where nodata occurs
-                myNDVs = None
+        # fetch data for each input layer
+        for i, Alpha in enumerate(myAlphaList):
 
-                # make local namespace for calculation
-                local_namespace = {}
+            # populate lettered arrays with values
+            if allBandsIndex is not None and allBandsIndex == i:
+                myBandNo = bandNo
+            else:
+                myBandNo = myBands[i]
 
-                # Create destination numpy arrays for each alpha
-                numpy_arrays = {}
-                counter_per_alpha = {}
-                for Alpha in count_file_per_alpha:
-                    dtype = gdal_array.GDALTypeCodeToNumericTypeCode(
-                        largest_datatype_per_alpha[Alpha]
-                    )
+            with myInputLocks[i]:
+                if Alpha in myAlphaFileLists:
                     if count_file_per_alpha[Alpha] == 1:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (nYValid, nXValid), dtype=dtype
-                        )
+                        buf_obj = numpy_arrays[Alpha]
                     else:
-                        numpy_arrays[Alpha] = numpy.empty(
-                            (count_file_per_alpha[Alpha], nYValid, nXValid), dtype=dtype
-                        )
-                    counter_per_alpha[Alpha] = 0
-
-                # fetch data for each input layer
-                for i, Alpha in enumerate(myAlphaList):
+                        buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
+                    myval = gdal_array.BandReadAsArray(
+                        input_files[i].GetRasterBand(myBandNo),
+                        xoff=myX,
+                        yoff=myY,
+                        win_xsize=nXValid,
+                        win_ysize=nYValid,
+                        buf_obj=buf_obj,
+                    )
+                    counter_per_alpha[Alpha] += 1
+                else:
+                    myval = gdal_array.BandReadAsArray(
+                        input_files[i].GetRasterBand(myBandNo),
+                        xoff=myX,
+                        yoff=myY,
+                        win_xsize=nXValid,
+                        win_ysize=nYValid,
+                    )
+            if myval is None:
+                raise Exception(
+                    f"Input block reading failed from filename {myFileNames[i]}"
+                )
 
-                    # populate lettered arrays with values
-                    if allBandsIndex is not None and allBandsIndex == i:
-                        myBandNo = bandNo
+            # fill in nodata values
+            if myNDV[i] is not None:
+                # myNDVs is a boolean buffer, reused across blocks of the same shape.
+                # a cell is True if there is NDV in any of the corresponding cells in input raster bands.
+                mask_buffers = get_mask_buffers((nYValid, nXValid))
+                if myNDVs is None:
+                    # this is the first band that has NDV set
+                    myNDVs = mask_buffers[0]
+                    numpy.equal(myval, myNDV[i], out=myNDVs)
+                else:
+                    numpy.equal(myval, myNDV[i], out=mask_buffers[1])
+                    numpy.logical_or(myNDVs, mask_buffers[1], out=myNDVs)
+                if masked:
+                    if Alpha not in myAlphaFileLists:
+                        masks_per_alpha[Alpha] = myval == myNDV[i]
                     else:
-                        myBandNo = myBands[i]
-
-                    if Alpha in myAlphaFileLists:
+                        if Alpha not in masks_per_alpha:
+                            masks_per_alpha[Alpha] = numpy.zeros(
+                                numpy_arrays[Alpha].shape, dtype=bool
+                            )
                         if count_file_per_alpha[Alpha] == 1:
-                            buf_obj = numpy_arrays[Alpha]
+                            alpha_mask = masks_per_alpha[Alpha]
                         else:
-                            buf_obj = numpy_arrays[Alpha][counter_per_alpha[Alpha]]
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
-                            buf_obj=buf_obj,
-                        )
-                        counter_per_alpha[Alpha] += 1
-                    else:
-                        myval = gdal_array.BandReadAsArray(
-                            myFiles[i].GetRasterBand(myBandNo),
-                            xoff=myX,
-                            yoff=myY,
-                            win_xsize=nXValid,
-                            win_ysize=nYValid,
-                        )
-                    if myval is None:
-                        raise Exception(
-                            f"Input block reading failed from filename {filename[i]}"
-                        )
+                            alpha_mask = masks_per_alpha[Alpha][
+                                counter_per_alpha[Alpha] - 1
+                            ]
+                        numpy.equal(myval, myNDV[i], out=alpha_mask)
+
+            # add an array of values for this block to the eval namespace
+            if Alpha not in myAlphaFileLists:
+                local_namespace[Alpha] = myval
+            myval = None
+
+        for lst in myAlphaFileLists:
+            local_namespace[lst] = numpy_arrays[lst]
+
+        if masked:
+            for Alpha in local_namespace:
+                local_namespace[Alpha] = numpy.ma.MaskedArray(
+                    local_namespace[Alpha],
+                    mask=masks_per_alpha.get(Alpha, numpy.ma.nomask),
+                )
 
-                    # fill in nodata values
-                    if myNDV[i] is not None:
-                        # myNDVs is a boolean buffer.
-                        # a cell equals to 1 if there is NDV in any of the corresponding cells in input raster bands.
-                        if myNDVs is None:
-                            # this is the first band that has NDV set. we initializes myNDVs to a zero buffer
-                            # as we didn't see any NDV value yet.
-                            myNDVs = numpy.zeros(myBufSize)
-                            myNDVs.shape = (nYValid, nXValid)
-                        myNDVs = 1 * numpy.logical_or(myNDVs == 1, myval == myNDV[i])
-
-                    # add an array of values for this block to the eval namespace
-                    if Alpha not in myAlphaFileLists:
-                        local_namespace[Alpha] = myval
-                    myval = None
-
-                for lst in myAlphaFileLists:
-                    local_namespace[lst] = numpy_arrays[lst]
-
-                # try the calculation on the array blocks
-                this_calc = calc[bandNo - 1 if len(calc) > 1 else 0]
-                try:
-                    myResult = eval(this_calc, global_namespace, local_namespace)
-                except Exception:
-                    print(f"evaluation of calculation {this_calc} failed")
-                    raise
-
-                # Propagate nodata values (set nodata cells to zero
-                # then add nodata value to these cells).
-                if myNDVs is not None and myOutNDV is not None:
-                    myResult = ((1 * (myNDVs == 0)) * myResult) + (myOutNDV * myNDVs)
-                elif not isinstance(myResult, numpy.ndarray):
-                    myResult = numpy.ones((nYValid, nXValid)) * myResult
-
-                # Convert float16 to float32 if necessary
-                # (While numpy probably supports float16, GDAL may not)
-                if myResult.dtype == "float16":
-                    myResult = numpy.float32(myResult)
-
-                # write data block to the output file
-                myOutB = myOut.GetRasterBand(bandNo)
-                if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
-                    raise Exception("Block writing failed")
-                myOutB = None  # write to band
+        # try the calculation on the array blocks
+        this_calc = myCalcs[bandNo - 1 if len(calc) > 1 else 0]
+        try:
+            myResult = this_calc.evaluate(global_namespace, local_namespace)
+        except Exception:
+            print(f"evaluation of calculation {this_calc.calc} failed")
+            raise
+
+        if masked and isinstance(myResult, numpy.ma.MaskedArray):
+            # the calculation decides which cells are nodata
+            myNDVs = numpy.ma.getmaskarray(myResult)
+            myResult = numpy.ma.getdata(myResult)
+
+        # Propagate nodata values, in place when the result array is not
+        # shared with the global namespace, and in a type able to hold the
+        # output nodata value
+        if myNDVs is not None and myOutNDV is not None:
+            out_dtype = get_nodata_dtype(numpy.result_type(myResult), myFillNDV)
+            if (
+                not isinstance(myResult, numpy.ndarray)
+                or myResult.shape != myNDVs.shape
+            ):
+                myResult = numpy.array(
+                    numpy.broadcast_to(myResult, myNDVs.shape), dtype=out_dtype
+                )
+            elif (
+                myResult.dtype != out_dtype
+                or myResult.base is not None
+                or not myResult.flags.writeable
+                or any(myResult is arr for arr in myGlobalArrays)
+            ):
+                myResult = myResult.astype(out_dtype)
+            numpy.copyto(myResult, myFillNDV, casting="unsafe", where=myNDVs)
+        elif not isinstance(myResult, numpy.ndarray):
+            myResult = numpy.ones((nYValid, nXValid)) * myResult
+
+        # Convert float16 to float32 if necessary
+        # (While numpy probably supports float16, GDAL may not)
+        if myResult.dtype == "float16":
+            myResult = numpy.float32(myResult)
+
+        return myResult
+
+    def write_block(bandNo, myX, myY, myResult):
+        nonlocal ProgressCt
+        if not quiet:
+            progress_callback(float(ProgressCt) / ProgressEnd, "", None)
+        ProgressCt += 1
+
+        # write data block to the output file
+        myOutB = myOut.GetRasterBand(bandNo)
+        if gdal_array.BandWriteArray(myOutB, myResult, xoff=myX, yoff=myY) != 0:
+            raise Exception("Block writing failed")
+        myOutB = None  # write to band
+
+    ################################################################
+    # start looping through blocks of data
+    ################################################################
+
+    if num_threads <= 1:
+        for window in myWindows:
+            write_block(*window[:3], calc_block(*window))
+    else:
+        # Blocks are read and calculated by the worker threads, while the
+        # results are written by this thread in the order of myWindows, so
+        # that the output does not depend on the scheduling of the threads.
+        # The number of blocks in flight is bounded to limit memory usage.
+        max_in_flight = 2 * num_threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            pending = collections.deque()
+            try:
+                for window in myWindows:
+                    pending.append((window, executor.submit(calc_block, *window)))
+                    if len(pending) >= max_in_flight:
+                        window, future = pending.popleft()
+                        write_block(*window[:3], future.result())
+                while pending:
+                    window, future = pending.popleft()
+                    write_block(*window[:3], future.result())
+            except BaseException:
+                for _, future in pending:
+                    future.cancel()
+                raise
+        # close the per-thread input datasets
+        myThreadFiles.clear()
 
     # remove temp files
     for idx, tempFile in enumerate(myTempFileNames):
@@ -848,6 +1322,30 @@ class GDALCalc(GDALScript):
             help="suppress progress messages",
         )
 
+        parser.add_argument(
+            "--threads",
+            dest="num_threads",
+            type=str,
+            metavar="{ALL_CPUS|n}",
+            help="number of threads used to read, calculate and write blocks concurrently",
+        )
+
+        parser.add_argument(
+            "--optimize",
+            dest="optimize",
+            action="store_true",
+            help="evaluate the calculation as a sequence of numpy operations "
+            "reusing the buffers of their intermediate results across blocks",
+        )
+
+        parser.add_argument(
+            "--masked",
+            dest="masked",
+            action="store_true",
+            help="pass the inputs to the calculation as numpy masked arrays, "
+            "masking their nodata values",
+        )
+
         parser.add_argument(
             "--color-table", type=str, dest="color_table", help="color table file name"
         )
@@ -29,11 +29,17 @@
 # building the stack.
 # anssi.pekkarinen@fao.org
 
+import collections
+import concurrent.futures
+import json
 import math
+import os
 import sys
+import threading
 import time
 
 from osgeo import gdal
+from osgeo_utils.auxiliary.rectangle_index import RectangleIndex
 from osgeo_utils.auxiliary.util import GetOutputDriverFor
 
 progress = gdal.TermProgress_nocb
@@ -83,13 +89,7 @@ def raster_copy(
         )
 
     s_band = s_fh.GetRasterBand(s_band_n)
-    m_band = None
-    # Works only in binary mode and doesn't take into account
-    # intermediate transparency values for compositing.
-    if s_band.GetMaskFlags() != gdal.GMF_ALL_VALID:
-        m_band = s_band.GetMaskBand()
-    elif s_band.GetColorInterpretation() == gdal.GCI_AlphaBand:
-        m_band = s_band
+    m_band = get_mask_band(s_band)
     if m_band is not None:
         return raster_copy_with_mask(
             s_fh,
@@ -123,6 +123,24 @@ def raster_copy(
 # =============================================================================
 
 
+def get_mask_band(s_band):
+    """
+    Return the band whose zero values are the transparent pixels of s_band,
+    or None if all the pixels of s_band are valid.
+    """
+
+    # Works only in binary mode and doesn't take into account
+    # intermediate transparency values for compositing.
+    if s_band.GetMaskFlags() != gdal.GMF_ALL_VALID:
+        return s_band.GetMaskBand()
+    if s_band.GetColorInterpretation() == gdal.GCI_AlphaBand:
+        return s_band
+    return None
+
+
+# =============================================================================
+
+
 def raster_copy_with_nodata(
     s_fh,
     s_xoff,
@@ -196,23 +214,61 @@ def raster_copy_with_mask(
 # =============================================================================
 
 
-def names_to_fileinfos(names):
+def names_to_fileinfos(names, num_threads=1, metadata_cache=None):
     """
     Translate a list of GDAL filenames, into file_info objects.
 
     names -- list of valid GDAL dataset names.
+    num_threads -- number of threads used to open the files.
+    metadata_cache -- dictionary returned by load_metadata_cache(), used to
+    skip opening the unchanged files, and updated with the other ones.
 
     Returns a list of file_info objects.  There may be less file_info objects
     than names if some of the names could not be opened as GDAL files.
     """
 
-    file_infos = []
-    for name in names:
-        fi = file_info()
-        if fi.init_from_name(name) == 1:
-            file_infos.append(fi)
+    use_exceptions = gdal.GetUseExceptions()
+
+    def name_to_fileinfo(name):
+        # The GDAL exception state is per thread
+        with gdal.ExceptionMgr(useExceptions=use_exceptions):
+            fi = file_info()
+            if fi.init_from_name(name, metadata_cache) == 1:
+                return fi
+        return None
+
+    if num_threads > 1:
+        with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+            file_infos = list(executor.map(name_to_fileinfo, names))
+    else:
+        file_infos = [name_to_fileinfo(name) for name in names]
+
+    return [fi for fi in file_infos if fi is not None]
+
+
+# =============================================================================
+
+
+def load_metadata_cache(filename):
+    """
+    Load the metadata of the source files saved by save_metadata_cache().
+
+    Returns an empty dictionary if filename does not exist.
+    """
+
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
 
-    return file_infos
+def save_metadata_cache(filename, metadata_cache):
+    """
+    Save the metadata of the source files gathered by names_to_fileinfos().
+    """
+
+    with open(filename, "w") as f:
+        json.dump(metadata_cache, f)
 
 
 # *****************************************************************************
@@ -235,14 +291,29 @@ class file_info:
         self.xsize = None
         self.ysize = None
 
-    def init_from_name(self, filename):
+    def init_from_name(self, filename, metadata_cache=None):
         """
         Initialize file_info from filename
 
         filename -- Name of file to read.
+        metadata_cache -- dictionary of the metadata of the files by path,
+        with their modification time and size, used and updated if set.
 
         Returns 1 on success or 0 if the file can't be opened.
         """
+        cache_entry = None
+        if metadata_cache is not None:
+            cache_entry = self.get_metadata_cache_entry(filename)
+            if cache_entry is not None:
+                cached = metadata_cache.get(cache_entry["path"])
+                if (
+                    cached is not None
+                    and cached["mtime"] == cache_entry["mtime"]
+                    and cached["size"] == cache_entry["size"]
+                ):
+                    self.init_from_dict(filename, cached["metadata"])
+                    return 1
+
         fh = gdal.Open(filename)
         if fh is None:
             return 0
@@ -265,37 +336,96 @@ class file_info:
         else:
             self.ct = None
 
+        if cache_entry is not None:
+            cache_entry["metadata"] = self.to_dict()
+            metadata_cache[cache_entry["path"]] = cache_entry
+
         return 1
 
+    @staticmethod
+    def get_metadata_cache_entry(filename):
+        """
+        Return the path, modification time and size of filename, identifying
+        its entry in a metadata cache, or None if it is not a regular file.
+        """
+        stat = gdal.VSIStatL(filename)
+        if stat is None or not stat.IsRegular():
+            return None
+        path = filename
+        if not path.startswith("/vsi"):
+            path = os.path.abspath(path)
+        return {"path": path, "mtime": stat.mtime, "size": stat.size}
+
+    def to_dict(self):
+        """
+        Return the metadata of the file as a dictionary that can be saved
+        as JSON.
+        """
+        ct = None
+        if self.ct is not None:
+            ct = {
+                "interpretation": self.ct.GetPaletteInterpretation(),
+                "entries": [
+                    self.ct.GetColorEntry(i) for i in range(self.ct.GetCount())
+                ],
+            }
+
+        return {
+            "bands": self.bands,
+            "xsize": self.xsize,
+            "ysize": self.ysize,
+            "band_type": self.band_type,
+            "projection": self.projection,
+            "geotransform": list(self.geotransform),
+            "ct": ct,
+        }
+
+    def init_from_dict(self, filename, d):
+        """
+        Initialize file_info from the metadata returned by to_dict().
+
+        filename -- Name of the file.
+        d -- dictionary returned by to_dict().
+        """
+        self.filename = filename
+        self.bands = d["bands"]
+        self.xsize = d["xsize"]
+        self.ysize = d["ysize"]
+        self.band_type = d["band_type"]
+        self.projection = d["projection"]
+        self.geotransform = tuple(d["geotransform"])
+        self.ulx = self.geotransform[0]
+        self.uly = self.geotransform[3]
+        self.lrx = self.ulx + self.geotransform[1] * self.xsize
+        self.lry = self.uly + self.geotransform[5] * self.ysize
+
+        self.ct = None
+        if d["ct"] is not None:
+            self.ct = gdal.ColorTable(d["ct"]["interpretation"])
+            for i, entry in enumerate(d["ct"]["entries"]):
+                self.ct.SetColorEntry(i, tuple(entry))
+
     def report(self):
         print("Filename: " + self.filename)
         print("File Size: %dx%dx%d" % (self.xsize, self.ysize, self.bands))
         print("Pixel Size: %f x %f" % (self.geotransform[1], self.geotransform[5]))
         print("UL:(%f,%f)   LR:(%f,%f)" % (self.ulx, self.uly, self.lrx, self.lry))
 
-    def copy_into(self, t_fh, s_band=1, t_band=1, nodata_arg=None, verbose=0):
+    def get_copy_windows(self, t_geotransform, t_xsize, t_ysize):
         """
-        Copy this files image into target file.
+        Compute the windows to copy this file into a target raster.
 
-        This method will compute the overlap area of the file_info objects
-        file, and the target gdal.Dataset object, and copy the image data
-        for the common window area.  It is assumed that the files are in
-        a compatible projection ... no checking or warping is done.  However,
-        if the destination file is a different resolution, or different
-        image pixel type, the appropriate resampling and conversions will
-        be done (using normal GDAL promotion/demotion rules).
+        t_geotransform -- geotransform of the target raster.
+        t_xsize, t_ysize -- size of the target raster.
 
-        t_fh -- gdal.Dataset object for the file into which some or all
-        of this file may be copied.
-
-        Returns 1 on success (or if nothing needs to be copied), and zero one
-        failure.
+        Returns a ((sw_xoff, sw_yoff, sw_xsize, sw_ysize), (tw_xoff, tw_yoff,
+        tw_xsize, tw_ysize)) tuple of the source and target windows, or None
+        if they do not intersect.
         """
-        t_geotransform = t_fh.GetGeoTransform()
         t_ulx = t_geotransform[0]
         t_uly = t_geotransform[3]
-        t_lrx = t_geotransform[0] + t_fh.RasterXSize * t_geotransform[1]
-        t_lry = t_geotransform[3] + t_fh.RasterYSize * t_geotransform[5]
+        t_lrx = t_geotransform[0] + t_xsize * t_geotransform[1]
+        t_lry = t_geotransform[3] + t_ysize * t_geotransform[5]
 
         # figure out intersection region
         tgw_ulx = max(t_ulx, self.ulx)
@@ -309,11 +439,11 @@ class file_info:
 
         # do they even intersect?
         if tgw_ulx >= tgw_lrx:
-            return 1
+            return None
         if t_geotransform[5] < 0 and tgw_uly <= tgw_lry:
-            return 1
+            return None
         if t_geotransform[5] > 0 and tgw_uly >= tgw_lry:
-            return 1
+            return None
 
         # compute target window in pixel coordinates.
         tw_xoff = int((tgw_ulx - t_geotransform[0]) / t_geotransform[1] + 0.1)
@@ -326,7 +456,7 @@ class file_info:
         )
 
         if tw_xsize < 1 or tw_ysize < 1:
-            return 1
+            return None
 
         # Compute source window in pixel coordinates.
         sw_xoff = int((tgw_ulx - self.geotransform[0]) / self.geotransform[1] + 0.1)
@@ -339,29 +469,392 @@ class file_info:
         )
 
         if sw_xsize < 1 or sw_ysize < 1:
+            return None
+
+        return (
+            (sw_xoff, sw_yoff, sw_xsize, sw_ysize),
+            (tw_xoff, tw_yoff, tw_xsize, tw_ysize),
+        )
+
+    def copy_into(self, t_fh, s_band=1, t_band=1, nodata_arg=None, verbose=0):
+        """
+        Copy this files image into target file.
+
+        This method will compute the overlap area of the file_info objects
+        file, and the target gdal.Dataset object, and copy the image data
+        for the common window area.  It is assumed that the files are in
+        a compatible projection ... no checking or warping is done.  However,
+        if the destination file is a different resolution, or different
+        image pixel type, the appropriate resampling and conversions will
+        be done (using normal GDAL promotion/demotion rules).
+
+        t_fh -- gdal.Dataset object for the file into which some or all
+        of this file may be copied.
+
+        Returns 1 on success (or if nothing needs to be copied), and zero one
+        failure.
+        """
+        copy_windows = self.get_copy_windows(
+            t_fh.GetGeoTransform(), t_fh.RasterXSize, t_fh.RasterYSize
+        )
+        if copy_windows is None:
             return 1
+        s_window, t_window = copy_windows
 
         # Open the source file, and copy the selected region.
         s_fh = gdal.Open(self.filename)
 
         return raster_copy(
             s_fh,
-            sw_xoff,
-            sw_yoff,
-            sw_xsize,
-            sw_ysize,
+            *s_window,
             s_band,
             t_fh,
-            tw_xoff,
-            tw_yoff,
-            tw_xsize,
-            tw_ysize,
+            *t_window,
             t_band,
             nodata_arg,
             verbose,
         )
 
 
+# =============================================================================
+
+
+class DatasetCache:
+    """A class keeping the most recently used source datasets open."""
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.datasets = collections.OrderedDict()
+
+    def get(self, filename):
+        ds = self.datasets.get(filename)
+        if ds is not None:
+            self.datasets.move_to_end(filename)
+            return ds
+
+        ds = gdal.Open(filename)
+        self.datasets[filename] = ds
+        if len(self.datasets) > self.max_size:
+            self.datasets.popitem(last=False)
+        return ds
+
+
+def get_output_windows(t_fh, window_pixels=1024 * 1024):
+    """
+    Split the target file into windows made of whole blocks, of about
+    window_pixels pixels.
+
+    Returns a list of (xoff, yoff, xsize, ysize) windows, row by row.
+    """
+
+    xsize = t_fh.RasterXSize
+    ysize = t_fh.RasterYSize
+    block_xsize, block_ysize = t_fh.GetRasterBand(1).GetBlockSize()
+
+    win_xsize = min(
+        xsize,
+        max(block_xsize, int(math.sqrt(window_pixels)) // block_xsize * block_xsize),
+    )
+    win_ysize = min(
+        ysize, max(block_ysize, window_pixels // win_xsize // block_ysize * block_ysize)
+    )
+
+    return [
+        (xoff, yoff, min(win_xsize, xsize - xoff), min(win_ysize, ysize - yoff))
+        for yoff in range(0, ysize, win_ysize)
+        for xoff in range(0, xsize, win_xsize)
+    ]
+
+
+def get_file_copies(t_fh, file_infos, bands, separate=0):
+    """
+    Compute the copies of the source files into the target file.
+
+    Returns, for each file, None if it does not intersect the target file, or
+    a (s_window, t_window, [(s_band, t_band), ...]) tuple of its windows in
+    the source and target files, as returned by file_info.get_copy_windows(),
+    and of its bands copies.
+    """
+
+    t_geotransform = t_fh.GetGeoTransform()
+    file_copies = []
+    t_band = 1
+    for fi in file_infos:
+        if separate == 0:
+            band_copies = [(band, band) for band in range(1, bands + 1)]
+        else:
+            band_copies = [(band, t_band + band - 1) for band in range(1, fi.bands + 1)]
+            t_band = t_band + fi.bands
+
+        copy_windows = fi.get_copy_windows(
+            t_geotransform, t_fh.RasterXSize, t_fh.RasterYSize
+        )
+        if copy_windows is None:
+            file_copies.append(None)
+        else:
+            file_copies.append(copy_windows + (band_copies,))
+
+    return file_copies
+
+
+def get_window_band_sources(t_fh, window, file_infos, file_copies, candidates):
+    """
+    Return the list of (t_band, buf_type, [(filename, s_band, s_window,
+    w_window), ...]) tuples giving the source windows copied into each band
+    of a window of the target file, as expected by composite_window().
+
+    Source windows may be fractional, so that the pixels are resampled
+    exactly as when copying the whole files. w_window is the position of the
+    copied pixels in the window.
+
+    file_copies -- list returned by get_file_copies().
+    candidates -- indices in file_copies of the files that may intersect the
+    window.
+    """
+
+    xoff, yoff, xsize, ysize = window
+    band_sources = {}
+    for i in candidates:
+        if file_copies[i] is None:
+            continue
+        s_window, t_window, band_copies = file_copies[i]
+        sw_xoff, sw_yoff, sw_xsize, sw_ysize = s_window
+        tw_xoff, tw_yoff, tw_xsize, tw_ysize = t_window
+        x_min = max(xoff, tw_xoff)
+        x_max = min(xoff + xsize, tw_xoff + tw_xsize)
+        y_min = max(yoff, tw_yoff)
+        y_max = min(yoff + ysize, tw_yoff + tw_ysize)
+        if x_min >= x_max or y_min >= y_max:
+            continue
+
+        # Fractional source windows are supported by ReadAsArray()
+        x_ratio = sw_xsize / tw_xsize
+        y_ratio = sw_ysize / tw_ysize
+        clipped_s_window = (
+            sw_xoff + (x_min - tw_xoff) * x_ratio,
+            sw_yoff + (y_min - tw_yoff) * y_ratio,
+            (x_max - x_min) * x_ratio,
+            (y_max - y_min) * y_ratio,
+        )
+        w_window = (x_min - xoff, y_min - yoff, x_max - x_min, y_max - y_min)
+
+        for s_band, t_band in band_copies:
+            band_sources.setdefault(t_band, []).append(
+                (file_infos[i].filename, s_band, clipped_s_window, w_window)
+            )
+
+    return [
+        (t_band, t_fh.GetRasterBand(t_band).DataType, sources)
+        for t_band, sources in sorted(band_sources.items())
+    ]
+
+
+def composite_window(window_size, band_sources, nodata=None, dataset_cache=None):
+    """
+    Composite the source windows contributing to a window of the target file.
+
+    window_size -- (xsize, ysize) of the window.
+    band_sources -- list returned by get_window_band_sources(), the last
+    sources on top.
+    nodata -- value of the source pixels to ignore, if any.
+    dataset_cache -- DatasetCache used to open the source files.
+
+    Returns a list of (t_band, data, covered) tuples, where covered is None if
+    all the pixels of data are set, or the array of the pixels that are set.
+    """
+    import numpy as np
+
+    if dataset_cache is None:
+        dataset_cache = DatasetCache()
+
+    xsize, ysize = window_size
+    composited = []
+    for t_band_n, buf_type, sources in band_sources:
+        data = None
+        covered = None
+
+        for filename, s_band_n, s_window, w_window in sources:
+            wx_off, wy_off, wx_size, wy_size = w_window
+
+            s_band = dataset_cache.get(filename).GetRasterBand(s_band_n)
+            m_band = get_mask_band(s_band) if nodata is None else None
+            valid = None
+            if nodata is None and m_band is None:
+                data_src = s_band.ReadAsArray(
+                    *s_window, wx_size, wy_size, buf_type=buf_type
+                )
+            else:
+                data_src = s_band.ReadAsArray(*s_window, wx_size, wy_size)
+                if m_band is not None:
+                    data_mask = m_band.ReadAsArray(*s_window, wx_size, wy_size)
+                    valid = np.not_equal(data_mask, 0)
+                elif np.isnan(nodata):
+                    valid = np.logical_not(np.isnan(data_src))
+                else:
+                    valid = np.not_equal(data_src, nodata)
+
+            if valid is None and (wx_size, wy_size) == (xsize, ysize):
+                # Fully covered by an opaque source
+                data = data_src
+                covered = None
+                continue
+
+            if data is None:
+                data = np.zeros((ysize, xsize), dtype=data_src.dtype)
+                covered = np.zeros((ysize, xsize), dtype=bool)
+
+            # Values are converted to the target data type when written,
+            # as with raster_copy_with_nodata()
+            data = data.astype(np.result_type(data, data_src), copy=False)
+            dst = data[wy_off : wy_off + wy_size, wx_off : wx_off + wx_size]
+            if valid is None:
+                dst[...] = data_src
+                if covered is not None:
+                    covered[wy_off : wy_off + wy_size, wx_off : wx_off + wx_size] = True
+            else:
+                np.copyto(dst, data_src, where=valid)
+                if covered is not None:
+                    covered[
+                        wy_off : wy_off + wy_size, wx_off : wx_off + wx_size
+                    ] |= valid
+
+        if data is not None:
+            if covered is not None and covered.all():
+                covered = None
+            composited.append((t_band_n, data, covered))
+
+    return composited
+
+
+def write_window(t_fh, window, composited):
+    """
+    Write the result of composite_window() into a window of the target file.
+    """
+    import numpy as np
+
+    xoff, yoff, xsize, ysize = window
+    for t_band_n, data, covered in composited:
+        t_band = t_fh.GetRasterBand(t_band_n)
+        if covered is not None:
+            data_dst = t_band.ReadAsArray(xoff, yoff, xsize, ysize)
+            data_dst = data_dst.astype(np.result_type(data_dst, data), copy=False)
+            np.copyto(data_dst, data, where=covered)
+            data = data_dst
+        t_band.WriteArray(data, xoff, yoff)
+
+
+_worker_data = threading.local()
+
+
+def composite_window_job(window_size, band_sources, nodata=None):
+    """
+    Run composite_window() in a worker thread or process, with a
+    DatasetCache kept by the worker.
+    """
+
+    dataset_cache = getattr(_worker_data, "dataset_cache", None)
+    if dataset_cache is None:
+        dataset_cache = DatasetCache()
+        _worker_data.dataset_cache = dataset_cache
+
+    with gdal.ExceptionMgr():
+        return composite_window(window_size, band_sources, nodata, dataset_cache)
+
+
+def copy_by_windows(
+    t_fh,
+    file_infos,
+    bands,
+    separate=0,
+    nodata=None,
+    window_pixels=1024 * 1024,
+    quiet=0,
+    verbose=0,
+    num_workers=1,
+    use_processes=False,
+):
+    """
+    Copy the source files into the target file, window by window.
+
+    The windows are made of whole blocks, and each of them is written once,
+    so that the memory used is bounded by the window size, whatever the size
+    of the source files.
+
+    The windows are disjoint: with num_workers > 1, they are composited in
+    parallel by a pool of threads, or of processes if use_processes is set,
+    and written by the calling thread.
+    """
+
+    file_copies = get_file_copies(t_fh, file_infos, bands, separate)
+    file_index = RectangleIndex(
+        [
+            None
+            if file_copy is None
+            else (
+                file_copy[1][0],
+                file_copy[1][1],
+                file_copy[1][0] + file_copy[1][2],
+                file_copy[1][1] + file_copy[1][3],
+            )
+            for file_copy in file_copies
+        ]
+    )
+    windows = get_output_windows(t_fh, window_pixels)
+
+    def window_jobs():
+        for window in windows:
+            if verbose != 0:
+                print("Processing window %d,%d,%d,%d." % window)
+            xoff, yoff, xsize, ysize = window
+            band_sources = get_window_band_sources(
+                t_fh,
+                window,
+                file_infos,
+                file_copies,
+                file_index.query(xoff, yoff, xoff + xsize, yoff + ysize),
+            )
+            yield window, band_sources
+
+    windows_processed = 0
+
+    def window_done(window, composited):
+        nonlocal windows_processed
+        write_window(t_fh, window, composited)
+        windows_processed = windows_processed + 1
+        if quiet == 0 and verbose == 0:
+            progress(windows_processed / float(len(windows)))
+
+    if num_workers <= 1:
+        dataset_cache = DatasetCache()
+        for window, band_sources in window_jobs():
+            window_done(
+                window,
+                composite_window(window[2:], band_sources, nodata, dataset_cache),
+            )
+        return
+
+    if use_processes:
+        executor = concurrent.futures.ProcessPoolExecutor(num_workers)
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(num_workers)
+    with executor:
+        # Bound the number of composited windows waiting to be written
+        pending = {}
+        for window, band_sources in window_jobs():
+            if len(pending) >= 2 * num_workers:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    window_done(pending.pop(future), future.result())
+            future = executor.submit(
+                composite_window_job, window[2:], band_sources, nodata
+            )
+            pending[future] = window
+        for future in concurrent.futures.as_completed(pending):
+            window_done(pending[future], future.result())
+
+
 # =============================================================================
 def Usage(isError):
     f = sys.stderr if isError else sys.stdout
@@ -383,7 +876,15 @@ def Usage(isError):
         file=f,
     )
     print(
-        "                     [-ot <datatype>] [-createonly] <input_file> [<input_file>]...",
+        "                     [-ot <datatype>] [-createonly] [-windowed]",
+        file=f,
+    )
+    print(
+        "                     [-threads <n>|-processes <n>] [-metadata_cache <filename>]",
+        file=f,
+    )
+    print(
+        "                     <input_file> [<input_file>]...",
         file=f,
     )
     print("                     [--help-general]", file=f)
@@ -413,6 +914,10 @@ def _gdal_merge(argv=None):
     pre_init = []
     band_type = None
     createonly = 0
+    windowed = 0
+    num_workers = 1
+    use_processes = False
+    metadata_cache_filename = None
     bTargetAlignedPixels = False
     start_time = time.time()
 
@@ -446,6 +951,20 @@ def _gdal_merge(argv=None):
         elif arg == "-separate":
             separate = 1
 
+        elif arg == "-windowed":
+            windowed = 1
+
+        elif arg == "-threads" or arg == "-processes":
+            i = i + 1
+            num_workers = int(argv[i])
+            use_processes = arg == "-processes"
+            if num_workers > 1:
+                windowed = 1
+
+        elif arg == "-metadata_cache":
+            i = i + 1
+            metadata_cache_filename = argv[i]
+
         elif arg == "-seperate":
             separate = 1
 
@@ -526,7 +1045,12 @@ def _gdal_merge(argv=None):
         return 1
 
     # Collect information on all the source files.
-    file_infos = names_to_fileinfos(names)
+    metadata_cache = None
+    if metadata_cache_filename is not None:
+        metadata_cache = load_metadata_cache(metadata_cache_filename)
+    file_infos = names_to_fileinfos(names, num_workers, metadata_cache)
+    if metadata_cache_filename is not None:
+        save_metadata_cache(metadata_cache_filename, metadata_cache)
 
     if ulx is None:
         ulx = file_infos[0].ulx
@@ -619,34 +1143,47 @@ def _gdal_merge(argv=None):
         progress(0.0)
     fi_processed = 0
 
-    for fi in file_infos:
-        if createonly != 0:
-            continue
+    if windowed and createonly == 0:
+        copy_by_windows(
+            t_fh,
+            file_infos,
+            bands,
+            separate,
+            nodata,
+            num_workers=num_workers,
+            use_processes=use_processes,
+            quiet=quiet,
+            verbose=verbose,
+        )
+    else:
+        for fi in file_infos:
+            if createonly != 0:
+                continue
 
-        if verbose != 0:
-            print("")
-            print(
-                "Processing file %5d of %5d, %6.3f%% completed in %d minutes."
-                % (
-                    fi_processed + 1,
-                    len(file_infos),
-                    fi_processed * 100.0 / len(file_infos),
-                    int(round((time.time() - start_time) / 60.0)),
+            if verbose != 0:
+                print("")
+                print(
+                    "Processing file %5d of %5d, %6.3f%% completed in %d minutes."
+                    % (
+                        fi_processed + 1,
+                        len(file_infos),
+                        fi_processed * 100.0 / len(file_infos),
+                        int(round((time.time() - start_time) / 60.0)),
+                    )
                 )
-            )
-            fi.report()
-
-        if separate == 0:
-            for band in range(1, bands + 1):
-                fi.copy_into(t_fh, band, band, nodata, verbose)
-        else:
-            for band in range(1, fi.bands + 1):
-                fi.copy_into(t_fh, band, t_band, nodata, verbose)
-                t_band = t_band + 1
-
-        fi_processed = fi_processed + 1
-        if quiet == 0 and verbose == 0:
-            progress(fi_processed / float(len(file_infos)))
+                fi.report()
+
+            if separate == 0:
+                for band in range(1, bands + 1):
+                    fi.copy_into(t_fh, band, band, nodata, verbose)
+            else:
+                for band in range(1, fi.bands + 1):
+                    fi.copy_into(t_fh, band, t_band, nodata, verbose)
+                    t_band = t_band + 1
+
+            fi_processed = fi_processed + 1
+            if quiet == 0 and verbose == 0:
+                progress(fi_processed / float(len(file_infos)))
 
     # Force file to be closed.
     t_fh = None
@@ -11,10 +11,14 @@
 #
 # SPDX-License-Identifier: MIT
 ###############################################################################
+import collections
+import concurrent.futures
 import os
 import sys
+import threading
 
 from osgeo import gdal, ogr, osr
+from osgeo_utils.auxiliary.rectangle_index import RectangleIndex
 from osgeo_utils.auxiliary.util import enable_gdal_exceptions
 
 progress = gdal.TermProgress_nocb
@@ -52,33 +56,46 @@ class AffineTransformDecorator:
 
 
 class DataSetCache:
-    """A class for caching source tiles"""
+    """A class for caching source tiles, closing the least recently used ones"""
 
-    def __init__(self):
-        self.cacheSize = 8
-        self.queue = []
-        self.dict = {}
+    def __init__(self, cacheSize=8):
+        self.cacheSize = cacheSize
+        self.dict = collections.OrderedDict()
 
     def get(self, name):
 
         if name in self.dict:
+            self.dict.move_to_end(name)
             return self.dict[name]
         result = gdal.Open(name)
         if result is None:
             print("Error opening: %s" % NameError, file=sys.stderr)
             return 1
-        if len(self.queue) == self.cacheSize:
-            toRemove = self.queue.pop(0)
-            del self.dict[toRemove]
-        self.queue.append(name)
+        if len(self.dict) >= self.cacheSize:
+            self.dict.popitem(last=False)
         self.dict[name] = result
         return result
 
     def __del__(self):
-        for dataset in self.dict.values():
-            del dataset
-        del self.queue
-        del self.dict
+        self.dict.clear()
+
+
+class ThreadDataSetCache:
+    """A class for caching source tiles in a DataSetCache per thread, the
+    cacheSize tiles being shared among threadCount threads"""
+
+    def __init__(self, cacheSize=8, threadCount=1):
+        self.cacheSize = max(1, cacheSize // threadCount)
+        self.local = threading.local()
+
+    def get(self, name):
+
+        # GDAL datasets must not be used by several threads at once
+        cache = getattr(self.local, "cache", None)
+        if cache is None:
+            cache = DataSetCache(self.cacheSize)
+            self.local.cache = cache
+        return cache.get(name)
 
 
 class tile_info:
@@ -113,24 +130,36 @@ class tile_info:
 class mosaic_info:
     """A class holding information about a GDAL file or a GDAL fileset"""
 
-    def __init__(self, filename, inputDS):
+    def __init__(self, filename, inputDS, cache=None):
         """
         Initialize mosaic_info from filename
 
         filename -- Name of file to read.
         inputDS -- OGR DataSet representing the tile index
+        cache -- DataSetCache used to open the tiles, possibly shared with
+        other mosaic_info objects
 
         """
         self.TempDriver = gdal.GetDriverByName("MEM")
         self.filename = filename
-        self.cache = DataSetCache()
+        if cache is None:
+            cache = DataSetCache()
+        self.cache = cache
         self.ogrTileIndexDS = inputDS
 
-        self.ogrTileIndexDS.GetLayer().ResetReading()
-        # grab the first feature of the temporary tile index created
-        feature = self.ogrTileIndexDS.GetLayer().GetNextFeature()
-        # the first field is the filename
-        imgLocation = feature.GetField(0)
+        # Load the tile index in memory, with a spatial index of the tiles,
+        # rather than scanning the layer for each output tile
+        self.tileLocations = []
+        tileEnvelopes = []
+        for feature in self.ogrTileIndexDS.GetLayer():
+            # the first field is the filename
+            self.tileLocations.append(feature.GetField(0))
+            minx, maxx, miny, maxy = feature.GetGeometryRef().GetEnvelope()
+            tileEnvelopes.append((minx, miny, maxx, maxy))
+        self.tileIndex = RectangleIndex(tileEnvelopes)
+
+        # get the first tile of the temporary tile index created
+        imgLocation = self.tileLocations[0]
 
         # get the first tile that exists, extract metadata abut mosaic
         fhInputTile = self.cache.get(imgLocation)
@@ -173,42 +202,10 @@ class mosaic_info:
 
         returns GDALDataset or None
         """
-        self.ogrTileIndexDS.GetLayer().ResetReading()
-        self.ogrTileIndexDS.GetLayer().SetSpatialFilterRect(minx, miny, maxx, maxy)
-        features = []
-        envelope = None
-        # Find the envelope of all features in the dataset
-        while True:
-            feature = self.ogrTileIndexDS.GetLayer().GetNextFeature()
-            if feature is None:
-                break
-            features.append(feature)
-            # on first iteration get envelope of the first feature
-            if envelope is None:
-                envelope = feature.GetGeometryRef().GetEnvelope()
-            else:
-                featureEnv = feature.GetGeometryRef().GetEnvelope()
-                # then expand the envelop as needed based on other features
-                envelope = (
-                    min(featureEnv[0], envelope[0]),
-                    max(featureEnv[1], envelope[1]),
-                    min(featureEnv[2], envelope[2]),
-                    max(featureEnv[3], envelope[3]),
-                )
-
-        if envelope is None:
+        tiles = self.tileIndex.query(minx, miny, maxx, maxy)
+        if not tiles:
             return None
 
-        # get overlap
-        envelope = (
-            min(minx, envelope[0]),
-            max(maxx, envelope[1]),
-            min(miny, envelope[2]),
-            max(maxy, envelope[3]),
-        )
-
-        self.ogrTileIndexDS.GetLayer().SetSpatialFilter(None)
-
         # merge tiles
 
         resultSizeX = int((maxx - minx) / self.scaleX + 0.5)
@@ -226,8 +223,8 @@ class mosaic_info:
                 t_band.SetNoDataValue(self.nodata)
 
         # for each tile in the index, find its overlap (if any) with the requested bbox, then add it to the returned GDAL dataset if needed.
-        for feature in features:
-            featureName = feature.GetField(0)
+        for tile in tiles:
+            featureName = self.tileLocations[tile]
             sourceDS = self.cache.get(featureName)
             dec = AffineTransformDecorator(sourceDS.GetGeoTransform())
 
@@ -404,35 +401,39 @@ def tileImage(g, minfo, ti):
     yRange = list(range(1, ti.countTilesY + 1))
     xRange = list(range(1, ti.countTilesX + 1))
 
-    if not g.Quiet and not g.Verbose:
-        progress(0.0)
-        processed = 0
-        total = len(xRange) * len(yRange)
-
-    for yIndex in yRange:
-        for xIndex in xRange:
-            offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
-            offsetX = (xIndex - 1) * (ti.tileWidth - ti.overlap)
-            height = ti.tileHeight
-            width = ti.tileWidth
-            if g.UseDirForEachRow:
-                tilename = getTileName(g, minfo, ti, xIndex, yIndex, 0)
-            else:
-                tilename = getTileName(g, minfo, ti, xIndex, yIndex)
-
-            if offsetX + width > ti.width:
-                width = ti.width - offsetX
-            if offsetY + height > ti.height:
-                height = ti.height - offsetY
-
-            feature_only = g.Resume and os.path.exists(tilename)
-            createTile(
-                g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
-            )
+    def tileJobs():
+        for yIndex in yRange:
+            for xIndex in xRange:
+                offsetY = (yIndex - 1) * (ti.tileHeight - ti.overlap)
+                offsetX = (xIndex - 1) * (ti.tileWidth - ti.overlap)
+                height = ti.tileHeight
+                width = ti.tileWidth
+                if g.UseDirForEachRow:
+                    tilename = getTileName(g, minfo, ti, xIndex, yIndex, 0)
+                else:
+                    tilename = getTileName(g, minfo, ti, xIndex, yIndex)
+
+                if offsetX + width > ti.width:
+                    width = ti.width - offsetX
+                if offsetY + height > ti.height:
+                    height = ti.height - offsetY
+
+                feature_only = g.Resume and os.path.exists(tilename)
+                yield createTile, (
+                    g,
+                    minfo,
+                    offsetX,
+                    offsetY,
+                    width,
+                    height,
+                    tilename,
+                    feature_only,
+                )
 
-            if not g.Quiet and not g.Verbose:
-                processed += 1
-                progress(processed / float(total))
+    features = createTiles(
+        g, tileJobs(), len(xRange) * len(yRange), not g.Quiet and not g.Verbose
+    )
+    addFeatures(g.TileIndexFieldName, OGRDS, features)
 
     if g.TileIndexName is not None:
         if g.UseDirForEachRow and not g.PyramidOnly:
@@ -519,13 +520,81 @@ def _renameDataset(g, oldName, newName):
     g.Driver.Rename(newName, oldName)
 
 
+def createTiles(g, tileJobs, total, showProgress=False):
+    """
+    Create the tiles of a level, in parallel on g.Pool if it is set.
+
+    tileJobs -- iterator of (createFunction, args) tuples, where createFunction
+    is createTile or createPyramidTile, and args its arguments before
+    tileFeatures
+    total -- number of tile jobs
+
+    Returns the list of the features of the created tiles for the tile index,
+    in the order of the jobs
+    """
+    tileFeatures = [None] * total
+    processed = 0
+
+    if showProgress:
+        progress(0.0)
+
+    def tileDone(index, features):
+        nonlocal processed
+        tileFeatures[index] = features
+        processed += 1
+        if showProgress:
+            progress(processed / float(total))
+
+    if g.Pool is None:
+        for index, (createFunction, args) in enumerate(tileJobs):
+            tileDone(index, runTileJob(createFunction, args))
+    else:
+        # Bound the number of tile jobs waiting for a worker
+        pending = {}
+        for index, (createFunction, args) in enumerate(tileJobs):
+            if len(pending) >= 2 * g.Jobs:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    tileDone(pending.pop(future), future.result())
+            future = g.Pool.submit(runTileJob, createFunction, args)
+            pending[future] = index
+        for future in concurrent.futures.as_completed(pending):
+            tileDone(pending[future], future.result())
+
+    return [feature for features in tileFeatures for feature in features]
+
+
+@enable_gdal_exceptions
+def runTileJob(createFunction, args):
+    """
+    Call createFunction with args, in the calling thread or a worker thread
+
+    Returns the features of the created tile for the tile index
+    """
+    tileFeatures = []
+    createFunction(*args, tileFeatures)
+    return tileFeatures
+
+
 def createPyramidTile(
-    g, levelMosaicInfo, offsetX, offsetY, width, height, tileName, OGRDS, feature_only
+    g,
+    levelMosaicInfo,
+    offsetX,
+    offsetY,
+    width,
+    height,
+    tileName,
+    feature_only,
+    tileFeatures,
 ):
     """
     Create an individual tile for the pyramids.
 
     The levelMosaicInfo object contains data about the mosaic at a given pyramid level.
+    The (location, xlist, ylist) feature of the tile index is appended to
+    tileFeatures, to be added by addFeatures().
 
     Returns None if successful and return 1 if there is an error
     """
@@ -547,7 +616,7 @@ def createPyramidTile(
     # if -resume flag and the tile is present, add it to the index and exit function
     if feature_only:
         points = dec.pointsFor(width, height)
-        addFeature(g.TileIndexFieldName, OGRDS, tileName, points[0], points[1])
+        tileFeatures.append((tileName, points[0], points[1]))
         return
 
     s_fh = levelMosaicInfo.getDataSet(
@@ -558,7 +627,7 @@ def createPyramidTile(
         return
     # add the new pyramid tile to the index
     points = dec.pointsFor(width, height)
-    addFeature(g.TileIndexFieldName, OGRDS, tileName, points[0], points[1])
+    tileFeatures.append((tileName, points[0], points[1]))
 
     if g.BandType is None:
         bt = levelMosaicInfo.band_type
@@ -631,7 +700,7 @@ def createPyramidTile(
 
 
 def createTile(
-    g, minfo, offsetX, offsetY, width, height, tilename, OGRDS, feature_only
+    g, minfo, offsetX, offsetY, width, height, tilename, feature_only, tileFeatures
 ):
     """
     Create add a vector feature representing the tile to the index, then recreate the
@@ -644,8 +713,9 @@ def createTile(
         width (int): The width of the tile.
         height (int): The height of the tile.
         tilename (str): The name of the tile.
-        OGRDS (DataSource): The OGR DataSource object containing the tile index
         feature_only (bool): Whether to only generate features.
+        tileFeatures (list): The list where the (location, xlist, ylist)
+            feature of the tile index is appended, to be added by addFeatures().
 
     """
     temp_tilename = _createTempFileName(tilename)
@@ -672,7 +742,7 @@ def createTile(
     if feature_only:
         dec2 = AffineTransformDecorator(geotransform)
         points = dec2.pointsFor(width, height)
-        addFeature(g.TileIndexFieldName, OGRDS, tilename, points[0], points[1])
+        tileFeatures.append((tilename, points[0], points[1]))
         return
 
     s_fh = minfo.getDataSet(
@@ -688,7 +758,7 @@ def createTile(
     # add the tile to the tile index
     dec2 = AffineTransformDecorator(geotransform)
     points = dec2.pointsFor(width, height)
-    addFeature(g.TileIndexFieldName, OGRDS, tilename, points[0], points[1])
+    tileFeatures.append((tilename, points[0], points[1]))
 
     bands = minfo.bands
 
@@ -813,6 +883,18 @@ def addFeature(TileIndexFieldName, OGRDataSource, location, xlist, ylist):
     OGRLayer.CreateFeature(OGRFeature)
 
 
+def addFeatures(TileIndexFieldName, OGRDataSource, features):
+    """
+    Add the (location, xlist, ylist) features of tiles to the tile index, in
+    a single transaction
+    """
+    OGRLayer = OGRDataSource.GetLayer()
+    OGRLayer.StartTransaction()
+    for location, xlist, ylist in features:
+        addFeature(TileIndexFieldName, OGRDataSource, location, xlist, ylist)
+    OGRLayer.CommitTransaction()
+
+
 def closeTileIndex(OGRDataSource):
     OGRDataSource.Close()
 
@@ -821,7 +903,7 @@ def buildPyramid(g, minfo, createdTileIndexDS, tileWidth, tileHeight, overlap):
     inputDS = createdTileIndexDS
     for level in range(1, g.Levels + 1):
         g.LastRowIndx = -1
-        levelMosaicInfo = mosaic_info(minfo.filename, inputDS)
+        levelMosaicInfo = mosaic_info(minfo.filename, inputDS, minfo.cache)
         levelOutputTileInfo = tile_info(
             int(levelMosaicInfo.xsize / 2),
             int(levelMosaicInfo.ysize / 2),
@@ -847,38 +929,41 @@ def buildPyramidLevel(g, levelMosaicInfo, levelOutputTileInfo, level):
         g.TileIndexDriverTyp,
     )
 
-    for yIndex in yRange:
-        for xIndex in xRange:
-            offsetY = (yIndex - 1) * (
-                levelOutputTileInfo.tileHeight - levelOutputTileInfo.overlap
-            )
-            offsetX = (xIndex - 1) * (
-                levelOutputTileInfo.tileWidth - levelOutputTileInfo.overlap
-            )
-            height = levelOutputTileInfo.tileHeight
-            width = levelOutputTileInfo.tileWidth
+    def tileJobs():
+        for yIndex in yRange:
+            for xIndex in xRange:
+                offsetY = (yIndex - 1) * (
+                    levelOutputTileInfo.tileHeight - levelOutputTileInfo.overlap
+                )
+                offsetX = (xIndex - 1) * (
+                    levelOutputTileInfo.tileWidth - levelOutputTileInfo.overlap
+                )
+                height = levelOutputTileInfo.tileHeight
+                width = levelOutputTileInfo.tileWidth
 
-            if offsetX + width > levelOutputTileInfo.width:
-                width = levelOutputTileInfo.width - offsetX
-            if offsetY + height > levelOutputTileInfo.height:
-                height = levelOutputTileInfo.height - offsetY
+                if offsetX + width > levelOutputTileInfo.width:
+                    width = levelOutputTileInfo.width - offsetX
+                if offsetY + height > levelOutputTileInfo.height:
+                    height = levelOutputTileInfo.height - offsetY
 
-            tilename = getTileName(
-                g, levelMosaicInfo, levelOutputTileInfo, xIndex, yIndex, level
-            )
+                tilename = getTileName(
+                    g, levelMosaicInfo, levelOutputTileInfo, xIndex, yIndex, level
+                )
 
-            feature_only = g.Resume and os.path.exists(tilename)
-            createPyramidTile(
-                g,
-                levelMosaicInfo,
-                offsetX,
-                offsetY,
-                width,
-                height,
-                tilename,
-                OGRDS,
-                feature_only,
-            )
+                feature_only = g.Resume and os.path.exists(tilename)
+                yield createPyramidTile, (
+                    g,
+                    levelMosaicInfo,
+                    offsetX,
+                    offsetY,
+                    width,
+                    height,
+                    tilename,
+                    feature_only,
+                )
+
+    features = createTiles(g, tileJobs(), len(xRange) * len(yRange))
+    addFeatures(g.TileIndexFieldName, OGRDS, features)
 
     if g.TileIndexName is not None:
         shapeName = getTargetDir(g, level) + g.TileIndexName
@@ -956,7 +1041,7 @@ def Usage(isError):
     print("        [-csv <fileName> [-csvDelim <delimiter>]]", file=f)
     print("        [-s_srs <srs_def>]  [-pyramidOnly] -levels <numberoflevels>", file=f)
     print("        [-r {near|bilinear|cubic|cubicspline|lanczos}]", file=f)
-    print("        [-useDirForEachRow] [-resume]", file=f)
+    print("        [-useDirForEachRow] [-resume] [-cacheSize <n>] [-j <n>]", file=f)
     print("        -targetDir <TileDirectory> <input_file> [<input_file>]...", file=f)
     return 2 if isError else 0
 
@@ -1072,6 +1157,18 @@ def main(args=None, g=None):
             g.UseDirForEachRow = True
         elif arg == "-resume":
             g.Resume = True
+        elif arg == "-j":
+            i += 1
+            g.Jobs = int(argv[i])
+            if g.Jobs < 1:
+                print("Invalid number of jobs : %d" % g.Jobs, file=sys.stderr)
+                return Usage(isError=True)
+        elif arg == "-cacheSize":
+            i += 1
+            g.CacheSize = int(argv[i])
+            if g.CacheSize < 1:
+                print("Invalid cache size : %d" % g.CacheSize, file=sys.stderr)
+                return Usage(isError=True)
         elif arg[:1] == "-":
             print("Unrecognized command option: %s" % arg, file=sys.stderr)
             return Usage(isError=True)
@@ -1134,7 +1231,11 @@ def main(args=None, g=None):
     if tileIndexDS is None:
         print("Error building tile index", file=sys.stderr)
         return 1
-    minfo = mosaic_info(g.Names[0], tileIndexDS)
+    if g.Jobs > 1:
+        cache = ThreadDataSetCache(g.CacheSize, g.Jobs)
+    else:
+        cache = DataSetCache(g.CacheSize)
+    minfo = mosaic_info(g.Names[0], tileIndexDS, cache)
     ti = tile_info(minfo.xsize, minfo.ysize, g.TileWidth, g.TileHeight, g.Overlap)
 
     if g.Source_SRS is None and minfo.projection:
@@ -1147,14 +1248,23 @@ def main(args=None, g=None):
         minfo.report()
         ti.report()
 
-    if not g.PyramidOnly:
-        dsCreatedTileIndex = tileImage(g, minfo, ti)
-        tileIndexDS.Close()
-    else:
-        dsCreatedTileIndex = tileIndexDS
+    if g.Jobs > 1:
+        g.Pool = concurrent.futures.ThreadPoolExecutor(g.Jobs)
+    try:
+        if not g.PyramidOnly:
+            dsCreatedTileIndex = tileImage(g, minfo, ti)
+            tileIndexDS.Close()
+        else:
+            dsCreatedTileIndex = tileIndexDS
 
-    if g.Levels > 0:
-        buildPyramid(g, minfo, dsCreatedTileIndex, g.TileWidth, g.TileHeight, g.Overlap)
+        if g.Levels > 0:
+            buildPyramid(
+                g, minfo, dsCreatedTileIndex, g.TileWidth, g.TileHeight, g.Overlap
+            )
+    finally:
+        if g.Pool is not None:
+            g.Pool.shutdown()
+            g.Pool = None
 
     if g.Verbose:
         print("FINISHED")
@@ -1188,6 +1298,9 @@ class RetileGlobals:
         "LastRowIndx",
         "UseDirForEachRow",
         "Resume",
+        "CacheSize",
+        "Jobs",
+        "Pool",
     ]
 
     def __init__(self):
@@ -1218,6 +1331,9 @@ class RetileGlobals:
         self.LastRowIndx = -1
         self.UseDirForEachRow = False
         self.Resume = False
+        self.CacheSize = 64
+        self.Jobs = 1
+        self.Pool = None
 
 
 if __name__ == "__main__":
@@ -13,11 +13,12 @@
 # SPDX-License-Identifier: MIT
 # ******************************************************************************
 
-import array
+import concurrent.futures
 import filecmp
 import math
 import os
 import sys
+import threading
 
 from osgeo import gdal, osr
 
@@ -25,7 +26,48 @@ from osgeo import gdal, osr
 from osgeo_utils.auxiliary.base import PathLikeOrStr
 from osgeo_utils.auxiliary.util import enable_gdal_exceptions
 
-my_print = print
+# Output of the bands compared in worker threads, replayed in band order.
+_thread_output = threading.local()
+
+
+def _print(*args, **kwargs):
+    lines = getattr(_thread_output, "lines", None)
+    if lines is None:
+        print(*args, **kwargs)
+    else:
+        lines.append((args, kwargs))
+
+
+my_print = _print
+
+# Maximum number of pixels read at once when the blocks are narrow strips.
+DefaultWindowPixels = 1024 * 1024
+
+# Edges of the bins of the absolute difference histograms: ]0, 1e-6], ]1e-6, 1e-3], ...
+DiffHistogramEdges = (0, 1e-6, 1e-3, 1, 10, 100, 1000, 1e6, math.inf)
+
+
+def get_option_value(options, key, default=None):
+    prefix = key + "="
+    for opt in options or []:
+        if opt.startswith(prefix):
+            return opt[len(prefix) :]
+    return default
+
+
+def stop_early(found_diff: int, options) -> bool:
+    """returns whether the comparison must stop, on the first difference with FAIL_FAST"""
+    return found_diff > 0 and "FAIL_FAST" in options
+
+
+def get_num_threads(options) -> int:
+    """returns the number of threads set by the NUM_THREADS=<n|ALL_CPUS> option"""
+    num_threads = get_option_value(options, "NUM_THREADS")
+    if num_threads is None:
+        return 1
+    if num_threads.upper() == "ALL_CPUS":
+        return os.cpu_count() or 1
+    return max(1, int(num_threads))
 
 
 def compare_metadata(golden_md, new_md, md_id, options=None):
@@ -74,53 +116,201 @@ def compare_metadata(golden_md, new_md, md_id, options=None):
     return found_diff
 
 
+#######################################################
+
+
+def get_block_windows(band, max_window_pixels: int = DefaultWindowPixels):
+    """
+    yields the (xoff, yoff, xsize, ysize) windows covering a band at its natural block size.
+    Strips spanning the whole width are grouped up to max_window_pixels.
+    """
+    xsize, ysize = band.XSize, band.YSize
+    block_xsize, block_ysize = band.GetBlockSize()
+    block_xsize = min(block_xsize, xsize)
+    block_ysize = min(block_ysize, ysize)
+    if block_xsize == xsize:
+        block_ysize *= max(1, max_window_pixels // (xsize * block_ysize))
+        block_ysize = min(block_ysize, ysize)
+    for yoff in range(0, ysize, block_ysize):
+        for xoff in range(0, xsize, block_xsize):
+            yield xoff, yoff, min(block_xsize, xsize - xoff), min(
+                block_ysize, ysize - yoff
+            )
+
+
+class PixelDiffStats:
+    """
+    Statistics of the differences between the pixels of two bands,
+    accumulated block by block.
+
+    Pixels that are NaN in both bands are not counted as differing. Pixels that
+    are NaN in one band only are counted as differing, but are left out of the
+    magnitude statistics and of the histograms.
+    """
+
+    def __init__(self, histogram_edges=DiffHistogramEdges):
+        self.pixel_count = 0
+        self.diff_count = 0
+        # an int until a difference is found, as reported by gdalcompare before
+        self.max_diff = 0
+        self.sum_abs_diff = 0.0
+        self.sum_sq_diff = 0.0
+        self.histogram_edges = histogram_edges
+        self.histogram = [0] * (len(histogram_edges) - 1)
+        # histograms of the blocks with differences, by (xoff, yoff)
+        self.block_histograms = {}
+
+    @property
+    def mean_diff(self) -> float:
+        return self.sum_abs_diff / self.pixel_count if self.pixel_count else 0.0
+
+    @property
+    def rmse(self) -> float:
+        return (
+            math.sqrt(self.sum_sq_diff / self.pixel_count) if self.pixel_count else 0.0
+        )
+
+    def add_block(self, xoff: int, yoff: int, diff):
+        import numpy as np
+
+        self.pixel_count += diff.size
+        differing = diff != 0
+        count = int(np.count_nonzero(differing))
+        if not count:
+            return
+        self.diff_count += count
+
+        abs_diff = np.abs(diff[differing])
+        abs_diff = abs_diff[~np.isnan(abs_diff)]
+        if not abs_diff.size:
+            return
+        self.max_diff = max(self.max_diff, float(abs_diff.max()))
+        self.sum_abs_diff += float(abs_diff.sum())
+        self.sum_sq_diff += float(np.dot(abs_diff, abs_diff))
+
+        bins = np.searchsorted(self.histogram_edges, abs_diff) - 1
+        block_histogram = np.bincount(bins, minlength=len(self.histogram)).tolist()
+        self.block_histograms[(xoff, yoff)] = block_histogram
+        self.histogram = [a + b for a, b in zip(self.histogram, block_histogram)]
+
+
+def compare_band_pixels(
+    golden_band,
+    new_band,
+    diff_band=None,
+    max_window_pixels: int = DefaultWindowPixels,
+    windows=None,
+) -> PixelDiffStats:
+    """
+    compares the pixels of two bands of the same size, block by block,
+    optionally writing golden - new to diff_band.
+    windows restricts the comparison to a list of (xoff, yoff, xsize, ysize) windows.
+    """
+    import numpy as np
+
+    if windows is None:
+        windows = get_block_windows(golden_band, max_window_pixels)
+
+    stats = PixelDiffStats()
+    for xoff, yoff, xsize, ysize in windows:
+        golden = golden_band.ReadAsArray(
+            xoff, yoff, xsize, ysize, buf_type=gdal.GDT_Float64
+        )
+        new = new_band.ReadAsArray(xoff, yoff, xsize, ysize, buf_type=gdal.GDT_Float64)
+        with np.errstate(invalid="ignore"):
+            diff = golden - new
+        # equal infinities and NaNs on both sides are not differences
+        same = golden == new
+        same |= np.isnan(golden) & np.isnan(new)
+        diff[same] = 0
+        stats.add_block(xoff, yoff, diff)
+        if diff_band is not None:
+            diff_band.WriteArray(diff, xoff, yoff)
+    return stats
+
+
+def find_diff_windows(golden_band, new_band, fail_fast: bool = False):
+    """
+    returns the block windows whose raw content differs between two bands of the
+    same size and data type, stopping at the first one if fail_fast is set.
+    """
+    windows = []
+    for window in get_block_windows(golden_band):
+        if golden_band.ReadRaster(*window) != new_band.ReadRaster(*window):
+            windows.append(window)
+            if fail_fast:
+                break
+    return windows
+
+
 #######################################################
 # Review and report on the actual image pixels that differ.
-def compare_image_pixels(golden_band, new_band, id, options=None):
+def compare_image_pixels(golden_band, new_band, id, options=None, windows=None):
 
-    diff_count = 0
-    max_diff = 0
+    options = [] if options is None else options
 
     out_db = None
+    diff_band = None
     if "DUMP_DIFFS" in options:
-        prefix = ""
-        for opt in options:
-            if opt.startswith("DUMP_DIFFS_PREFIX="):
-                prefix = opt[len("DUMP_DIFFS_PREFIX=") :]
-                break
+        prefix = get_option_value(options, "DUMP_DIFFS_PREFIX", "")
         diff_fn = prefix + id.replace(" ", "_") + ".tif"
         out_db = gdal.GetDriverByName("GTiff").Create(
-            diff_fn, golden_band.XSize, golden_band.YSize, 1, gdal.GDT_Float32
-        )
-
-    xsize = golden_band.XSize
-    for line in range(golden_band.YSize):
-        golden_line = array.array(
-            "d", golden_band.ReadRaster(0, line, xsize, 1, buf_type=gdal.GDT_Float64)
-        )
-        new_line = array.array(
-            "d", new_band.ReadRaster(0, line, xsize, 1, buf_type=gdal.GDT_Float64)
+            diff_fn,
+            golden_band.XSize,
+            golden_band.YSize,
+            1,
+            gdal.GDT_Float32,
+            options=["TILED=YES"],
         )
-        diff_line = [golden_line[i] - new_line[i] for i in range(xsize)]
-        max_diff_this_line = max([abs(x) for x in diff_line])
-        max_diff = max(max_diff, max_diff_this_line)
-        if max_diff_this_line:
-            diff_count += sum([(1 if x else 0) for x in diff_line])
-        if out_db is not None:
-            out_db.GetRasterBand(1).WriteRaster(
-                0,
-                line,
-                xsize,
-                1,
-                array.array("d", diff_line).tobytes(),
-                buf_type=gdal.GDT_Float64,
-            )
-
-    my_print("  Pixels Differing: " + str(diff_count))
-    my_print("  Maximum Pixel Difference: " + str(max_diff))
+        diff_band = out_db.GetRasterBand(1)
+
+    stats = compare_band_pixels(golden_band, new_band, diff_band, windows=windows)
+
+    my_print("  Pixels Differing: " + str(stats.diff_count))
+    my_print("  Maximum Pixel Difference: " + str(stats.max_diff))
+    if stats.diff_count:
+        my_print("  Mean Absolute Difference: " + str(stats.mean_diff))
+        my_print("  Root Mean Square Error: " + str(stats.rmse))
+        my_print("  Absolute Difference Histogram:")
+        edges = stats.histogram_edges
+        for i, count in enumerate(stats.histogram):
+            if count:
+                my_print("    ]%g, %g]: %d" % (edges[i], edges[i + 1], count))
     if out_db is not None:
+        out_db = None
         my_print("  Wrote Diffs to: %s" % diff_fn)
 
+    return stats
+
+
+#######################################################
+
+
+def compare_band_checksums(golden_band, new_band, id, found_diff, options):
+    """
+    compares the checksums of two bands, and their pixels when the checksums differ.
+    Returns 1 if a difference was found, 0 otherwise.
+    """
+    golden_band_checksum = golden_band.Checksum()
+    new_band_checksum = new_band.Checksum()
+    if golden_band_checksum != new_band_checksum:
+        my_print("Band %s checksum difference:" % id)
+        my_print("  Golden: " + str(golden_band_checksum))
+        my_print("  New:    " + str(new_band_checksum))
+        if found_diff == 0:
+            compare_image_pixels(golden_band, new_band, id, options)
+        return 1
+    else:
+        # check a bit deeper in case of Float data type for which the Checksum() function is not reliable
+        if golden_band.DataType in (gdal.GDT_Float32, gdal.GDT_Float64):
+            if golden_band.ComputeRasterMinMax() != new_band.ComputeRasterMinMax():
+                my_print("Band %s statistics difference:" % 1)
+                my_print("  Golden: " + str(golden_band.ComputeBandStats()))
+                my_print("  New:    " + str(new_band.ComputeBandStats()))
+                compare_image_pixels(golden_band, new_band, id, {})
+
+    return 0
+
 
 #######################################################
 
@@ -178,23 +368,27 @@ def compare_band(golden_band, new_band, id, options=None):
         )
         found_diff += 1
 
-    golden_band_checksum = golden_band.Checksum()
-    new_band_checksum = new_band.Checksum()
-    if golden_band_checksum != new_band_checksum:
-        my_print("Band %s checksum difference:" % id)
-        my_print("  Golden: " + str(golden_band_checksum))
-        my_print("  New:    " + str(new_band_checksum))
-        if found_diff == 0:
-            compare_image_pixels(golden_band, new_band, id, options)
-        found_diff += 1
+    if stop_early(found_diff, options):
+        return found_diff
+
+    if "QUICK" in options and found_diff == 0:
+        # Compare the raw content of the blocks, and the pixels of the
+        # differing blocks only.
+        windows = find_diff_windows(golden_band, new_band, "FAIL_FAST" in options)
+        if windows:
+            my_print("Band %s block difference:" % id)
+            my_print("  Differing Blocks: " + str(len(windows)))
+            if "FAIL_FAST" in options:
+                my_print("  (stopped at the first differing block)")
+            compare_image_pixels(golden_band, new_band, id, options, windows)
+            found_diff += 1
     else:
-        # check a bit deeper in case of Float data type for which the Checksum() function is not reliable
-        if golden_band.DataType in (gdal.GDT_Float32, gdal.GDT_Float64):
-            if golden_band.ComputeRasterMinMax() != new_band.ComputeRasterMinMax():
-                my_print("Band %s statistics difference:" % 1)
-                my_print("  Golden: " + str(golden_band.ComputeBandStats()))
-                my_print("  New:    " + str(new_band.ComputeBandStats()))
-                compare_image_pixels(golden_band, new_band, id, {})
+        found_diff += compare_band_checksums(
+            golden_band, new_band, id, found_diff, options
+        )
+
+    if stop_early(found_diff, options):
+        return found_diff
 
     # Check overviews
     if "SKIP_OVERVIEWS" not in options:
@@ -211,6 +405,8 @@ def compare_band(golden_band, new_band, id, options=None):
                     id + " overview " + str(i),
                     options,
                 )
+                if stop_early(found_diff, options):
+                    return found_diff
 
     # Mask band
     if golden_band.GetMaskFlags() != new_band.GetMaskFlags():
@@ -227,6 +423,9 @@ def compare_band(golden_band, new_band, id, options=None):
             options,
         )
 
+    if stop_early(found_diff, options):
+        return found_diff
+
     # Metadata
     if "SKIP_METADATA" not in options:
         found_diff += compare_metadata(
@@ -299,6 +498,8 @@ def compare_db(golden_db, new_db, options=None):
     # SRS
     if "SKIP_SRS" not in options:
         found_diff += compare_srs(golden_db.GetProjection(), new_db.GetProjection())
+        if stop_early(found_diff, options):
+            return found_diff
 
     # GeoTransform
     if "SKIP_GEOTRANSFORM" not in options:
@@ -309,6 +510,8 @@ def compare_db(golden_db, new_db, options=None):
             my_print("  Golden: " + str(golden_gt))
             my_print("  New:    " + str(new_gt))
             found_diff += 1
+            if stop_early(found_diff, options):
+                return found_diff
 
     # Metadata
     if "SKIP_METADATA" not in options:
@@ -329,6 +532,9 @@ def compare_db(golden_db, new_db, options=None):
             options,
         )
 
+    if stop_early(found_diff, options):
+        return found_diff
+
     # Bands
     if golden_db.RasterCount != new_db.RasterCount:
         my_print(
@@ -351,16 +557,79 @@ def compare_db(golden_db, new_db, options=None):
                 % (i, gSzX, gSzY, nSzX, nSzY)
             )
             found_diff += 1
+            if stop_early(found_diff, options):
+                return found_diff
 
     # If so-far-so-good, then compare pixels
     if found_diff == 0:
-        for i in range(golden_db.RasterCount):
-            found_diff += compare_band(
-                golden_db.GetRasterBand(i + 1),
-                new_db.GetRasterBand(i + 1),
-                str(i + 1),
+        num_threads = min(get_num_threads(options), golden_db.RasterCount)
+        if num_threads > 1 and can_reopen(golden_db) and can_reopen(new_db):
+            found_diff += compare_bands_in_threads(
+                golden_db, new_db, num_threads, options
+            )
+        else:
+            for i in range(golden_db.RasterCount):
+                found_diff += compare_band(
+                    golden_db.GetRasterBand(i + 1),
+                    new_db.GetRasterBand(i + 1),
+                    str(i + 1),
+                    options,
+                )
+                if stop_early(found_diff, options):
+                    break
+
+    return found_diff
+
+
+def can_reopen(ds) -> bool:
+    """returns whether a dataset can be opened again from its description"""
+    name = ds.GetDescription()
+    if not name or ds.GetDriver().ShortName == "MEM":
+        return False
+    return gdal.VSIStatL(name) is not None
+
+
+def compare_bands_in_threads(golden_db, new_db, num_threads: int, options=None):
+    """
+    compares the bands of two datasets in parallel, each band being read through
+    its own dataset handles. The reports are printed in band order.
+    """
+    golden_name = golden_db.GetDescription()
+    new_name = new_db.GetDescription()
+
+    @enable_gdal_exceptions
+    def compare_band_in_thread(band_num):
+        _thread_output.lines = lines = []
+        try:
+            thread_golden_db = gdal.Open(golden_name)
+            thread_new_db = gdal.Open(new_name)
+            found_diff = compare_band(
+                thread_golden_db.GetRasterBand(band_num),
+                thread_new_db.GetRasterBand(band_num),
+                str(band_num),
                 options,
             )
+        finally:
+            _thread_output.lines = None
+        return found_diff, lines
+
+    found_diff = 0
+    with concurrent.futures.ThreadPoolExecutor(num_threads) as executor:
+        futures = [
+            executor.submit(compare_band_in_thread, band_num)
+            for band_num in range(1, golden_db.RasterCount + 1)
+        ]
+        try:
+            for future in futures:
+                band_diff, lines = future.result()
+                for args, kwargs in lines:
+                    my_print(*args, **kwargs)
+                found_diff += band_diff
+                if stop_early(found_diff, options):
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
 
     return found_diff
 
@@ -390,6 +659,8 @@ def compare_sds(golden_db, new_db, options=None):
                 "%d differences found between:\n  %s\n  %s"
                 % (sds_diff, golden_sds[key], new_sds[key])
             )
+            if stop_early(found_diff, options):
+                break
 
     return found_diff
 
@@ -397,6 +668,56 @@ def compare_sds(golden_db, new_db, options=None):
 #######################################################
 
 
+def compare_files(golden_file: PathLikeOrStr, new_file: PathLikeOrStr):
+    """
+    compares the raw content of two files, starting with their size.
+    Returns True if they are identical, False if they differ, or None if they
+    could not be compared.
+    """
+    try:
+        os.stat(golden_file)
+        os.stat(new_file)
+
+        return filecmp.cmp(golden_file, new_file, shallow=False)
+    except OSError:
+        stat_golden = gdal.VSIStatL(str(golden_file))
+        stat_new = gdal.VSIStatL(str(new_file))
+        if not stat_golden:
+            my_print("Skipped binary file comparison, golden file not in filesystem.")
+            return None
+        if not stat_new:
+            my_print("Skipped binary file comparison, new file not in filesystem.")
+            return None
+        if stat_golden.size != stat_new.size:
+            return False
+
+        identical = None
+        f_golden = gdal.VSIFOpenL(str(golden_file), "rb")
+        f_new = gdal.VSIFOpenL(str(new_file), "rb")
+        if f_golden and f_new:
+            identical = True
+            off = 0
+            while off < stat_golden.size:
+                to_read = min(stat_golden.size - off, 1024 * 1024)
+                golden_chunk = gdal.VSIFReadL(1, to_read, f_golden)
+                if len(golden_chunk) < to_read:
+                    my_print(
+                        "Binary file comparison failed: not enough bytes read in golden file"
+                    )
+                    identical = None
+                    break
+                new_chunk = gdal.VSIFReadL(1, to_read, f_new)
+                if golden_chunk != new_chunk:
+                    identical = False
+                    break
+                off += to_read
+        if f_golden:
+            gdal.VSIFCloseL(f_golden)
+        if f_new:
+            gdal.VSIFCloseL(f_new)
+        return identical
+
+
 def find_diff(
     golden_file: PathLikeOrStr,
     new_file: PathLikeOrStr,
@@ -410,59 +731,22 @@ def find_diff(
 
     if "SKIP_BINARY" not in options:
         # compare raw binary files.
-        try:
-            os.stat(golden_file)
-            os.stat(new_file)
-
-            if not filecmp.cmp(golden_file, new_file):
-                my_print("Files differ at the binary level.")
-                found_diff += 1
-        except OSError:
-            stat_golden = gdal.VSIStatL(str(golden_file))
-            stat_new = gdal.VSIStatL(str(new_file))
-            if stat_golden and stat_new:
-                if stat_golden.size != stat_new.size:
-                    my_print("Files differ at the binary level.")
-                    found_diff += 1
-                else:
-                    f_golden = gdal.VSIFOpenL(str(golden_file), "rb")
-                    f_new = gdal.VSIFOpenL(str(new_file), "rb")
-                    if f_golden and f_new:
-                        off = 0
-                        while off < stat_golden.size:
-                            to_read = min(stat_golden.size - off, 1024 * 1024)
-                            golden_chunk = gdal.VSIFReadL(1, to_read, f_golden)
-                            if len(golden_chunk) < to_read:
-                                my_print(
-                                    "Binary file comparison failed: not enough bytes read in golden file"
-                                )
-                                break
-                            new_chunk = gdal.VSIFReadL(1, to_read, f_new)
-                            if golden_chunk != new_chunk:
-                                my_print("Files differ at the binary level.")
-                                found_diff += 1
-                                break
-                            off += to_read
-                    if f_golden:
-                        gdal.VSIFCloseL(f_golden)
-                    if f_new:
-                        gdal.VSIFCloseL(f_new)
-            else:
-                if not stat_golden:
-                    my_print(
-                        "Skipped binary file comparison, golden file not in filesystem."
-                    )
-                elif not new_file:
-                    my_print(
-                        "Skipped binary file comparison, new file not in filesystem."
-                    )
+        identical = compare_files(golden_file, new_file)
+        if identical is False:
+            my_print("Files differ at the binary level.")
+            found_diff += 1
+            if stop_early(found_diff, options):
+                return found_diff
+        elif identical and "QUICK" in options:
+            # byte-identical files hold identical datasets
+            return found_diff
 
     # compare as GDAL Datasets.
     golden_db = gdal.Open(golden_file)
     new_db = gdal.Open(new_file)
     found_diff += compare_db(golden_db, new_db, options)
 
-    if check_sds:
+    if check_sds and not stop_early(found_diff, options):
         found_diff += compare_sds(golden_db, new_db, options)
 
     return found_diff
@@ -477,6 +761,7 @@ def Usage(isError=True):
     print("                      [-dumpdiffs] [-skip_binary] [-skip_overviews]", file=f)
     print("                      [-skip_geolocation] [-skip_geotransform]", file=f)
     print("                      [-skip_metadata] [-skip_rpc] [-skip_srs]", file=f)
+    print("                      [-threads <n|ALL_CPUS>] [-quick] [-fail_fast]", file=f)
     print("                      [-sds] <golden_file> <new_file>", file=f)
     return 2 if isError else 0
 
@@ -534,6 +819,16 @@ def main(argv=sys.argv):
         elif argv[i] == "-skip_srs":
             options.append("SKIP_SRS")
 
+        elif argv[i] == "-quick":
+            options.append("QUICK")
+
+        elif argv[i] == "-fail_fast":
+            options.append("FAIL_FAST")
+
+        elif argv[i] == "-threads" and i + 1 < len(argv):
+            i = i + 1
+            options.append("NUM_THREADS=" + argv[i])
+
         elif golden_file is None:
             golden_file = argv[i]
 
@@ -12,6 +12,9 @@
 # SPDX-License-Identifier: MIT
 # ******************************************************************************
 
+import collections
+import concurrent.futures
+import math
 import os
 import sys
 
@@ -32,7 +35,7 @@ Usage: ogr_layer_algebra [--help] [--help-general]
                             [-opt <NAME>=<VALUE>]...
                             [-f <format_name>] [-dsco <NAME>=<VALUE>]... [-lco <NAME>=<VALUE>]...
                             [-input_fields {NONE|ALL|<fld1>,<fl2>,...<fldN>}] [-method_fields {NONE|ALL|<fld1>,<fl2>,...<fldN>}]
-                            [-nlt <geom_type>] [-a_srs <srs_def>]""",
+                            [-nlt <geom_type>] [-a_srs <srs_def>] [-j <n>]""",
         file=sys.stderr if isError else sys.stdout,
     )
     return 2 if isError else 0
@@ -152,6 +155,311 @@ def CreateLayer(
     return output_lyr
 
 
+###############################################################################
+# Partitioned execution of the operation (-j option)
+#
+# The combined extent of the input and method layers is split into a grid of
+# partitions, and the operation is run for each partition by a worker thread,
+# on in-memory copies of the features that may contribute to the result
+# features "owned" by the partition. A result feature is a piece of an input
+# or method feature, and is owned by the partition in which a point lying on
+# it falls. The source features of such a result feature thus intersect the
+# partition, even if the result is concave, has holes or is multipart, and
+# all the features they interact with intersect the union of the partition
+# and of the extent of these source features, so that the worker computes it
+# exactly as a serial run does. The result features of the partitions are
+# finally filtered by ownership, which drops the duplicates computed by
+# neighbouring partitions, and written in a single transaction. Features
+# without geometry are skipped by the operations, so that leaving them out
+# of the partitions does not change the result.
+
+
+def ComputePartitions(extent, count):
+    """Split extent (min_x, min_y, max_x, max_y) into a grid of about count
+    cells. Return the (min_x, min_y, max_x, max_y) cells in row-major
+    order, and the grid dimensions"""
+
+    min_x, min_y, max_x, max_y = extent
+    width = max_x - min_x
+    height = max_y - min_y
+    if width <= 0 and height <= 0:
+        nx, ny = 1, 1
+    elif height <= 0:
+        nx, ny = count, 1
+    elif width <= 0:
+        nx, ny = 1, count
+    else:
+        nx = max(1, min(count, int(round(math.sqrt(count * width / height)))))
+        ny = max(1, int(math.ceil(count / nx)))
+
+    cells = []
+    for iy in range(ny):
+        for ix in range(nx):
+            cells.append(
+                (
+                    min_x + width * ix / nx,
+                    min_y + height * iy / ny,
+                    max_x if ix == nx - 1 else min_x + width * (ix + 1) / nx,
+                    max_y if iy == ny - 1 else min_y + height * (iy + 1) / ny,
+                )
+            )
+    return cells, nx, ny
+
+
+def GetPartitionIndex(geom, extent, nx, ny):
+    """Return the index of the partition owning geom"""
+
+    if geom is None or geom.IsEmpty():
+        return 0
+    # The center of the envelope of geom may be outside of all the partitions
+    # its source features intersect, so use a point lying on geom.
+    try:
+        point = geom.PointOnSurface()
+    except RuntimeError:
+        point = None
+    if point is not None and not point.IsEmpty():
+        x = point.GetX()
+        y = point.GetY()
+    else:
+        # A vertex also lies on geom
+        part = geom
+        while part.GetGeometryCount() > 0:
+            part = part.GetGeometryRef(0)
+        x = part.GetX(0)
+        y = part.GetY(0)
+    min_x, min_y, max_x, max_y = extent
+    ix = 0
+    if max_x > min_x:
+        ix = int(math.floor((x - min_x) / (max_x - min_x) * nx))
+        ix = min(max(ix, 0), nx - 1)
+    iy = 0
+    if max_y > min_y:
+        iy = int(math.floor((y - min_y) / (max_y - min_y) * ny))
+        iy = min(max(iy, 0), ny - 1)
+    return iy * nx + ix
+
+
+def UnionRect(rect, extent):
+    """Return the union of rect (min_x, min_y, max_x, max_y) and of extent
+    (min_x, max_x, min_y, max_y) as returned by ogr.Layer.GetExtent()"""
+
+    if extent is None:
+        return rect
+    return (
+        min(rect[0], extent[0]),
+        min(rect[1], extent[2]),
+        max(rect[2], extent[1]),
+        max(rect[3], extent[3]),
+    )
+
+
+def CopyLayerInRect(mem_ds, lyr, name, rect):
+    lyr.SetSpatialFilterRect(rect[0], rect[1], rect[2], rect[3])
+    return mem_ds.CopyLayer(lyr, name)
+
+
+@enable_gdal_exceptions
+def ProcessPartition(
+    op_str,
+    input_ds_name,
+    input_lyr_name,
+    method_ds_name,
+    method_lyr_name,
+    output_srs,
+    output_geom_type,
+    output_fields,
+    opt,
+    rect,
+):
+    """Run the operation for the partition rect, and return the in-memory
+    dataset and layer of its result, or None if the partition is empty"""
+
+    input_ds = ogr.Open(input_ds_name)
+    if input_lyr_name is None:
+        input_lyr = input_ds.GetLayer(0)
+    else:
+        input_lyr = input_ds.GetLayerByName(input_lyr_name)
+    method_ds = ogr.Open(method_ds_name)
+    if method_lyr_name is None:
+        method_lyr = method_ds.GetLayer(0)
+    else:
+        method_lyr = method_ds.GetLayerByName(method_lyr_name)
+
+    mem_drv = ogr.GetDriverByName("Memory")
+
+    # Features intersecting the partition
+    cell_ds = mem_drv.CreateDataSource("")
+    input_extent = CopyLayerInRect(cell_ds, input_lyr, "input", rect).GetExtent(
+        can_return_null=True
+    )
+    method_extent = CopyLayerInRect(cell_ds, method_lyr, "method", rect).GetExtent(
+        can_return_null=True
+    )
+    cell_ds = None
+    if input_extent is None and method_extent is None:
+        return None
+
+    # Features interacting with them
+    work_ds = mem_drv.CreateDataSource("")
+    work_input_lyr = CopyLayerInRect(
+        work_ds, input_lyr, "input", UnionRect(rect, method_extent)
+    )
+    work_method_lyr = CopyLayerInRect(
+        work_ds, method_lyr, "method", UnionRect(rect, input_extent)
+    )
+    input_ds = None
+    method_ds = None
+
+    work_output_lyr = work_ds.CreateLayer("output", output_srs, output_geom_type)
+    for fld_defn in output_fields:
+        work_output_lyr.CreateField(fld_defn)
+
+    op = getattr(work_input_lyr, op_str)
+    if op(work_method_lyr, work_output_lyr, options=opt) != 0:
+        raise RuntimeError("An error occurred during %s operation" % op_str)
+
+    return work_ds, work_output_lyr
+
+
+def CreateEmptyLayerCopy(mem_ds, lyr, name):
+    mem_lyr = mem_ds.CreateLayer(name, lyr.GetSpatialRef(), lyr.GetGeomType())
+    layer_defn = lyr.GetLayerDefn()
+    for idx in range(layer_defn.GetFieldCount()):
+        mem_lyr.CreateField(layer_defn.GetFieldDefn(idx))
+    return mem_lyr
+
+
+def RunPartitionedOperation(
+    op_str,
+    input_ds_name,
+    input_lyr_name,
+    method_ds_name,
+    method_lyr_name,
+    input_lyr,
+    method_lyr,
+    output_lyr,
+    opt,
+    jobs,
+    quiet,
+):
+
+    input_extent = input_lyr.GetExtent(can_return_null=True)
+    method_extent = method_lyr.GetExtent(can_return_null=True)
+    if input_extent is None:
+        input_extent = method_extent
+    elif method_extent is None:
+        method_extent = input_extent
+
+    output_defn = output_lyr.GetLayerDefn()
+    output_fields = []
+    if output_defn.GetFieldCount() == 0:
+        # Let the operation create the schema of the result layer, as done in
+        # a serial run, by running it on empty layers. The workers will
+        # create the same schema in their own result layer.
+        mem_ds = ogr.GetDriverByName("Memory").CreateDataSource("")
+        op = getattr(CreateEmptyLayerCopy(mem_ds, input_lyr, "input"), op_str)
+        if (
+            op(
+                CreateEmptyLayerCopy(mem_ds, method_lyr, "method"),
+                output_lyr,
+                options=opt,
+            )
+            != 0
+        ):
+            return 1
+        mem_ds = None
+        output_defn = output_lyr.GetLayerDefn()
+    else:
+        # Fields are mapped by name to the ones of the result layer
+        for idx in range(output_defn.GetFieldCount()):
+            src_fld_defn = output_defn.GetFieldDefn(idx)
+            fld_defn = ogr.FieldDefn(src_fld_defn.GetName(), src_fld_defn.GetType())
+            fld_defn.SetSubType(src_fld_defn.GetSubType())
+            fld_defn.SetWidth(src_fld_defn.GetWidth())
+            fld_defn.SetPrecision(src_fld_defn.GetPrecision())
+            output_fields.append(fld_defn)
+
+    if input_extent is None:
+        # Both layers are empty or without geometries
+        if not quiet:
+            gdal.TermProgress_nocb(1.0)
+        return 0
+
+    extent = UnionRect(
+        (input_extent[0], input_extent[2], input_extent[1], input_extent[3]),
+        method_extent,
+    )
+    partitions, nx, ny = ComputePartitions(extent, 4 * jobs)
+
+    # Make the partitions slightly larger, so that rounding errors cannot
+    # exclude the source features of a result feature owned by a partition.
+    eps = 1e-8 * max(extent[2] - extent[0], extent[3] - extent[1], 1e-300)
+    partitions = [
+        (min_x - eps, min_y - eps, max_x + eps, max_y + eps)
+        for min_x, min_y, max_x, max_y in partitions
+    ]
+
+    output_srs = output_lyr.GetSpatialRef()
+    output_geom_type = output_lyr.GetGeomType()
+    field_count = output_defn.GetFieldCount()
+    field_map = list(range(field_count))
+
+    if not quiet:
+        gdal.TermProgress_nocb(0.0)
+
+    with concurrent.futures.ThreadPoolExecutor(jobs) as pool:
+
+        def submit(rect):
+            return pool.submit(
+                ProcessPartition,
+                op_str,
+                input_ds_name,
+                input_lyr_name,
+                method_ds_name,
+                method_lyr_name,
+                output_srs,
+                output_geom_type,
+                output_fields,
+                opt,
+                rect,
+            )
+
+        # Keep a bounded number of partitions in flight, so that the results
+        # waiting to be merged do not hold too much memory.
+        pending = collections.deque()
+        next_partition = 0
+        output_lyr.StartTransaction()
+        for idx in range(len(partitions)):
+            while next_partition < len(partitions) and len(pending) < 2 * jobs:
+                pending.append(submit(partitions[next_partition]))
+                next_partition += 1
+            result = pending.popleft().result()
+            if result is not None:
+                work_output_lyr = result[1]
+                use_field_map = (
+                    work_output_lyr.GetLayerDefn().GetFieldCount() == field_count
+                )
+                for work_f in work_output_lyr:
+                    if (
+                        GetPartitionIndex(work_f.GetGeometryRef(), extent, nx, ny)
+                        != idx
+                    ):
+                        continue
+                    f = ogr.Feature(output_defn)
+                    if use_field_map:
+                        f.SetFromWithMap(work_f, 1, field_map)
+                    else:
+                        f.SetFrom(work_f)
+                    output_lyr.CreateFeature(f)
+                work_output_lyr = None
+                result = None
+            if not quiet:
+                gdal.TermProgress_nocb((idx + 1) / len(partitions))
+        output_lyr.CommitTransaction()
+
+    return 0
+
+
 ###############################################################################
 
 
@@ -176,6 +484,7 @@ def main(argv=sys.argv):
     geom_type = ogr.wkbUnknown
     srs_name = None
     srs = None
+    jobs = 1
 
     argv = ogr.GeneralCmdLineProcessor(argv)
     if argv is None:
@@ -293,6 +602,16 @@ def main(argv=sys.argv):
             i = i + 1
             srs_name = argv[i]
 
+        elif arg == "-j" and i + 1 < len(argv):
+            i = i + 1
+            try:
+                jobs = int(argv[i])
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                print("-j %s: invalid number of jobs." % argv[i], file=sys.stderr)
+                return 1
+
         elif EQUAL(arg, "Union"):
             op_str = "Union"
 
@@ -542,11 +861,28 @@ def main(argv=sys.argv):
                 if output_lyr is None:
                     return 1
 
-    op = getattr(input_lyr, op_str)
-    if not quiet:
-        ret = op(method_lyr, output_lyr, options=opt, callback=gdal.TermProgress_nocb)
+    if jobs > 1:
+        ret = RunPartitionedOperation(
+            op_str,
+            input_ds_name,
+            input_lyr_name,
+            method_ds_name,
+            method_lyr_name,
+            input_lyr,
+            method_lyr,
+            output_lyr,
+            opt,
+            jobs,
+            quiet,
+        )
     else:
-        ret = op(method_lyr, output_lyr, options=opt)
+        op = getattr(input_lyr, op_str)
+        if not quiet:
+            ret = op(
+                method_lyr, output_lyr, options=opt, callback=gdal.TermProgress_nocb
+            )
+        else:
+            ret = op(method_lyr, output_lyr, options=opt)
 
     input_ds = None
     method_ds = None
@@ -13,10 +13,13 @@
 # SPDX-License-Identifier: MIT
 ###############################################################################
 
+import concurrent.futures
 import glob
 import os
 import os.path
+import queue
 import sys
+import threading
 from typing import Optional, Sequence
 
 from osgeo import gdal, ogr, osr
@@ -818,6 +821,406 @@ def _gpkg_ogrmerge(
     return 0
 
 
+class _SourceLayer:
+    """Description of a source layer, as gathered by _prefetch_sources()"""
+
+    def __init__(self, lyr, idx, get_feature_count, get_arrow_field_names):
+        self.idx = idx
+        self.name = lyr.GetName()
+        defn = lyr.GetLayerDefn()
+        self.geom_field_count = defn.GetGeomFieldCount()
+        self.fields = [
+            (fld_defn.GetName(), fld_defn.GetType(), fld_defn.GetSubType())
+            for fld_defn in (defn.GetFieldDefn(i) for i in range(defn.GetFieldCount()))
+        ]
+        self.feature_count = lyr.GetFeatureCount() if get_feature_count else None
+
+        # Names of the fields exposed by GetArrowStream(), or None if the
+        # layer has no Arrow stream
+        self.arrow_field_names = None
+        if get_arrow_field_names:
+            stream = lyr.GetArrowStream(["INCLUDE_FID=NO"])
+            if stream is not None:
+                schema = stream.GetSchema()
+                self.arrow_field_names = set(
+                    schema.GetChild(i).GetName()
+                    for i in range(schema.GetChildrenCount())
+                )
+
+    def get_field_index(self, name):
+        """Same as OGRFeatureDefn::GetFieldIndex(): exact match first, then
+        case insensitive one"""
+
+        for i, (fld_name, _, _) in enumerate(self.fields):
+            if fld_name == name:
+                return i
+        for i, (fld_name, _, _) in enumerate(self.fields):
+            if EQUAL(fld_name, name):
+                return i
+        return -1
+
+
+class _SourceDataset:
+    """Description of a source dataset, as gathered by _prefetch_sources()"""
+
+    def __init__(self, idx, name):
+        self.idx = idx
+        self.name = name
+        # None if the dataset cannot be opened
+        self.layers = None
+
+
+def _get_num_threads(max_num_threads):
+    """Return the number of threads, from the GDAL_NUM_THREADS configuration
+    option, to use for at most max_num_threads concurrent tasks"""
+
+    num_threads = gdal.GetConfigOption("GDAL_NUM_THREADS", "ALL_CPUS")
+    if EQUAL(num_threads, "ALL_CPUS"):
+        num_threads = gdal.GetNumCPUs()
+    else:
+        try:
+            num_threads = int(num_threads)
+        except ValueError:
+            num_threads = 1
+    return max(1, min(num_threads, max_num_threads))
+
+
+def _prefetch_sources(
+    src_datasets,
+    src_geom_types,
+    num_threads=1,
+    get_feature_counts=False,
+    get_arrow_field_names=False,
+):
+    """Open the source datasets, on a pool of num_threads threads, and gather
+    in one pass the description of their layers whose geometry type is in
+    src_geom_types (or of all their layers if it is empty).
+
+    Return the list of _SourceDataset, in the order of src_datasets.
+    """
+
+    # The exception state is per thread
+    gdal_use_exceptions = gdal.GetUseExceptions()
+    ogr_use_exceptions = ogr.GetUseExceptions()
+
+    def prefetch(args):
+        src_ds_idx, src_dsname = args
+        source = _SourceDataset(src_ds_idx, src_dsname)
+        with gdal.ExceptionMgr(useExceptions=gdal_use_exceptions), ogr.ExceptionMgr(
+            useExceptions=ogr_use_exceptions
+        ):
+            src_ds = ogr.Open(src_dsname)
+            if src_ds is None:
+                return source
+            source.layers = []
+            for src_lyr_idx, src_lyr in enumerate(src_ds):
+                if src_geom_types:
+                    gt = ogr.GT_Flatten(src_lyr.GetGeomType())
+                    if gt not in src_geom_types:
+                        continue
+                source.layers.append(
+                    _SourceLayer(
+                        src_lyr,
+                        src_lyr_idx,
+                        get_feature_counts,
+                        get_arrow_field_names,
+                    )
+                )
+        return source
+
+    if num_threads <= 1 or len(src_datasets) <= 1:
+        return [prefetch(args) for args in enumerate(src_datasets)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+        return list(executor.map(prefetch, enumerate(src_datasets)))
+
+
+def _get_arrow_merge_plan(vrt_filename, merge_sources, src_layer_field_name):
+    """Return the plan of the copy, through the Arrow interface, of the
+    source layers of the layers of vrt_filename, or None if the copy must be
+    done feature by feature.
+
+    merge_sources is a list of (src_dsname, src_layer, vrt_lyr_idx,
+    src_layer_field_content) tuples, src_layer being a _SourceLayer gathered
+    with its Arrow field names, and src_layer_field_content being None
+    if there is no source layer field.
+
+    The plan is a list of (src_dsname, src_layer, vrt_lyr_idx,
+    src_layer_field_content, field_map, field_count) tuples, where field_map
+    is the list of (src_field_name, dst_field_idx) tuples of the source fields
+    to copy, and field_count the number of fields of the VRT layer.
+    """
+
+    def is_compatible(src_field, dst_fld_defn):
+        _, src_type, src_subtype = src_field
+        if (
+            src_type == dst_fld_defn.GetType()
+            and src_subtype == dst_fld_defn.GetSubType()
+        ):
+            return True
+        # Widening numeric conversions are done by WriteArrowBatch()
+        return (
+            (src_type, dst_fld_defn.GetType())
+            in (
+                (ogr.OFTInteger, ogr.OFTInteger64),
+                (ogr.OFTInteger, ogr.OFTReal),
+                (ogr.OFTInteger64, ogr.OFTReal),
+            )
+            and src_subtype == ogr.OFSTNone
+            and dst_fld_defn.GetSubType() == ogr.OFSTNone
+        )
+
+    vrt_ds = ogr.Open(vrt_filename)
+    if vrt_ds is None:
+        return None
+    vrt_defns = []
+    for vrt_lyr in vrt_ds:
+        vrt_defn = vrt_lyr.GetLayerDefn()
+        if vrt_defn.GetGeomFieldCount() > 1:
+            return None
+        vrt_defns.append(vrt_defn)
+
+    plan = []
+    for src_dsname, src_layer, vrt_lyr_idx, src_layer_field_content in merge_sources:
+        if src_layer.geom_field_count > 1 or src_layer.arrow_field_names is None:
+            return None
+
+        vrt_defn = vrt_defns[vrt_lyr_idx]
+        field_map = []
+        for dst_field_idx in range(vrt_defn.GetFieldCount()):
+            if dst_field_idx == 0 and src_layer_field_content is not None:
+                continue
+            dst_fld_defn = vrt_defn.GetFieldDefn(dst_field_idx)
+            src_field_idx = src_layer.get_field_index(dst_fld_defn.GetName())
+            if src_field_idx < 0:
+                continue
+            src_field = src_layer.fields[src_field_idx]
+            if src_field[0] not in src_layer.arrow_field_names or not is_compatible(
+                src_field, dst_fld_defn
+            ):
+                return None
+            field_map.append((src_field[0], dst_field_idx))
+        if (
+            not field_map
+            and src_layer_field_content is None
+            and src_layer.geom_field_count == 0
+        ):
+            # No column to write
+            return None
+        plan.append(
+            (
+                src_dsname,
+                src_layer,
+                vrt_lyr_idx,
+                src_layer_field_content,
+                field_map,
+                vrt_defn.GetFieldCount(),
+            )
+        )
+
+    if src_layer_field_name is not None and any(
+        vrt_defn.GetFieldCount() == 0
+        or vrt_defn.GetFieldDefn(0).GetName() != src_layer_field_name
+        for vrt_defn in vrt_defns
+    ):
+        return None
+
+    return plan
+
+
+def _arrow_ogrmerge(
+    dst_ds,
+    plan,
+    dst_layers,
+    progress_callback=None,
+    progress_arg=None,
+):
+    """Copy the source layers of plan, as returned by _get_arrow_merge_plan(),
+    into dst_layers, by batches of features streamed with GetArrowStream()
+    and written with WriteArrowBatch().
+
+    The source layers are read by a separate thread, so that the reading of
+    the next batches, and of the next sources, overlaps the writing of the
+    current one.
+    """
+
+    import pyarrow as pa
+
+    def is_arrow_native_driver(driver_name):
+        return driver_name.upper() in ("ARROW", "PARQUET", "ADBC")
+
+    for _, _, vrt_lyr_idx, _, _, field_count in plan:
+        if dst_layers[vrt_lyr_idx].GetLayerDefn().GetFieldCount() != field_count:
+            print(
+                "ERROR: Fields of %s do not match the source ones"
+                % dst_layers[vrt_lyr_idx].GetName(),
+                file=sys.stderr,
+            )
+            return 1
+
+    total_feature_count = 0
+    if progress_callback:
+        for _, src_layer, _, _, _, _ in plan:
+            total_feature_count += max(0, src_layer.feature_count)
+
+    dst_is_arrow_native = is_arrow_native_driver(dst_ds.GetDriver().GetDescription())
+
+    # Items are (plan_idx, src_ds, schema, batch) tuples, schema being only set
+    # for the first item of a source and batch for the next ones, then None at
+    # the end of the reading, or the exception that interrupted it. The source
+    # dataset is part of the items, so that it is closed only once all its
+    # batches have been written.
+    batch_queue = queue.Queue(maxsize=8)
+    stop_reading = threading.Event()
+
+    def put(item):
+        while not stop_reading.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    # The exception state is per thread
+    gdal_use_exceptions = gdal.GetUseExceptions()
+    ogr_use_exceptions = ogr.GetUseExceptions()
+
+    def read_sources():
+        try:
+            with gdal.ExceptionMgr(useExceptions=gdal_use_exceptions), ogr.ExceptionMgr(
+                useExceptions=ogr_use_exceptions
+            ):
+                for plan_idx, (src_dsname, src_layer, _, _, _, _) in enumerate(plan):
+                    src_ds = ogr.Open(src_dsname)
+                    if src_ds is None:
+                        raise RuntimeError("Cannot open %s" % src_dsname)
+                    src_lyr = src_ds.GetLayerByName(src_layer.name)
+
+                    stream_options = ["INCLUDE_FID=NO", "GEOMETRY_ENCODING=WKB"]
+                    if (
+                        not is_arrow_native_driver(src_ds.GetDriver().GetDescription())
+                        and not dst_is_arrow_native
+                    ):
+                        # As done by ogr2ogr, to allow mix of timezones
+                        stream_options.append("DATETIME_AS_STRING=YES")
+                    stream = src_lyr.GetArrowStreamAsPyArrow(stream_options)
+                    if not put((plan_idx, src_ds, stream.schema, None)):
+                        return
+                    for batch in stream:
+                        if not put((plan_idx, src_ds, None, batch)):
+                            return
+                    stream = None
+                    src_lyr = None
+                    src_ds = None
+            put(None)
+        except Exception as e:
+            put(e)
+
+    use_transaction = dst_ds.TestCapability(ogr.ODsCTransactions)
+    if use_transaction:
+        dst_ds.StartTransaction()
+
+    reader = threading.Thread(target=read_sources)
+    reader.start()
+    success = False
+    try:
+        feature_count = 0
+        while True:
+            item = batch_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            plan_idx, _, schema, batch = item
+            (
+                _,
+                src_layer,
+                vrt_lyr_idx,
+                src_layer_field_content,
+                field_map,
+                _,
+            ) = plan[plan_idx]
+            dst_lyr = dst_layers[vrt_lyr_idx]
+
+            if schema is not None:
+                dst_defn = dst_lyr.GetLayerDefn()
+                src_columns = {}
+                geom_column = None
+                for i in range(schema.num_fields):
+                    field = schema.field(i)
+                    if field.metadata and field.metadata.get(
+                        b"ARROW:extension:name"
+                    ) in (
+                        b"ogc.wkb",
+                        b"geoarrow.wkb",
+                    ):
+                        if geom_column is None:
+                            geom_column = i
+                    else:
+                        src_columns[field.name] = i
+
+                # Columns of the output batches, named after the target fields,
+                # which may have been laundered by the output driver.
+                columns = []
+                fields = []
+                if src_layer_field_content is not None:
+                    fields.append(
+                        pa.field(dst_defn.GetFieldDefn(0).GetName(), pa.string())
+                    )
+                for src_field_name, dst_field_idx in field_map:
+                    i = src_columns[src_field_name]
+                    columns.append(i)
+                    fields.append(
+                        schema.field(i).with_name(
+                            dst_defn.GetFieldDefn(dst_field_idx).GetName()
+                        )
+                    )
+                write_options = []
+                if geom_column is not None:
+                    columns.append(geom_column)
+                    fields.append(schema.field(geom_column))
+                    write_options.append(
+                        "GEOMETRY_NAME=" + schema.field(geom_column).name
+                    )
+                continue
+
+            arrays = [batch.field(i) for i in columns]
+            if src_layer_field_content is not None:
+                arrays.insert(0, pa.repeat(src_layer_field_content, len(batch)))
+            if (
+                dst_lyr.WritePyArrow(
+                    pa.StructArray.from_arrays(arrays, fields=fields),
+                    options=write_options,
+                )
+                != ogr.OGRERR_NONE
+            ):
+                print(
+                    "ERROR: Cannot write features of %s into %s"
+                    % (src_layer.name, dst_lyr.GetName()),
+                    file=sys.stderr,
+                )
+                return 1
+            feature_count += len(batch)
+            if progress_callback and total_feature_count > 0:
+                progress_callback(
+                    min(1.0, feature_count / total_feature_count), "", progress_arg
+                )
+        success = True
+    finally:
+        stop_reading.set()
+        reader.join()
+        if use_transaction and not success:
+            dst_ds.RollbackTransaction()
+
+    if use_transaction:
+        dst_ds.CommitTransaction()
+
+    if progress_callback:
+        progress_callback(1.0, "", progress_arg)
+
+    return 0
+
+
 def ogrmerge(
     src_datasets: Optional[Sequence[str]] = None,
     dst_filename: Optional[PathLikeOrStr] = None,
@@ -889,6 +1292,33 @@ def ogrmerge(
         with gdal.ExceptionMgr(useExceptions=False), gdal.quiet_errors():
             return gdal.OpenEx(filename, gdal.OF_VECTOR | gdal.OF_UPDATE)
 
+    may_use_arrow_optim = (
+        not EQUAL(driver_name, "VRT")
+        and not append
+        and not overwrite_layer
+        and not skip_failures
+        and t_srs is None
+        and not any(
+            opt.upper().startswith(("ROW_GROUP_SIZE=", "BATCH_SIZE=")) for opt in lco
+        )
+        and EQUAL(gdal.GetConfigOption("OGR_MERGE_ENABLE_ARROW_OPTIM", "YES"), "YES")
+    )
+    if may_use_arrow_optim:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            may_use_arrow_optim = False
+
+    # Open the sources, and gather the description of their layers, in
+    # parallel, once for all the steps below.
+    sources = _prefetch_sources(
+        src_datasets,
+        src_geom_types,
+        num_threads=_get_num_threads(len(src_datasets)),
+        get_feature_counts=may_use_arrow_optim and progress_callback is not None,
+        get_arrow_field_names=may_use_arrow_optim,
+    )
+
     if (
         not single_layer
         and EQUAL(driver_name, "GPKG")
@@ -897,13 +1327,12 @@ def ogrmerge(
     ):
 
         def are_sources_gpkg():
-            for src_dsname in src_datasets:
-                if src_dsname.lower().endswith(".gpkg"):
-                    src_ds = ogr.Open(src_dsname)
-                    if src_ds is None:
+            for source in sources:
+                if source.name.lower().endswith(".gpkg"):
+                    if source.layers is None:
                         return False
-                    for src_lyr in src_ds:
-                        if src_lyr.GetLayerDefn().GetGeomFieldCount() > 1:
+                    for src_layer in source.layers:
+                        if src_layer.geom_field_count > 1:
                             # shouldn't happen for now...
                             print(
                                 "Code is not ready for multi-geometry column GPKG",
@@ -989,24 +1418,25 @@ def ogrmerge(
     writer = XMLWriter(f)
     writer.open_element("OGRVRTDataSource")
 
+    # Source layers of each VRT layer, for the Arrow based copy
+    merge_sources = []
+
     if single_layer:
 
         ogr_vrt_union_layer_written = False
 
-        for src_ds_idx, src_dsname in enumerate(src_datasets):
-            src_ds = ogr.Open(src_dsname)
-            if src_ds is None:
+        for source in sources:
+            src_ds_idx = source.idx
+            src_dsname = source.name
+            if source.layers is None:
                 print("ERROR: Cannot open %s" % src_dsname, file=sys.stderr)
                 if skip_failures:
                     continue
                 gdal.VSIFCloseL(f)
                 gdal.Unlink(vrt_filename)
                 return 1
-            for src_lyr_idx, src_lyr in enumerate(src_ds):
-                if src_geom_types:
-                    gt = ogr.GT_Flatten(src_lyr.GetGeomType())
-                    if gt not in src_geom_types:
-                        continue
+            for src_layer in source.layers:
+                src_lyr_idx = src_layer.idx
 
                 if not ogr_vrt_union_layer_written:
                     ogr_vrt_union_layer_written = True
@@ -1024,7 +1454,7 @@ def ogrmerge(
 
                 layer_name = src_layer_field_content
 
-                src_lyr_name = src_lyr.GetName()
+                src_lyr_name = src_layer.name
                 try:
                     src_lyr_name = src_lyr_name.decode("utf-8")
                 except AttributeError:
@@ -1056,6 +1486,15 @@ def ogrmerge(
                 layer_name = layer_name.replace("{LAYER_NAME}", src_lyr_name)
                 layer_name = layer_name.replace("{LAYER_INDEX}", "%d" % src_lyr_idx)
 
+                merge_sources.append(
+                    (
+                        src_dsname,
+                        src_layer,
+                        0,
+                        layer_name if src_layer_field_name is not None else None,
+                    )
+                )
+
                 if t_srs is not None:
                     writer.open_element("OGRVRTWarpedLayer")
 
@@ -1072,7 +1511,7 @@ def ogrmerge(
                 if single_layer:
                     attrs["shared"] = "1"
                 writer.write_element_value("SrcDataSource", src_dsname, attrs=attrs)
-                writer.write_element_value("SrcLayer", src_lyr.GetName())
+                writer.write_element_value("SrcLayer", src_layer.name)
 
                 if a_srs is not None:
                     writer.write_element_value("LayerSRS", a_srs)
@@ -1092,22 +1531,20 @@ def ogrmerge(
 
     else:
 
-        for src_ds_idx, src_dsname in enumerate(src_datasets):
-            src_ds = ogr.Open(src_dsname)
-            if src_ds is None:
+        for source in sources:
+            src_ds_idx = source.idx
+            src_dsname = source.name
+            if source.layers is None:
                 print("ERROR: Cannot open %s" % src_dsname, file=sys.stderr)
                 if skip_failures:
                     continue
                 gdal.VSIFCloseL(f)
                 gdal.Unlink(vrt_filename)
                 return 1
-            for src_lyr_idx, src_lyr in enumerate(src_ds):
-                if src_geom_types:
-                    gt = ogr.GT_Flatten(src_lyr.GetGeomType())
-                    if gt not in src_geom_types:
-                        continue
+            for src_layer in source.layers:
+                src_lyr_idx = src_layer.idx
 
-                src_lyr_name = src_lyr.GetName()
+                src_lyr_name = src_layer.name
                 try:
                     src_lyr_name = src_lyr_name.decode("utf-8")
                 except AttributeError:
@@ -1118,7 +1555,7 @@ def ogrmerge(
                     src_ds_idx,
                     src_dsname,
                     src_lyr_idx,
-                    src_lyr.GetName(),
+                    src_layer.name,
                     skip_failures,
                 )
                 if layer_name is None:
@@ -1126,6 +1563,8 @@ def ogrmerge(
                     gdal.Unlink(vrt_filename)
                     return 1
 
+                merge_sources.append((src_dsname, src_layer, len(merge_sources), None))
+
                 if t_srs is not None:
                     writer.open_element("OGRVRTWarpedLayer")
 
@@ -1163,6 +1602,35 @@ def ogrmerge(
 
     ret = 0
     if not EQUAL(driver_name, "VRT"):
+        plan = None
+        if may_use_arrow_optim:
+            plan = _get_arrow_merge_plan(
+                vrt_filename, merge_sources, src_layer_field_name
+            )
+
+        if plan is not None:
+            # Let ogr2ogr create the target layers from the VRT layers, as in
+            # the general case, but without copying features, which are then
+            # copied by Arrow batches.
+            layer_count = dst_ds.GetLayerCount()
+            if not gdal.VectorTranslate(
+                dst_ds, vrt_filename, layerCreationOptions=lco, limit=0
+            ):
+                gdal.Unlink(vrt_filename)
+                return 1
+            gdal.Unlink(vrt_filename)
+            dst_layers = [
+                dst_ds.GetLayer(i) for i in range(layer_count, dst_ds.GetLayerCount())
+            ]
+            if len(dst_layers) != max(
+                [vrt_lyr_idx + 1 for _, _, vrt_lyr_idx, _ in merge_sources] + [0]
+            ):
+                print("ERROR: Cannot find the created layers", file=sys.stderr)
+                return 1
+            return _arrow_ogrmerge(
+                dst_ds, plan, dst_layers, progress_callback, progress_arg
+            )
+
         accessMode = None
         if append:
             accessMode = "append"
@@ -20,7 +20,7 @@ from typing import Optional, Sequence, Tuple, Union
 
 import numpy as np
 
-from osgeo import gdal, gdalconst, osr
+from osgeo import gdal, gdal_array, gdalconst, osr
 from osgeo.gdal_array import BandRasterIONumPy
 from osgeo_utils.auxiliary.array_util import ArrayLike, ArrayOrScalarLike
 from osgeo_utils.auxiliary.base import is_path_like
@@ -63,6 +63,207 @@ CoordinateTransformationOrSRS = Optional[
 ]
 
 
+def _bilinear_kernel(x: np.ndarray) -> np.ndarray:
+    return np.maximum(1 - np.abs(x), 0)
+
+
+def _cubic_kernel(x: np.ndarray) -> np.ndarray:
+    # Keys cubic convolution kernel, with a = -0.5
+    x = np.abs(x)
+    return np.where(
+        x <= 1,
+        (1.5 * x - 2.5) * x * x + 1,
+        np.where(x < 2, ((-0.5 * x + 2.5) * x - 4) * x + 2, 0),
+    )
+
+
+def _cubic_spline_kernel(x: np.ndarray) -> np.ndarray:
+    # Cubic B-spline kernel
+    x = np.abs(x)
+    return np.where(
+        x <= 1,
+        (0.5 * x - 1) * x * x + 2 / 3,
+        np.where(x < 2, (2 - x) ** 3 / 6, 0),
+    )
+
+
+# Radius and kernel of the interpolations done by sample_bands()
+_resample_kernels = {
+    gdalconst.GRIORA_Bilinear: (1, _bilinear_kernel),
+    gdalconst.GRIORA_Cubic: (2, _cubic_kernel),
+    gdalconst.GRIORA_CubicSpline: (2, _cubic_spline_kernel),
+}
+
+
+def _cast_values(values: np.ndarray, dtype) -> np.ndarray:
+    """Cast interpolated values to dtype, rounding and clamping integers as GDAL does"""
+    dtype = np.dtype(dtype)
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        values = np.clip(np.floor(values + 0.5), info.min, info.max)
+    return values.astype(dtype)
+
+
+def _sample_bands_with_rasterio(
+    bands: Sequence[gdal.Band],
+    pixels: np.ndarray,
+    lines: np.ndarray,
+    resample_alg,
+    results: np.ndarray,
+    inside: np.ndarray,
+):
+    """Sample the points one by one, for resampling algorithms not handled by sample_bands()"""
+    # read each band in its own data type, BandRasterIONumPy() trusts buf_type
+    buf_objs = [
+        np.empty([1, 1], dtype=gdal_array.GDALTypeCodeToNumericTypeCode(band.DataType))
+        for band in bands
+    ]
+    for idx in np.flatnonzero(inside):
+        for bnd_idx, (band, buf_obj) in enumerate(zip(bands, buf_objs)):
+            if (
+                BandRasterIONumPy(
+                    band,
+                    0,
+                    pixels[idx] - 0.5,
+                    lines[idx] - 0.5,
+                    1,
+                    1,
+                    buf_obj,
+                    band.DataType,
+                    resample_alg,
+                    None,
+                    None,
+                )
+                == 0
+            ):
+                results[bnd_idx][idx] = _cast_values(buf_obj[0], results.dtype)[0]
+
+
+def sample_bands(
+    bands: Sequence[gdal.Band],
+    pixels: ArrayLike,
+    lines: ArrayLike,
+    resample_alg=gdalconst.GRIORA_NearestNeighbour,
+    dtype=None,
+) -> np.ndarray:
+    """
+    Sample bands at many points at once.
+
+    The points are grouped by the block of the raster they fall into, so that
+    each block touched by the points is read once per band, and the values are
+    gathered with NumPy indexing. Bilinear, cubic and cubic spline
+    interpolations are computed in bulk, like GDAL RasterIO() does for a 1x1
+    window centered on each point: the kernel taps outside of the raster or
+    masked (nodata) are ignored and the weights of the other taps normalized.
+    Other resampling algorithms fall back to one RasterIO() call per point.
+
+    :param bands: bands of the same size to sample
+    :param pixels: pixel (column) coordinates of the points, relative to the
+           top left corner of the raster
+    :param lines: line (row) coordinates of the points
+    :param resample_alg: GRIORA_ resampling algorithm
+    :param dtype: data type of the result, by default the one of the first band
+    :return: array of shape (len(bands), len(pixels)) of the sampled values,
+             in the order of the points. Values of points outside of the
+             raster, or only on masked pixels, are set to the nodata value of
+             the band, or 0.
+    """
+    pixels = np.asarray(pixels, dtype=np.float64)
+    lines = np.asarray(lines, dtype=np.float64)
+    if pixels.shape != lines.shape:
+        raise Exception(
+            f"len(pixels)={len(pixels)} should be the same as len(lines)={len(lines)}"
+        )
+    if dtype is None:
+        dtype = gdal_array.GDALTypeCodeToNumericTypeCode(bands[0].DataType)
+
+    xsize, ysize = bands[0].XSize, bands[0].YSize
+    results = np.empty(shape=(len(bands), len(pixels)), dtype=dtype)
+    for bnd_idx, band in enumerate(bands):
+        nodata = band.GetNoDataValue()
+        results[bnd_idx] = nodata if nodata is not None else 0
+
+    inside = (pixels >= 0) & (pixels < xsize) & (lines >= 0) & (lines < ysize)
+    if resample_alg != gdalconst.GRIORA_NearestNeighbour:
+        if resample_alg not in _resample_kernels:
+            _sample_bands_with_rasterio(
+                bands, pixels, lines, resample_alg, results, inside
+            )
+            return results
+        radius, kernel = _resample_kernels[resample_alg]
+    else:
+        radius, kernel = 0, None
+
+    (point_indices,) = np.nonzero(inside)
+    if len(point_indices) == 0:
+        return results
+    block_xsize, block_ysize = bands[0].GetBlockSize()
+    nb_blocks_x = (xsize + block_xsize - 1) // block_xsize
+    block_x = (pixels[point_indices] // block_xsize).astype(np.int64)
+    block_y = (lines[point_indices] // block_ysize).astype(np.int64)
+    block_ids = block_y * nb_blocks_x + block_x
+    order = np.argsort(block_ids, kind="stable")
+    point_indices, block_ids = point_indices[order], block_ids[order]
+    group_starts = np.flatnonzero(np.diff(block_ids)) + 1
+    masked = [
+        band.GetMaskFlags() != gdal.GMF_ALL_VALID and kernel is not None
+        for band in bands
+    ]
+    taps = np.arange(2 * radius)
+
+    for group in np.split(np.arange(len(point_indices)), group_starts):
+        idx = point_indices[group]
+        # Window of the block, enlarged by the radius of the kernel
+        block_id = block_ids[group[0]]
+        block_xoff = int(block_id % nb_blocks_x) * block_xsize
+        block_yoff = int(block_id // nb_blocks_x) * block_ysize
+        xoff = max(block_xoff - radius, 0)
+        yoff = max(block_yoff - radius, 0)
+        win_xsize = min(block_xoff + block_xsize + radius, xsize) - xoff
+        win_ysize = min(block_yoff + block_ysize + radius, ysize) - yoff
+
+        if kernel is None:
+            cols = pixels[idx].astype(np.int64) - xoff
+            rows = lines[idx].astype(np.int64) - yoff
+            for bnd_idx, band in enumerate(bands):
+                data = band.ReadAsArray(xoff, yoff, win_xsize, win_ysize)
+                results[bnd_idx][idx] = data[rows, cols]
+            continue
+
+        # Kernel taps of each point, and their weights
+        tap_x = np.floor(pixels[idx] - radius + 0.5).astype(np.int64)[:, None] + taps
+        tap_y = np.floor(lines[idx] - radius + 0.5).astype(np.int64)[:, None] + taps
+        weights_x = kernel(tap_x - pixels[idx][:, None] + 0.5) * (
+            (tap_x >= 0) & (tap_x < xsize)
+        )
+        weights_y = kernel(tap_y - lines[idx][:, None] + 0.5) * (
+            (tap_y >= 0) & (tap_y < ysize)
+        )
+        weights = weights_y[:, :, None] * weights_x[:, None, :]
+        cols = np.clip(tap_x - xoff, 0, win_xsize - 1)[:, None, :]
+        rows = np.clip(tap_y - yoff, 0, win_ysize - 1)[:, :, None]
+
+        for bnd_idx, band in enumerate(bands):
+            data = band.ReadAsArray(xoff, yoff, win_xsize, win_ysize)
+            band_weights = weights
+            if masked[bnd_idx]:
+                mask = band.GetMaskBand().ReadAsArray(xoff, yoff, win_xsize, win_ysize)
+                band_weights = weights * (mask[rows, cols] != 0)
+            values = data[rows, cols]
+            if not np.iscomplexobj(values):
+                values = values.astype(np.float64)
+            weight_sums = band_weights.sum(axis=(1, 2))
+            valid = weight_sums > 1e-10
+            values = (np.where(band_weights != 0, values, 0) * band_weights).sum(
+                axis=(1, 2)
+            )
+            results[bnd_idx][idx[valid]] = _cast_values(
+                values[valid] / weight_sums[valid], dtype
+            )
+
+    return results
+
+
 def gdallocationinfo(
     filename_or_ds: PathOrDS,
     x: ArrayOrScalarLike,
@@ -91,7 +292,6 @@ def gdallocationinfo(
         y = [y]
     if len(x) != len(y):
         raise Exception(f"len(x)={len(x)} should be the same as len(y)={len(y)}")
-    point_count = len(x)
 
     dtype = np.float64
     if not isinstance(x, np.ndarray) or not isinstance(y, np.ndarray):
@@ -143,11 +343,8 @@ def gdallocationinfo(
     pixel_fact, line_fact = (
         (ovr_xsize / xsize, ovr_ysize / ysize) if ovr_idx else (1, 1)
     )
-    bnd_count = len(bands)
 
-    shape = (bnd_count, point_count)
     np_dtype, np_dtype = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
-    results = np.empty(shape=shape, dtype=np_dtype)
 
     check_outside = not quiet_mode or not allow_xy_outside_extent
     if check_outside and (
@@ -175,29 +372,7 @@ def gdallocationinfo(
     else:
         lines_q = y * line_fact
 
-    buf_xsize = buf_ysize = 1
-    buf_type, typecode = GDALTypeCodeAndNumericTypeCodeFromDataSet(ds)
-    buf_obj = np.empty([buf_ysize, buf_xsize], dtype=typecode)
-
-    for idx, (pixel, line) in enumerate(zip(pixels_q, lines_q)):
-        for bnd_idx, band in enumerate(bands):
-            if (
-                BandRasterIONumPy(
-                    band,
-                    0,
-                    pixel - 0.5,
-                    line - 0.5,
-                    1,
-                    1,
-                    buf_obj,
-                    buf_type,
-                    resample_alg,
-                    None,
-                    None,
-                )
-                == 0
-            ):
-                results[bnd_idx][idx] = buf_obj[0][0]
+    results = sample_bands(bands, pixels_q, lines_q, resample_alg, dtype=np_dtype)
 
     is_scaled, scales, offsets = get_scales_and_offsets(bands)
     if is_scaled:
@@ -14,9 +14,14 @@
    - "gdalvsi:///vsimem/byte.tif" (note the 3 slashes) to access VSIMem file "/vsimem/byte.tif"
    - "gdalvsi:///vsicurl/https://example.com/byte.tif (note the 3 slashes) to access "https://example.com/byte.tif" through /vsicurl/
 
+   ``cat_ranges()`` reads the ranges of a file with a single call to
+   :py:func:`osgeo.gdal.VSIFReadMultiRangeL`, which network file systems serve
+   with parallel requests, and reads different files in parallel.
+
    :since: GDAL 3.11
 """
 
+import concurrent.futures
 from pathlib import PurePath
 
 from fsspec.registry import register_implementation
@@ -29,6 +34,11 @@ from osgeo import gdal
 class VSIFileSystem(AbstractFileSystem):
     """Implementation of AbstractFileSystem for a GDAL Virtual File System"""
 
+    # Ranges of a same file separated by less than this number of bytes are
+    # read as a single range by cat_ranges(). This matches the default
+    # chunk size of /vsicurl/.
+    max_gap = 16384
+
     @classmethod
     def _get_gdal_path(cls, path):
         """Return a GDAL compatible file from a fsspec file name.
@@ -61,6 +71,196 @@ class VSIFileSystem(AbstractFileSystem):
         path = self._get_gdal_path(path)
         return gdal.VSIFile(path, mode)
 
+    @staticmethod
+    def _open_for_read(gdal_path, path):
+        fp = gdal.VSIFOpenExL(gdal_path, "rb", True)
+        if fp is None:
+            if gdal.VSIStatL(gdal_path) is None:
+                raise FileNotFoundError(path)
+            raise IOError(f"Cannot open {path}: {gdal.VSIGetLastErrorMsg()}")
+        return fp
+
+    @staticmethod
+    def _get_file_size(fp):
+        gdal.VSIFSeekL(fp, 0, 2)
+        return gdal.VSIFTellL(fp)
+
+    @staticmethod
+    def _resolve_range(start, end, size):
+        """Return the (start, end) range, clipped to the file size.
+        Negative values are relative to the end of the file, as in fsspec.
+        """
+        start = 0 if start is None else start
+        end = size if end is None else end
+        if start < 0:
+            start = max(size + start, 0)
+        if end < 0:
+            end = size + end
+        end = min(end, size)
+        return start, max(start, end)
+
+    @staticmethod
+    def _coalesce_ranges(ranges, max_gap):
+        """Merge (start, end) ranges that overlap or are separated by less
+        than max_gap bytes.
+
+        Return the list of merged [start, end] ranges, sorted by start, and,
+        for each input range, the index of the merged range containing it.
+        """
+        merged = []
+        where = [None] * len(ranges)
+        for i in sorted(range(len(ranges)), key=lambda i: ranges[i]):
+            start, end = ranges[i]
+            if merged and start <= merged[-1][1] + max_gap:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+            where[i] = len(merged) - 1
+        return merged, where
+
+    def cat_file(self, path, start=None, end=None, **kwargs):
+        """Implements AbstractFileSystem.cat_file()"""
+
+        gdal_path = self._get_gdal_path(path)
+        fp = self._open_for_read(gdal_path, path)
+        try:
+            if start is None or start < 0 or end is None or end < 0:
+                start, end = self._resolve_range(start, end, self._get_file_size(fp))
+            if end <= start:
+                return b""
+            if gdal.VSIFSeekL(fp, start, 0) != 0:
+                raise IOError(f"Cannot seek in {path}")
+            data = gdal.VSIFReadL(1, end - start, fp)
+            return bytes(data) if data else b""
+        finally:
+            gdal.VSIFCloseL(fp)
+
+    def _cat_file_ranges(self, path, ranges, max_gap):
+        """Read several (start, end) ranges of a file, with a single call to
+        gdal.VSIFReadMultiRangeL()"""
+
+        gdal_path = self._get_gdal_path(path)
+        fp = self._open_for_read(gdal_path, path)
+        try:
+            size = self._get_file_size(fp)
+            ranges = [self._resolve_range(start, end, size) for start, end in ranges]
+            merged, where = self._coalesce_ranges(
+                [(start, end) for start, end in ranges if end > start], max_gap
+            )
+            blocks = []
+            if merged:
+                blocks = gdal.VSIFReadMultiRangeL(
+                    [start for start, _ in merged],
+                    [end - start for start, end in merged],
+                    fp,
+                )
+                if blocks is None:
+                    raise IOError(
+                        f"Cannot read ranges of {path}: {gdal.VSIGetLastErrorMsg()}"
+                    )
+        finally:
+            gdal.VSIFCloseL(fp)
+
+        ret = []
+        idx = 0
+        for start, end in ranges:
+            if end <= start:
+                ret.append(b"")
+                continue
+            merged_start = merged[where[idx]][0]
+            block = memoryview(blocks[where[idx]])
+            ret.append(bytes(block[start - merged_start : end - merged_start]))
+            idx += 1
+        return ret
+
+    def cat_ranges(
+        self,
+        paths,
+        starts,
+        ends,
+        max_gap=None,
+        on_error="return",
+        max_workers=None,
+        **kwargs,
+    ):
+        """Implements AbstractFileSystem.cat_ranges()
+
+        The ranges of a same file are read with gdal.VSIFReadMultiRangeL(),
+        after merging the ones separated by less than max_gap bytes (defaults
+        to :py:attr:`max_gap`). Different files are read in parallel, by up to
+        max_workers threads.
+        """
+
+        if max_gap is None:
+            max_gap = self.max_gap
+        if isinstance(starts, list):
+            if len(starts) != len(paths):
+                raise ValueError("starts and paths should have the same length")
+        else:
+            starts = [starts] * len(paths)
+        if isinstance(ends, list):
+            if len(ends) != len(paths):
+                raise ValueError("ends and paths should have the same length")
+        else:
+            ends = [ends] * len(paths)
+
+        # group the ranges by file, preserving their order
+        indices_by_path = {}
+        for i, path in enumerate(paths):
+            indices_by_path.setdefault(path, []).append(i)
+
+        def read_path(path):
+            indices = indices_by_path[path]
+            return self._cat_file_ranges(
+                path, [(starts[i], ends[i]) for i in indices], max_gap
+            )
+
+        ret = [None] * len(paths)
+        if len(indices_by_path) == 1:
+            results = {}
+            for path in indices_by_path:
+                try:
+                    results[path] = read_path(path)
+                except Exception as e:
+                    results[path] = e
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                futures = {
+                    path: executor.submit(read_path, path) for path in indices_by_path
+                }
+                results = {
+                    path: future.exception() or future.result()
+                    for path, future in futures.items()
+                }
+
+        for path, indices in indices_by_path.items():
+            result = results[path]
+            if isinstance(result, Exception):
+                if on_error == "raise":
+                    raise result
+                result = [result] * len(indices)
+            for i, data in zip(indices, result):
+                ret[i] = data
+        return ret
+
+    def pipe_file(self, path, value, mode="overwrite", **kwargs):
+        """Implements AbstractFileSystem.pipe_file()"""
+
+        gdal_path = self._get_gdal_path(path)
+        if mode == "create" and gdal.VSIStatL(gdal_path) is not None:
+            raise FileExistsError(path)
+        fp = gdal.VSIFOpenExL(gdal_path, "wb", True)
+        if fp is None:
+            raise IOError(f"Cannot create {path}: {gdal.VSIGetLastErrorMsg()}")
+        try:
+            if value and gdal.VSIFWriteL(value, 1, len(value), fp) != len(value):
+                raise IOError(f"Cannot write {path}")
+        finally:
+            if gdal.VSIFCloseL(fp) != 0:
+                raise IOError(f"Cannot write {path}")
+
     def info(self, path, **kwargs):
         """Implements AbstractFileSystem.info()"""
 